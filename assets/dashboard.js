@@ -0,0 +1,104 @@
+// Callbacks clientside du dashboard (mode CLIENTSIDE=1, voir src/components/clientside.py) :
+// la carte, le top 3, l'histogramme et le filled area plot sont mis à jour dans le navigateur
+// à partir des données envoyées une fois dans le dcc.Store "cube-store".
+
+(function () {
+    function withTemplate(figure, template) {
+        // Le thème Plotly est envoyé une seule fois pour toutes les figures
+        var layout = Object.assign({}, figure.layout, {template: template});
+        return {data: figure.data, layout: layout};
+    }
+
+    function mapFigure(payload, indicator, year) {
+        var i = payload.indicators.indexOf(indicator);
+        var j = payload.years.indexOf(year);
+        if (i < 0 || j < 0) {
+            return {};
+        }
+
+        // Pays ayant une valeur pour le couple (indicateur, année)
+        var vector = payload.values[i][j];
+        // (placés par leur code ISO-3, les zones sans code ne sont pas sur la carte)
+        var areas = [], locations = [], z = [], customdata = [];
+        for (var k = 0; k < vector.length; k++) {
+            if (vector[k] !== null && payload.iso3[k] !== null) {
+                areas.push(payload.areas[k]);
+                locations.push(payload.iso3[k]);
+                z.push(vector[k]);
+                customdata.push([payload.areas[k], payload.iso3[k], vector[k]]);
+            }
+        }
+
+        var trace = Object.assign({}, payload.map.data[0], {
+            locations: locations, hovertext: areas, z: z, customdata: customdata
+        });
+        var layout = JSON.parse(JSON.stringify(payload.map.layout));
+        layout.title.text = layout.title.text.replace("__INDICATOR__", indicator).replace("__YEAR__", year);
+        layout.template = payload.plotly_template;
+        return {data: [trace], layout: layout};
+    }
+
+    function div(children, style) {
+        return {namespace: "dash_html_components", type: "Div", props: {children: children, style: style}};
+    }
+
+    function topCountries(payload, indicator, year) {
+        if (!indicator || !year) {
+            return "Sélectionnez un indicateur et une année";
+        }
+        var i = payload.indicators.indexOf(indicator);
+        var j = payload.years.indexOf(year);
+        if (i < 0 || j < 0) {
+            return "Aucune donnée disponible";
+        }
+
+        var rows = [];
+        payload.values[i][j].forEach(function (value, k) {
+            if (value !== null) {
+                rows.push({area: payload.areas[k], value: value});
+            }
+        });
+        if (rows.length === 0) {
+            return "Aucune donnée disponible";
+        }
+
+        // Tri stable : à valeur égale, l'ordre des pays est gardé (comme nlargest)
+        rows.sort(function (a, b) { return b.value - a.value; });
+
+        var unit = indicator.indexOf("Prevalence") >= 0 ? " %" : (indicator.indexOf("Number") >= 0 ? " M" : "");
+        return div(rows.slice(0, 3).map(function (row, n) {
+            return div([
+                div(row.value.toFixed(1) + unit, {
+                    color: "#7efbdb", fontSize: "40px", fontWeight: "bold", textAlign: "center", marginBottom: "5px"
+                }),
+                div("#" + (n + 1) + " " + row.area, {
+                    color: "white", fontSize: "20px", textAlign: "center", marginBottom: "15px"
+                })
+            ], {marginBottom: "10px"});
+        }));
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        dashboard: {
+            update_dashboard: function (indicator, year, payload) {
+                var noUpdate = window.dash_clientside.no_update;
+                if (!payload) {
+                    return [{}, "Loading data...", {}, {}];
+                }
+                var key = year === null || year === undefined ? null : String(year);
+
+                var map = indicator && key ? mapFigure(payload, indicator, key) : {};
+                var top = topCountries(payload, indicator, key);
+
+                // L'histogramme et le filled area plot ne dépendent que de l'année
+                var triggered = window.dash_clientside.callback_context.triggered.map(function (t) { return t.prop_id; });
+                if (triggered.length === 1 && triggered[0] === "indicator-dropdown.value") {
+                    return [map, top, noUpdate, noUpdate];
+                }
+                var histogram = key && payload.histogram[key] ? withTemplate(payload.histogram[key], payload.plotly_template) : {};
+                var filledArea = key && payload.filled_area[key] ? withTemplate(payload.filled_area[key], payload.plotly_template) : {};
+                return [map, top, histogram, filledArea];
+            }
+        }
+    });
+})();
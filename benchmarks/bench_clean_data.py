@@ -0,0 +1,52 @@
+# Benchmark du nettoyage de raw_data : version ligne par ligne d'origine contre version vectorisée
+# Lancer depuis la racine du projet : python -m benchmarks.bench_clean_data
+
+import time
+import pandas as pd
+from benchmarks.synthetic import synthetic_raw_data
+from src.utils.clean_data import EXCLUDED_AREAS, clean_faostat
+
+def clean_faostat_apply(df):
+    # Version d'origine de clean_data (apply ligne par ligne, replace en chaîne, isin sur une liste)
+    df = df.drop(columns=["Element", "Element Code", "Domain", "Domain Code"], errors='ignore')
+    df = df.dropna(subset=["Value"])
+    df.columns = df.columns.str.lower().str.replace(' ', '_')
+    for col in ["area", "item", "unit"]:
+        df[col] = df[col].astype(str).str.strip()
+
+    def extract_middle_year(s):
+        if len(s) == 9:
+            start = int(s[2:4])
+            end = int(s[6:])
+            return 2000 + (start + end) // 2
+        else:
+            return s
+
+    df["year"] = df["year"].apply(extract_middle_year)
+    df["item"] = df["item"].str.strip()
+    df["value"] = pd.to_numeric(df["value"].str.replace(',', '.').replace('<', '') if df["value"].dtype == "object" else df["value"], errors='coerce')
+    return df[~(df['area'].isin(list(EXCLUDED_AREAS)))]
+
+def main():
+    for scale in (1, 10, 100):
+        raw = synthetic_raw_data(scale=scale)
+
+        start = time.perf_counter()
+        before = clean_faostat_apply(raw)
+        before_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        after = clean_faostat(raw)
+        after_s = time.perf_counter() - start
+
+        # Mêmes lignes et mêmes années ; les bornes "<2.5" étaient perdues (NaN) dans la version d'origine
+        assert before.index.equals(after.index)
+        assert (before["year"].astype(str) == after["year"].astype(str)).all()
+        known = before["value"].notna()
+        assert before.loc[known, "value"].equals(after.loc[known, "value"])
+
+        print(f"{len(raw):>10} lignes ({scale:>3}x)   origine : {before_s:7.2f} s   vectorisé : {after_s:7.2f} s"
+              f"   gain : x{before_s / after_s:.1f}")
+
+if __name__ == "__main__":
+    main()
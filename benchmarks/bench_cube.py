@@ -0,0 +1,74 @@
+# Benchmark de la latence des callbacks update_map / update_top_countries_list avant et après le cube
+# Lancer depuis la racine du projet : python -m benchmarks.bench_cube
+
+import time
+import numpy as np
+import pandas as pd
+from src.utils.cube import DataCube
+
+def synthetic_clean_data(n_areas=200, n_years=24, items=None, seed=0):
+    """
+    Génère un DataFrame long au format de la table clean_data (area, item, year, value)
+    """
+    if items is None:
+        items = [
+            "Prevalence of undernourishment (percent) (3-year average)",
+            "Number of people undernourished (million) (3-year average)",
+            "Prevalence of obesity in the adult population (18 years and older) (percent)",
+            "Number of obese adults (18 years and older) (million)",
+            "Gross domestic product per capita, PPP, (constant 2021 international $)",
+            "Dietary energy supply used in the estimation of the prevalence of undernourishment (kcal/cap/day)",
+            "Average fat supply (g/cap/day) (3-year average)",
+        ]
+    rng = np.random.default_rng(seed)
+    areas = [f"Country {i:04d}" for i in range(n_areas)]
+    years = [str(2000 + i) for i in range(n_years)]
+    index = pd.MultiIndex.from_product([areas, items, years], names=["area", "item", "year"])
+    df = index.to_frame(index=False)
+    df["value"] = rng.gamma(2.0, 10.0, len(df))
+    # Quelques trous comme dans les données réelles
+    return df[rng.random(len(df)) > 0.05].reset_index(drop=True)
+
+def filter_country_values(df, indicator, year):
+    # Ancienne version des callbacks : masques booléens sur tout le DataFrame puis groupby
+    filtered_df = df[df["year"] == year].copy()
+    indicator_mask = filtered_df["item"] == indicator
+    return filtered_df[indicator_mask].groupby("area")["value"].mean().reset_index()
+
+def filter_top_countries(df, indicator, year):
+    filtered_df = df[(df["item"] == indicator) & (df["year"] == year)].copy()
+    return filtered_df.nlargest(3, "value")[["area", "value"]]
+
+def cube_top_countries(cube, indicator, year):
+    return cube.country_values(indicator, year).nlargest(3, "value")
+
+def timeit(func, *args, repeat=50):
+    # Retourne la latence moyenne en millisecondes
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(*args)
+    return (time.perf_counter() - start) / repeat * 1000
+
+def main():
+    indicator = "Number of obese adults (18 years and older) (million)"
+    for scale in (1, 10, 100):
+        df = synthetic_clean_data(n_areas=200 * scale)
+        year = df["year"].iloc[len(df) // 2]
+
+        start = time.perf_counter()
+        cube = DataCube(df)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        # Vérifier que les deux chemins donnent le même résultat
+        before = filter_country_values(df, indicator, year)
+        after = cube.country_values(indicator, year)
+        pd.testing.assert_frame_equal(before.reset_index(drop=True), after.reset_index(drop=True), check_dtype=False)
+
+        print(f"--- {len(df)} lignes ({scale}x), construction du cube : {build_ms:.1f} ms")
+        print(f"update_map                 avant : {timeit(filter_country_values, df, indicator, year):8.3f} ms"
+              f"   après : {timeit(cube.country_values, indicator, year):8.3f} ms")
+        print(f"update_top_countries_list  avant : {timeit(filter_top_countries, df, indicator, year):8.3f} ms"
+              f"   après : {timeit(cube_top_countries, cube, indicator, year):8.3f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+# Compare le téléchargement séquentiel et parallèle de get_data contre le serveur local benchmarks/fake_sources.py
+# Lancer depuis la racine du projet : python -m benchmarks.bench_fetch
+
+import os
+import sqlite3
+import tempfile
+import time
+import pandas as pd
+from benchmarks.fake_sources import start_fake_sources
+from src.utils import get_data as g
+
+def read_raw(bdd_path):
+    # Tables brutes triées (l'ordre des lignes dépend du découpage des requêtes)
+    conn = sqlite3.connect(bdd_path)
+    df = pd.read_sql('SELECT * FROM raw_data', conn)
+    df_pop = pd.read_sql('SELECT * FROM raw_pop_tot', conn)
+    conn.close()
+    return [frame.sort_values(list(frame.columns)).reset_index(drop=True) for frame in (df, df_pop)]
+
+def main(delay=0.3):
+    server, faostat_url, world_bank_url = start_fake_sources(delay=delay)
+    cache_dir = g.http_cache.cache_dir
+    durations = {}
+    tables = {}
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            for parallel in (False, True):
+                # Base et cache HTTP vides pour chaque mode : tout est téléchargé
+                mode = "parallèle" if parallel else "séquentiel"
+                bdd_path = os.path.join(tmp, f"{mode}.db")
+                g.http_cache.cache_dir = os.path.join(tmp, f"http_cache_{mode}")
+                start = time.perf_counter()
+                g.get_data(parallel=parallel, bdd_path=bdd_path, faostat_url=faostat_url, world_bank_url=world_bank_url)
+                durations[mode] = time.perf_counter() - start
+                tables[mode] = read_raw(bdd_path)
+    finally:
+        g.http_cache.cache_dir = cache_dir
+        server.shutdown()
+
+    (df_seq, pop_seq), (df_par, pop_par) = tables["séquentiel"], tables["parallèle"]
+    assert df_seq.equals(df_par) and pop_seq.equals(pop_par)
+    print(f"{len(g.items)} parties + population, latence simulée {delay * 1000:.0f} ms par requête")
+    print(f"séquentiel : {durations['séquentiel']:.2f} s   parallèle : {durations['parallèle']:.2f} s   "
+          f"({df_par.shape[0]} lignes)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# Serveur local qui imite les API FAOSTAT et Banque Mondiale pour tester le téléchargement sans réseau
+
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+AREAS = [(f"{i:03d}", f"Country {i:03d}") for i in range(200)]
+
+# Groupes et domaines FAOSTAT (date de mise à jour lue par get_data.faostat_release)
+DOMAINS = {
+    "P": [{"code": "QCL", "label": "Crops and livestock products", "date_update": "2025-03-01"}],
+    "D": [{"code": "FS", "label": "Suite of Food Security Indicators", "date_update": "2025-07-01"}],
+}
+
+def faostat_payload(items, years):
+    # Réponse au format output_type=objects de l'API FAOSTAT
+    labels = ["Domain Code", "Domain", "Area Code (M49)", "Area", "Element Code", "Element",
+              "Item Code", "Item", "Year Code", "Year", "Unit", "Value"]
+    data = []
+    for item in items:
+        for year in years:
+            for code, area in AREAS:
+                data.append({
+                    "Domain Code": "FS", "Domain": "Suite of Food Security Indicators",
+                    "Area Code (M49)": code, "Area": area, "Element Code": "6120", "Element": "Value",
+                    # Code et libellé de la période de 3 ans (différents du code year3 de la requête)
+                    "Item Code": item, "Item": f"Item {item}", "Year Code": f"{year[:4]}{int(year[:4]) + 2}",
+                    "Year": f"{year[:4]}-{int(year[:4]) + 2}",
+                    "Unit": "%", "Value": str((int(code) + int(year[:4])) % 97 / 3),
+                })
+    return {"metadata": {"dsd": [{"label": label} for label in labels]}, "data": data}
+
+def world_bank_payload(indicator, date_range, page=1, per_page=20000):
+    start, end = (int(y) for y in date_range.split(":"))
+    rows = [
+        {"indicator": {"id": indicator, "value": "Population, total"},
+         "country": {"id": code, "value": area}, "countryiso3code": f"C{code}",
+         "date": str(year), "value": 1000 * int(code) + year, "unit": "", "obs_status": "", "decimal": 0}
+        for year in range(end, start - 1, -1) for code, area in AREAS
+    ]
+    pages = max(1, -(-len(rows) // per_page))
+    meta = {"page": page, "pages": pages, "per_page": per_page, "total": len(rows), "lastupdated": "2025-07-01"}
+    return [meta, rows[(page - 1) * per_page:page * per_page]]
+
+class FakeSourcesHandler(BaseHTTPRequestHandler):
+    delay = 0.0
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        time.sleep(self.delay)
+        if url.path == "/faostat/groups":
+            body = {"data": [{"code": code} for code in DOMAINS]}
+        elif url.path.startswith("/faostat/domains/"):
+            body = {"data": DOMAINS.get(url.path.rsplit("/", 1)[-1], [])}
+        elif url.path.startswith("/faostat/data/"):
+            body = faostat_payload(query.get("item", []), query.get("year3", []))
+        elif url.path.startswith("/wb/country/all/indicator/"):
+            body = world_bank_payload(
+                url.path.rsplit("/", 1)[-1], query.get("date", ["2000:2023"])[0],
+                int(query.get("page", ["1"])[0]), int(query.get("per_page", ["50"])[0]),
+            )
+        else:
+            self.send_error(404)
+            return
+        content = json.dumps(body).encode()
+        # Revalidation conditionnelle comme les vraies API (ETag)
+        etag = '"%s"' % hashlib.sha1(content).hexdigest()
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        pass
+
+def start_fake_sources(delay=0.0, port=0):
+    """
+    Démarre le serveur dans un thread et retourne (server, faostat_url, world_bank_url)
+    """
+    handler = type("Handler", (FakeSourcesHandler,), {"delay": delay})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    return server, base + "/faostat/", base + "/wb/"
@@ -0,0 +1,254 @@
+# Test de charge : N utilisateurs virtuels changent l'année et l'indicateur comme sur le dashboard,
+# via /_dash-update-component, contre une application lancée localement (gunicorn ou serveur de développement)
+# Lancer depuis la racine du projet : python -m benchmarks.load_test --users 20 --duration 30 [--workers 4]
+# Sans base faostat_data.db, le dashboard est lancé sur des données synthétiques (benchmarks/synthetic.py).
+
+import argparse
+import json
+import os
+import random
+import socket
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+import requests
+from benchmarks.synthetic import SCALES, synthetic_tables
+from src.components.filter_component import create_indicator_options
+from src.components.gdp_bins_component import DEFAULT_BINS_COUNT, DEFAULT_BINS_MODE, format_edges
+from config import GDP_BINS
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_INDICATOR = "Number of obese adults (18 years and older) (million)"
+
+READY_OUTPUTS = [("year-dropdown", "options"), ("year-dropdown", "value"), ("trend-graph", "figure"),
+                 ("loading-status", "children"), ("loading-poll", "disabled")]
+DASHBOARD_OUTPUTS = [("map-graph", "figure"), ("top-countries-list", "children"), ("histogram-graph", "figure"),
+                     ("filled-area-graph", "figure"), ("figure-layouts", "data")]
+# Panneau des classes de PIB et animation laissés à leurs valeurs par défaut
+PANEL_INPUTS = [("gdp-bins-mode", "value", DEFAULT_BINS_MODE), ("gdp-bins-count", "value", DEFAULT_BINS_COUNT),
+                ("gdp-bins-edges", "value", format_edges(GDP_BINS)), ("animate-toggle", "value", [])]
+
+def callback_body(outputs, inputs, state=(), changed=()):
+    """
+    Corps d'une requête /_dash-update-component tel que l'envoie le navigateur
+    """
+    return {
+        "output": "...".join(f"{id_}.{prop}" for id_, prop in outputs).join(["..", ".."]),
+        "outputs": [{"id": id_, "property": prop} for id_, prop in outputs],
+        "inputs": [{"id": id_, "property": prop, "value": value} for id_, prop, value in inputs],
+        "state": [{"id": id_, "property": prop, "value": value} for id_, prop, value in state],
+        "changedPropIds": list(changed),
+    }
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def has_database(path):
+    if not os.path.exists(path):
+        return False
+    conn = sqlite3.connect(path)
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+    conn.close()
+    return {"clean_data", "clean_pop_tot"} <= tables or {"raw_data", "raw_pop_tot"} <= tables
+
+def synthetic_database(scale, workdir):
+    """
+    Écrit les tables brutes synthétiques dans workdir/faostat_data.db (nettoyées au démarrage du dashboard)
+    """
+    raw_data, raw_pop = synthetic_tables(scale)
+    conn = sqlite3.connect(os.path.join(workdir, "faostat_data.db"))
+    raw_data.to_sql("raw_data", conn, index=False)
+    raw_pop.to_sql("raw_pop_tot", conn, index=False)
+    conn.close()
+
+def start_server(server, workdir, port, workers, threads):
+    """
+    Lance le dashboard dans un sous-processus (dossier courant workdir, qui contient faostat_data.db)
+    """
+    env = dict(os.environ, PYTHONPATH=PROJECT_DIR, WEB_BIND=f"127.0.0.1:{port}",
+               WEB_WORKERS=str(workers), WEB_THREADS=str(threads))
+    if server == "gunicorn":
+        command = [sys.executable, "-m", "gunicorn", "-c", os.path.join(PROJECT_DIR, "gunicorn.conf.py"), "wsgi:server"]
+    else:
+        command = [sys.executable, "-c",
+                   "from src.pages.home import app, bootstrap; bootstrap.start(); "
+                   f"app.run(host='127.0.0.1', port={port}, debug=False, threaded=True)"]
+    return subprocess.Popen(command, cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+def wait_ready(url, process, timeout):
+    """
+    Attend que /ready réponde 200 (données chargées)
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f"le serveur s'est arrêté (code {process.returncode})")
+        try:
+            if requests.get(f"{url}/ready", timeout=2).status_code == 200:
+                return
+        except requests.ConnectionError:
+            pass
+        time.sleep(0.5)
+    raise TimeoutError(f"{url}/ready ne répond pas après {timeout} s")
+
+class Recorder:
+    """
+    Latences et tailles des réponses par callback, partagées par les utilisateurs virtuels
+    """
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.sizes = defaultdict(list)
+        self.errors = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def record(self, name, seconds, response):
+        with self._lock:
+            if response is None or response.status_code != 200:
+                self.errors[name] += 1
+            else:
+                self.latencies[name].append(seconds)
+                self.sizes[name].append(len(response.content))
+
+    def report(self, duration):
+        report = {}
+        for name in sorted(set(self.latencies) | set(self.errors)):
+            latencies = sorted(self.latencies[name])
+            stats = {"requests": len(latencies), "errors": self.errors[name],
+                     "throughput_rps": round(len(latencies) / duration, 2)}
+            if latencies:
+                cuts = statistics.quantiles(latencies, n=100, method="inclusive") if len(latencies) > 1 else latencies * 99
+                stats.update({
+                    "mean_ms": round(statistics.fmean(latencies) * 1000, 2),
+                    "p50_ms": round(cuts[49] * 1000, 2),
+                    "p95_ms": round(cuts[94] * 1000, 2),
+                    "p99_ms": round(cuts[98] * 1000, 2),
+                    "max_ms": round(latencies[-1] * 1000, 2),
+                    "mean_bytes": round(statistics.fmean(self.sizes[name])),
+                })
+            report[name] = stats
+        return report
+
+def virtual_user(url, recorder, deadline, think, seed):
+    """
+    Un utilisateur : ouvre la page (callback de chargement puis premier affichage), puis change l'année
+    (souvent l'année voisine, comme en parcourant la liste) ou l'indicateur jusqu'à la fin du test
+    """
+    rng = random.Random(seed)
+    session = requests.Session()
+    indicators = [option["value"] for option in create_indicator_options()]
+
+    def post(name, body):
+        start = time.perf_counter()
+        try:
+            response = session.post(f"{url}/_dash-update-component", json=body, timeout=60)
+        except requests.RequestException:
+            response = None
+        recorder.record(name, time.perf_counter() - start, response)
+        return response.json()["response"] if response is not None and response.status_code == 200 else None
+
+    ready = post("show_data_when_ready", callback_body(READY_OUTPUTS, [("loading-poll", "n_intervals", 1)],
+                                                      changed=["loading-poll.n_intervals"]))
+    if ready is None:
+        return
+    years = [option["value"] for option in ready["year-dropdown"]["options"]]
+    year_index, indicator, layouts = 0, DEFAULT_INDICATOR, {}
+    changed = "year-dropdown.value"
+    name = "update_dashboard[initial]"
+
+    while time.monotonic() < deadline:
+        body = callback_body(DASHBOARD_OUTPUTS,
+                             [("indicator-dropdown", "value", indicator), ("year-dropdown", "value", years[year_index])]
+                             + PANEL_INPUTS,
+                             state=[("figure-layouts", "data", layouts)], changed=[changed])
+        response = post(name, body)
+        if response is not None and "figure-layouts" in response:
+            layouts = response["figure-layouts"]["data"]
+        if think:
+            time.sleep(rng.expovariate(1 / think))
+
+        # Action suivante : année voisine (60 %), autre année (20 %) ou autre indicateur (20 %)
+        action = rng.random()
+        if action < 0.8:
+            if action < 0.6:
+                year_index = min(max(year_index + rng.choice((-1, 1)), 0), len(years) - 1)
+            else:
+                year_index = rng.randrange(len(years))
+            changed, name = "year-dropdown.value", "update_dashboard[year]"
+        else:
+            indicator = rng.choice([value for value in indicators if value != indicator])
+            changed, name = "indicator-dropdown.value", "update_dashboard[indicator]"
+
+def run_load(url, users, duration, think, seed=0):
+    recorder = Recorder()
+    deadline = time.monotonic() + duration
+    start = time.perf_counter()
+    threads = [threading.Thread(target=virtual_user, args=(url, recorder, deadline, think, seed + i), daemon=True)
+               for i in range(users)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return recorder.report(time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=10, help="Nombre d'utilisateurs virtuels simultanés")
+    parser.add_argument("--duration", type=float, default=30, help="Durée du test (secondes)")
+    parser.add_argument("--think", type=float, default=0.0, help="Temps de réflexion moyen entre deux actions (secondes)")
+    parser.add_argument("--server", choices=["gunicorn", "dev"], default="gunicorn")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--url", help="Tester un dashboard déjà lancé au lieu d'en démarrer un")
+    parser.add_argument("--scale", type=int, default=1, choices=sorted(SCALES),
+                        help="Taille des données synthétiques (sans faostat_data.db)")
+    parser.add_argument("--output", help="Fichier JSON des résultats")
+    args = parser.parse_args()
+
+    process, tmpdir, url = None, None, args.url
+    data = "serveur existant"
+    try:
+        if url is None:
+            if has_database(os.path.join(PROJECT_DIR, "faostat_data.db")):
+                workdir, data = PROJECT_DIR, "faostat_data.db"
+            else:
+                tmpdir = tempfile.TemporaryDirectory(prefix="load-test-")
+                workdir, data = tmpdir.name, f"synthétiques {args.scale}x"
+                synthetic_database(args.scale, workdir)
+            port = free_port()
+            url = f"http://127.0.0.1:{port}"
+            process = start_server(args.server, workdir, port, args.workers, args.threads)
+        wait_ready(url, process, timeout=600)
+
+        print(f"{args.users} utilisateurs pendant {args.duration:.0f} s contre {url} "
+              f"({args.server if process else 'externe'}, {args.workers} worker(s) x {args.threads} threads, données {data})")
+        report = run_load(url, args.users, args.duration, args.think)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+        if tmpdir is not None:
+            tmpdir.cleanup()
+
+    print(f"{'callback':<30} {'req':>6} {'err':>4} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'octets':>9}")
+    for name, stats in report.items():
+        print(f"{name:<30} {stats['requests']:>6} {stats['errors']:>4} {stats['throughput_rps']:>8.1f} "
+              f"{stats.get('p50_ms', 0):>8.1f} {stats.get('p95_ms', 0):>8.1f} {stats.get('p99_ms', 0):>8.1f} "
+              f"{stats.get('mean_bytes', 0):>9}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"users": args.users, "duration_s": args.duration, "think_s": args.think, "server": args.server,
+                       "workers": args.workers, "threads": args.threads, "data": data, "callbacks": report}, f, indent=2)
+        print(f"Résultats écrits : {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+# Suite de benchmarks : nettoyage, préparation des données, construction des figures et latence des callbacks
+# sur les jeux synthétiques 1x, 10x et 100x (benchmarks/synthetic.py). Les résultats sont écrits en JSON.
+# Lancer depuis la racine du projet : python -m benchmarks.suite [--scales 1 10] [--output fichier.json]
+#                                                              [--compare ancien.json]
+
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timezone
+from benchmarks.synthetic import SCALES, synthetic_tables
+from src.components.filled_area import create_filled_area_figure, prepare_filled_area_data
+from src.components.gdp_bins_component import DEFAULT_BINS_COUNT, DEFAULT_BINS_MODE, format_edges, selected_gdp_bins
+from src.components.histogram_component import create_histo_figure, prepare_histo_data
+from src.components.map_component import create_choropleth
+from src.components.top_3 import update_top_countries
+from src.pages.country import create_country_figure
+from src.components.trend_line import prepare_trend_data
+from src.utils.bootstrap import Bootstrap
+from src.utils.clean_data import clean_data
+from src.utils.country_index import CountryIndex
+from src.utils.cube import DataCube
+from src.utils.data_access import load_clean_tables
+from src.utils.gdp_aggregates import GdpBinner, country_gdp_frame, load_gdp_aggregates
+from src.utils.pivot_cache import YearPivotCache
+import src.pages.home as home
+
+RESULTS_DIR = os.path.join("benchmarks", "results")
+
+INDICATOR = "Number of obese adults (18 years and older) (million)"
+
+# Callback unique de la carte, du top 3, de l'histogramme et du filled area plot (voir src/pages/home.py)
+DASHBOARD_OUTPUTS = [("map-graph", "figure"), ("top-countries-list", "children"), ("histogram-graph", "figure"),
+                     ("filled-area-graph", "figure"), ("figure-layouts", "data")]
+
+def measure(func, repeat):
+    """
+    Appelle func repeat fois et retourne les statistiques de latence en millisecondes
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - start) * 1000)
+    return {
+        "repeat": repeat,
+        "mean_ms": round(statistics.fmean(times), 3),
+        "median_ms": round(statistics.median(times), 3),
+        "min_ms": round(min(times), 3),
+        "max_ms": round(max(times), 3),
+    }
+
+def dashboard_request(indicator, year, bins_mode=DEFAULT_BINS_MODE, bins_count=DEFAULT_BINS_COUNT,
+                      animate=False, changed="year-dropdown.value"):
+    """
+    Corps d'une requête /_dash-update-component pour le callback du dashboard (figures complètes)
+    """
+    return {
+        "output": "...".join(f"{id_}.{prop}" for id_, prop in DASHBOARD_OUTPUTS).join(["..", ".."]),
+        "outputs": [{"id": id_, "property": prop} for id_, prop in DASHBOARD_OUTPUTS],
+        "inputs": [{"id": "indicator-dropdown", "property": "value", "value": indicator},
+                   {"id": "year-dropdown", "property": "value", "value": year},
+                   {"id": "gdp-bins-mode", "property": "value", "value": bins_mode},
+                   {"id": "gdp-bins-count", "property": "value", "value": bins_count},
+                   {"id": "gdp-bins-edges", "property": "value", "value": format_edges(home.GDP_BINS)},
+                   {"id": "animate-toggle", "property": "value", "value": ["animate"] if animate else []}],
+        "state": [{"id": "figure-layouts", "property": "data", "value": {}}],
+        "changedPropIds": [changed],
+    }
+
+def prepare_database(scale, workdir):
+    """
+    Écrit les tables brutes synthétiques dans workdir/faostat_data.db et retourne leur nombre de lignes
+    """
+    raw_data, raw_pop = synthetic_tables(scale)
+    conn = sqlite3.connect(os.path.join(workdir, "faostat_data.db"))
+    raw_data.to_sql("raw_data", conn, index=False)
+    raw_pop.to_sql("raw_pop_tot", conn, index=False)
+    conn.close()
+    return {"raw_data": len(raw_data), "raw_pop_tot": len(raw_pop)}
+
+def bench_components(df, df_pop, aggregates, year, repeat):
+    """
+    Fonctions de préparation des données et de construction des figures sur les tables nettoyées
+    (aggregates : agrégats par classe de PIB matérialisés par clean_data)
+    """
+    cube = DataCube(df)
+    gdp_bins = home.GDP_BINS
+    binner = GdpBinner(country_gdp_frame(df, df_pop))
+
+    def change_bins(mode, count):
+        # Nouvelles classes choisies dans le panneau : bornes, puis données de l'histogramme et du filled area plot
+        edges = selected_gdp_bins(binner, year, mode, count, format_edges(gdp_bins))
+        binner.histo_data(year, edges)
+        binner.filled_area_data(year, edges)
+    histo_data = prepare_histo_data(df, year, gdp_bins=gdp_bins)
+    country_data = cube.country_values(INDICATOR, year)
+
+    # Fiche d'un pays : lecture dans l'index par pays, comparée à un filtre sur toute la table longue
+    countries = CountryIndex(df, df_pop)
+    area = cube.areas[len(cube.areas) // 2]
+    series, population = countries.country_series(area), countries.country_population(area)
+    def scan_country():
+        rows = df[df["area"] == area]
+        rows.groupby(["item", "year"], observed=True)["value"].mean()
+        df_pop[df_pop["area_key"] == rows["area_key"].iloc[0]]
+    return {
+        "prepare_trend_data": measure(lambda: prepare_trend_data(df), repeat),
+        "prepare_histo_data": measure(lambda: prepare_histo_data(df, year, gdp_bins=gdp_bins), repeat),
+        # Pivot de l'année lu dans le cube (chemin du dashboard, sans le cache entre deux appels)
+        "prepare_histo_data[cube]": measure(
+            lambda: prepare_histo_data(df, year, gdp_bins=gdp_bins, pivots=YearPivotCache(cube)), repeat),
+        "prepare_filled_area_data": measure(lambda: prepare_filled_area_data(df, df_pop, year, gdp_bins), repeat),
+        # Lignes de l'année lues dans les agrégats (chemin du dashboard)
+        "prepare_histo_data[agrégats]": measure(
+            lambda: prepare_histo_data(df, year, gdp_bins=gdp_bins, aggregates=aggregates), repeat),
+        "prepare_filled_area_data[agrégats]": measure(
+            lambda: prepare_filled_area_data(df, df_pop, year, gdp_bins, aggregates=aggregates), repeat),
+        "gdp_binner": measure(lambda: GdpBinner(country_gdp_frame(df, df_pop)), repeat),
+        "gdp_bins_change[fixed]": measure(lambda: change_bins("fixed", DEFAULT_BINS_COUNT), repeat),
+        "gdp_bins_change[quantile]": measure(lambda: change_bins("quantile", 12), repeat),
+        "gdp_bins_change[log]": measure(lambda: change_bins("log", 12), repeat),
+        "update_top_countries": measure(lambda: update_top_countries(cube, INDICATOR, year), repeat),
+        "create_choropleth": measure(lambda: create_choropleth(country_data, INDICATOR, year), repeat),
+        "create_histo_figure": measure(lambda: create_histo_figure(histo_data, year, gdp_bins), repeat),
+        "create_filled_area_figure": measure(lambda: create_filled_area_figure(df, df_pop, year, gdp_bins), repeat),
+        "country_index": measure(lambda: CountryIndex(df, df_pop), repeat),
+        "country_series[index]": measure(
+            lambda: (countries.country_series(area), countries.country_population(area)), repeat),
+        "country_series[scan]": measure(scan_country, repeat),
+        "create_country_figure": measure(
+            lambda: create_country_figure(area, series, population, countries.item_units()), repeat),
+    }
+
+def bench_callbacks(workdir, years, repeat):
+    """
+    Latence de bout en bout du callback du dashboard à travers le client de test Flask : premier appel par année
+    (figures construites) puis appels suivants (figures servies par le cache)
+    """
+    home.bootstrap = Bootstrap(bdd_path=os.path.join(workdir, "faostat_data.db"))
+    home.bootstrap.start(background=False)
+    client = home.app.server.test_client()
+
+    def post(year):
+        response = client.post("/_dash-update-component", json=dashboard_request(INDICATOR, year))
+        assert response.status_code == 200, response.status_code
+
+    years = list(years)
+    cold = measure(lambda: post(years.pop()), min(repeat, len(years)))
+    post(years[0])
+    warm = measure(lambda: post(years[0]), repeat)
+
+    # Changement du nombre de classes (quantiles) : histogramme et filled area plot reconstruits à chaque appel
+    counts = iter(range(2, 2 + repeat))
+    def change_bins():
+        body = dashboard_request(INDICATOR, years[0], "quantile", next(counts), changed="gdp-bins-count.value")
+        response = client.post("/_dash-update-component", json=body)
+        assert response.status_code == 200, response.status_code
+    bins = measure(change_bins, repeat)
+
+    # Figures animées (toutes les années) : premier appel par indicateur (images assemblées à partir des figures
+    # annuelles), puis appels servis par le cache ; taille de la réponse complète
+    indicators = [option["value"] for option in home.create_indicator_options()]
+    payload = {}
+    def animate(indicator):
+        body = dashboard_request(indicator, years[0], animate=True, changed="animate-toggle.value")
+        response = client.post("/_dash-update-component", json=body)
+        assert response.status_code == 200, response.status_code
+        payload[indicator] = len(response.data)
+    animation_cold = measure(lambda: animate(indicators.pop()), min(repeat, len(indicators)))
+    animation_warm = measure(lambda: animate(INDICATOR), repeat)
+    return {"bootstrap": {phase: round(seconds * 1000, 3) for phase, seconds in home.bootstrap.timings.items()},
+            "payload_bytes": {"dashboard_callback[animation]": payload[INDICATOR]},
+            "dashboard_callback[cold]": cold,
+            "dashboard_callback[warm]": warm,
+            "dashboard_callback[bins]": bins,
+            "dashboard_callback[animation cold]": animation_cold,
+            "dashboard_callback[animation warm]": animation_warm}
+
+def run_scale(scale, repeat):
+    result = {"scale": scale}
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix=f"bench-{scale}x-") as workdir:
+        result["rows"] = prepare_database(scale, workdir)
+        # clean_data écrit faostat_data.db et snapshot/ dans le dossier courant
+        os.chdir(workdir)
+        try:
+            start = time.perf_counter()
+            clean_data()
+            result["clean_data_ms"] = round((time.perf_counter() - start) * 1000, 3)
+
+            df, df_pop = load_clean_tables("faostat_data.db")
+            conn = sqlite3.connect("faostat_data.db")
+            aggregates = load_gdp_aggregates(conn, home.GDP_BINS)
+            conn.close()
+            result["rows"]["clean_data"] = len(df)
+            years = [int(year) for year in sorted(df["year"].unique())]
+            year = years[len(years) // 2]
+
+            result["benchmarks"] = bench_components(df, df_pop, aggregates, year, repeat)
+            callbacks = bench_callbacks(workdir, years, repeat)
+            result["bootstrap_ms"] = callbacks.pop("bootstrap")
+            result["payload_bytes"] = callbacks.pop("payload_bytes")
+            result["benchmarks"].update(callbacks)
+        finally:
+            os.chdir(cwd)
+    return result
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(previous, current):
+    """
+    Affiche le rapport de latence (moyenne) entre deux fichiers de résultats, benchmark par benchmark
+    """
+    old = {run["scale"]: run for run in previous["runs"]}
+    for run in current["runs"]:
+        if run["scale"] not in old:
+            continue
+        print(f"--- {run['scale']}x : comparaison avec {previous.get('git_commit')} ({previous['created']})")
+        before = old[run["scale"]]
+        pairs = [("clean_data", before.get("clean_data_ms"), run.get("clean_data_ms"))]
+        pairs += [(name, before["benchmarks"][name]["mean_ms"], stats["mean_ms"])
+                  for name, stats in run["benchmarks"].items() if name in before["benchmarks"]]
+        for name, old_ms, new_ms in pairs:
+            if old_ms and new_ms:
+                print(f"{name:<36} {old_ms:10.3f} ms -> {new_ms:10.3f} ms   x{old_ms / new_ms:.2f}")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scales", type=int, nargs="+", default=sorted(SCALES), choices=sorted(SCALES))
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--output", help="Fichier JSON des résultats (par défaut benchmarks/results/<date>.json)")
+    parser.add_argument("--compare", help="Fichier JSON d'un run précédent à comparer")
+    args = parser.parse_args()
+
+    created = datetime.now(timezone.utc)
+    results = {
+        "created": created.isoformat(timespec="seconds"),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "runs": [],
+    }
+    for scale in args.scales:
+        run = run_scale(scale, args.repeat)
+        results["runs"].append(run)
+        print(f"--- {scale}x : {run['rows']['raw_data']} lignes brutes, {run['rows']['clean_data']} lignes nettoyées")
+        print(f"{'clean_data':<36} {run['clean_data_ms']:10.3f} ms")
+        for name, stats in run["benchmarks"].items():
+            print(f"{name:<36} {stats['mean_ms']:10.3f} ms (min {stats['min_ms']:.3f} ms, {stats['repeat']} appels)")
+        for name, size in run["payload_bytes"].items():
+            print(f"{name:<36} {size / 1024:10.1f} Ko (réponse)")
+
+    output = args.output or os.path.join(RESULTS_DIR, created.strftime("%Y%m%d-%H%M%S") + ".json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Résultats écrits : {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), results)
+
+if __name__ == "__main__":
+    main()
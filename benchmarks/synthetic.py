@@ -0,0 +1,119 @@
+# Générateur déterministe de données synthétiques au format des tables brutes (raw_data, raw_pop_tot)
+
+import numpy as np
+import pandas as pd
+from src.utils.country_codes import load_country_codes
+
+# (code, libellé, unité, moyenne sur 3 ans)
+ITEMS = [
+    (21004, "Prevalence of undernourishment (percent) (3-year average)", "%", True),
+    (21001, "Number of people undernourished (million) (3-year average)", "million No", True),
+    (21041, "Prevalence of obesity in the adult population (18 years and older) (percent)", "%", False),
+    (21042, "Number of obese adults (18 years and older) (million)", "million No", False),
+    (210420, "Prevalence of anemia among women of reproductive age (15-49 years) (percent)", "%", False),
+    (22013, "Gross domestic product per capita, PPP, (constant 2021 international $)", "Int$", False),
+    (220001, "Dietary energy supply used in the estimation of the prevalence of undernourishment (kcal/cap/day)", "kcal/cap/d", False),
+    (21061, "Average fat supply (g/cap/day) (3-year average)", "g/cap/d", True),
+]
+
+# Dimensions (nombre de pays, nombre d'indicateurs, années) des jeux 1x, 10x et 100x de la suite de benchmarks
+SCALES = {
+    1: {"n_areas": 200, "n_items": 8, "years": range(2000, 2024)},
+    10: {"n_areas": 800, "n_items": 16, "years": range(1994, 2024)},
+    100: {"n_areas": 2000, "n_items": 32, "years": range(1964, 2024)},
+}
+
+REGIONS = ["World", "Europe", "Asia", "Africa", "Oceania", "South America"]
+REGION_CODES = ["001", "150", "142", "002", "009", "005"]
+
+def synthetic_areas(n_areas):
+    """
+    Retourne (noms, codes M49, codes ISO-3) : les vrais pays de la table des codes puis des pays fictifs
+    (codes à partir de 1000, absents de la carte)
+    """
+    countries = load_country_codes().dropna(subset=["iso3"]).head(n_areas)
+    extra = n_areas - len(countries)
+    names = list(countries["name"]) + [f"Country {i:05d}" for i in range(extra)]
+    m49 = list(countries["m49"]) + [1000 + i for i in range(extra)]
+    iso3 = list(countries["iso3"]) + [f"X{i:05d}" for i in range(extra)]
+    return names, m49, iso3
+
+def synthetic_items(n_items):
+    """
+    Retourne les indicateurs réels puis des indicateurs fictifs (codes à partir de 900000), un sur deux en moyenne sur 3 ans
+    """
+    extra = [(900000 + i, f"Synthetic indicator {i:03d} (index)", "index", i % 2 == 0)
+             for i in range(max(0, n_items - len(ITEMS)))]
+    return ITEMS[:n_items] + extra
+
+def synthetic_raw_data(scale=1, n_areas=200, years=range(2000, 2024), seed=0, n_items=len(ITEMS)):
+    """
+    Génère un DataFrame au format de raw_data (colonnes FAOSTAT, valeurs en texte avec des bornes "<2.5")
+
+    Args:
+        scale: Facteur de taille (multiplie le nombre de pays)
+        n_items: Nombre d'indicateurs (des indicateurs fictifs complètent les vrais)
+    """
+    rng = np.random.default_rng(seed)
+    items = synthetic_items(n_items)
+    codes_item = np.array([code for code, _, _, _ in items])
+    names, m49, _ = synthetic_areas(n_areas * scale)
+    areas = names + REGIONS
+    codes = [f"{code:03d}" for code in m49] + REGION_CODES
+    years = list(years)
+    n = len(areas) * len(items) * len(years)
+
+    area_idx = np.repeat(np.arange(len(areas)), len(items) * len(years))
+    item_idx = np.tile(np.repeat(np.arange(len(items)), len(years)), len(areas))
+    year = np.tile(np.array(years), len(areas) * len(items))
+    averaged = np.array([avg for _, _, _, avg in items])[item_idx]
+
+    values = rng.gamma(2.0, 10.0, n)
+    values[codes_item[item_idx] == 22013] *= 1000  # PIB par habitant
+    text = np.char.mod("%.2f", values).astype(object)
+    text[np.isin(codes_item[item_idx], [21004, 21001]) & (rng.random(n) < 0.2)] = "<2.5"
+    text[rng.random(n) < 0.03] = None
+
+    year_text = np.where(averaged, np.char.add(np.char.add((year - 1).astype(str), "-"), (year + 1).astype(str)), year.astype(str))
+    df = pd.DataFrame({
+        "Domain Code": "FS",
+        "Domain": "Suite of Food Security Indicators",
+        "Area Code (M49)": np.array(codes, dtype=object)[area_idx],
+        "Area": np.array(areas, dtype=object)[area_idx],
+        "Element Code": 6120,
+        "Element": "Value",
+        "Item Code": codes_item[item_idx],
+        "Item": np.array([label for _, label, _, _ in items], dtype=object)[item_idx],
+        "Year Code": np.char.add(year.astype(str), "3"),
+        "Year": year_text,
+        "Unit": np.array([unit for _, _, unit, _ in items], dtype=object)[item_idx],
+        "Value": text,
+    })
+    # Les moyennes sur 3 ans commencent un an après la première année et quelques lignes manquent
+    keep = ~(averaged & (year == years[0])) & (rng.random(n) > 0.05)
+    return df[keep].reset_index(drop=True)
+
+def synthetic_raw_pop(scale=1, n_areas=200, years=range(2000, 2024), seed=0):
+    """
+    Génère un DataFrame au format de raw_pop_tot (country.value, date, value, countryiso3code)
+    """
+    rng = np.random.default_rng(seed)
+    names, _, iso3 = synthetic_areas(n_areas * scale)
+    areas = names + REGIONS
+    # Les agrégats de la Banque Mondiale ont des codes qui ne sont pas des pays
+    iso3 = iso3 + [f"R{i:02d}" for i in range(len(REGIONS))]
+    years = list(years)
+    return pd.DataFrame({
+        "country.value": np.repeat(np.array(areas, dtype=object), len(years)),
+        "countryiso3code": np.repeat(np.array(iso3, dtype=object), len(years)),
+        "date": np.tile(np.array([str(y) for y in years], dtype=object), len(areas)),
+        "value": rng.integers(100_000, 1_000_000_000, len(areas) * len(years)),
+    })
+
+def synthetic_tables(scale=1, seed=0):
+    """
+    Retourne (raw_data, raw_pop_tot) aux dimensions du jeu 1x, 10x ou 100x (voir SCALES)
+    """
+    dims = SCALES[scale]
+    return (synthetic_raw_data(n_areas=dims["n_areas"], years=dims["years"], seed=seed, n_items=dims["n_items"]),
+            synthetic_raw_pop(n_areas=dims["n_areas"], years=dims["years"], seed=seed))
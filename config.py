@@ -0,0 +1,42 @@
+import os
+
+# Source des données du dashboard :
+# - "memory" : tables nettoyées chargées au démarrage dans un cube NumPy (src/utils/cube.py)
+# - "sqlite" : requêtes paramétrées sur la base indexée, sans tout charger (src/utils/data_access.py)
+DATA_BACKEND = os.environ.get("DATA_BACKEND", "memory")
+
+# Base sqlite3 contenant les tables brutes et nettoyées
+BDD_PATH = os.environ.get("BDD_PATH", "faostat_data.db")
+
+# Adresses des API FAOSTAT et Banque Mondiale utilisées par get_data (modifiables pour tester contre un serveur local,
+# voir benchmarks/fake_sources.py)
+FAOSTAT_URL = os.environ.get("FAOSTAT_URL", "https://faostatservices.fao.org/api/v1/")
+WORLD_BANK_URL = os.environ.get("WORLD_BANK_URL", "https://api.worldbank.org/v2/")
+
+# Intervalle (en secondes) entre deux vérifications des fichiers de données par le dashboard :
+# si la base ou l'instantané a changé, les données sont rechargées et le cache des figures est vidé
+DATA_CHECK_INTERVAL = float(os.environ.get("DATA_CHECK_INTERVAL", "30"))
+
+# Précalcul des figures (carte, histogramme, filled area) après chaque chargement des données
+WARM_FIGURES = os.environ.get("WARM_FIGURES", "1") == "1"
+
+# Bornes des classes de PIB par habitant de l'histogramme et du filled area plot : les agrégats par année et par classe
+# sont matérialisés dans la base par clean_data pour ces bornes (src/utils/gdp_aggregates.py)
+GDP_BINS = [0, 2500, 5000, 7500, 10000, 15000, 20000, 50000, 75000, 1e6]
+
+# Mode clientside : les données compactes sont envoyées une fois au navigateur et les graphiques sont mis à jour
+# par les callbacks JavaScript de assets/dashboard.js, sans aller-retour serveur à chaque changement de filtre
+CLIENTSIDE = os.environ.get("CLIENTSIDE", "0") == "1"
+
+# Serveur de production (gunicorn.conf.py) : adresse, nombre de processus et de threads par processus
+WEB_BIND = os.environ.get("WEB_BIND", "0.0.0.0:8050")
+WEB_WORKERS = int(os.environ.get("WEB_WORKERS", str(os.cpu_count() or 1)))
+WEB_THREADS = int(os.environ.get("WEB_THREADS", "4"))
+
+# Profilage des callbacks lents (désactivé à 0) : chaque callback est exécuté sous cProfile et le profil
+# des appels de plus de PROFILE_SLOW_MS millisecondes est écrit dans PROFILE_DIR (lecture : python -m pstats)
+PROFILE_SLOW_MS = float(os.environ.get("PROFILE_SLOW_MS", "0"))
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "profiles")
+
+# Dossier des fichiers statiques servis par Dash (callbacks clientside)
+ASSETS_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
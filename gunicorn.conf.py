@@ -0,0 +1,12 @@
+# Configuration du serveur de production : gunicorn -c gunicorn.conf.py wsgi:server
+from config import WEB_BIND, WEB_WORKERS, WEB_THREADS
+
+bind = WEB_BIND
+workers = WEB_WORKERS
+# Chaque worker sert plusieurs requêtes en parallèle avec un pool de threads
+worker_class = "gthread"
+threads = WEB_THREADS
+
+# L'application (et donc les données) est chargée une fois dans le maître avant le fork des workers :
+# la mémoire par worker reste à peu près constante quand on ajoute des workers
+preload_app = True
@@ -1,9 +1,11 @@
-from dash import html
-from src.pages.home import app
+import time
+start = time.perf_counter()
 
-# Titre de la page
-app.title = "Dashboard"
+from src.pages.home import app, bootstrap
 
-# Lancer le serveur
+# Lancer le serveur de développement (en production : gunicorn -c gunicorn.conf.py wsgi:server)
 if __name__ == "__main__":
+    # Chargement des données en arrière-plan : le serveur répond tout de suite (voir /ready)
+    bootstrap.start()
+    print(f"[bootstrap] import de l'application : {(time.perf_counter() - start) * 1000:.0f} ms")
     app.run(debug=False)
@@ -0,0 +1,108 @@
+import base64
+import numpy as np
+
+# Durée d'affichage de chaque année pendant la lecture (millisecondes)
+FRAME_DURATION_MS = 700
+TRANSITION_MS = 300
+
+def array_values(value):
+    """
+    Valeurs numériques d'un tableau de figure JSON : liste, ou tableau binaire {"dtype", "bdata"} de Plotly
+    """
+    if isinstance(value, dict) and "bdata" in value:
+        return np.frombuffer(base64.b64decode(value["bdata"]), dtype=value["dtype"]).astype(float).ravel()
+    return np.array([v for v in value or [] if v is not None], dtype=float)
+
+def frame_traces(base, fig):
+    """
+    Traces d'une image de l'animation : seules les propriétés qui diffèrent de la figure de départ sont envoyées
+    (valeurs, pays, étiquettes) ; le style des traces est gardé par Plotly
+    """
+    traces = []
+    for i, trace in enumerate(fig["data"]):
+        start = base["data"][i] if i < len(base["data"]) else {}
+        traces.append({key: value for key, value in trace.items() if key == "type" or start.get(key) != value})
+    return traces
+
+def play_buttons(redraw, x, y):
+    # Boutons lecture / pause (alignés à droite quand x = 1)
+    play = {"frame": {"duration": FRAME_DURATION_MS, "redraw": redraw}, "fromcurrent": True,
+            "transition": {"duration": 0 if redraw else TRANSITION_MS}}
+    pause = {"frame": {"duration": 0, "redraw": False}, "mode": "immediate", "transition": {"duration": 0}}
+    return {
+        "type": "buttons",
+        "direction": "left",
+        "showactive": False,
+        "x": x,
+        "y": y,
+        "xanchor": "right" if x >= 1 else "left",
+        "yanchor": "top",
+        "pad": {"r": 10, "t": 0},
+        "bgcolor": "#333333",
+        "bordercolor": "white",
+        "font": {"color": "white"},
+        "buttons": [
+            {"label": "▶ Play", "method": "animate", "args": [None, play]},
+            {"label": "❚❚ Pause", "method": "animate", "args": [[None], pause]},
+        ],
+    }
+
+def year_slider(labels, redraw, y):
+    # Curseur des années : une étape par image
+    step = {"frame": {"duration": 0, "redraw": redraw}, "mode": "immediate", "transition": {"duration": 0}}
+    return {
+        "active": 0,
+        "x": 0.2,
+        "len": 0.78,
+        "y": y,
+        "yanchor": "top",
+        "pad": {"t": 0, "b": 0},
+        "currentvalue": {"visible": False},
+        "font": {"color": "white", "size": 10},
+        "bgcolor": "#333333",
+        "activebgcolor": "#7efbdb",
+        "bordercolor": "white",
+        "tickcolor": "white",
+        "steps": [{"label": label, "method": "animate", "args": [[label], step]} for label in labels],
+    }
+
+def animated_figure(figures, years, range_axis, redraw=False, slider_y=None, controls=(0, 1.0)):
+    """
+    Assemble les figures JSON d'une même série (une par année, construites par create_choropleth,
+    create_histo_figure ou filled_area_figure) en une seule figure animée : la première année est affichée,
+    les autres sont des images (frames) qui ne contiennent que les traces modifiées et le titre.
+    L'échelle (range_axis) est fixée sur toutes les années pour que les images soient comparables.
+
+    Args:
+        figures: Figures JSON (dict) des années, dans l'ordre de years ; les figures vides sont ignorées
+        years: Années des figures
+        range_axis: "coloraxis" (carte : bornes de la barre de couleurs) ou "yaxis" (graphiques : axe des y)
+        redraw: True pour les traces qui ne supportent pas les transitions (carte choroplèthe)
+        slider_y: Position verticale du curseur des années (None : pas de curseur)
+        controls: Position (x, y) des boutons lecture / pause
+
+    Returns:
+        Figure JSON animée, ou {} si aucune année n'a de données
+    """
+    series = [(str(year), fig) for year, fig in zip(years, figures) if fig and fig.get("data")]
+    if not series:
+        return {}
+    base = series[0][1]
+    frames = [{"name": label, "data": frame_traces(base, fig), "layout": {"title": fig["layout"].get("title")}}
+              for label, fig in series]
+
+    # Échelle commune à toutes les années (les figures d'origine sont partagées par le cache : pas de modification en place)
+    layout = dict(base["layout"])
+    key = "z" if range_axis == "coloraxis" else "y"
+    values = np.concatenate([array_values(trace.get(key)) for _, fig in series for trace in fig["data"]])
+    values = values[np.isfinite(values)]
+    if len(values):
+        if range_axis == "coloraxis":
+            layout["coloraxis"] = {**layout.get("coloraxis", {}), "cmin": float(values.min()), "cmax": float(values.max())}
+        else:
+            layout["yaxis"] = {**layout.get("yaxis", {}), "range": [0, float(values.max()) * 1.1], "autorange": False}
+
+    layout["updatemenus"] = [play_buttons(redraw, *controls)]
+    if slider_y is not None:
+        layout["sliders"] = [year_slider([label for label, _ in series], redraw, slider_y)]
+    return {"data": base["data"], "layout": layout, "frames": frames}
@@ -0,0 +1,72 @@
+import math
+import pandas as pd
+from src.components.map_component import create_choropleth
+from src.utils.figure_cache import figure_json
+
+# Textes remplacés côté navigateur dans le titre de la carte
+INDICATOR_PLACEHOLDER = "__INDICATOR__"
+YEAR_PLACEHOLDER = "__YEAR__"
+
+def strip_template(fig):
+    """
+    Retire le thème Plotly (layout.template, identique pour toutes les figures) pour ne l'envoyer qu'une fois
+    """
+    layout = {key: value for key, value in fig.get("layout", {}).items() if key != "template"}
+    return {"data": fig.get("data", []), "layout": layout}
+
+def build_client_payload(selections, indicators, years, histogram_figure, filled_area_figure):
+    """
+    Construit les données envoyées une fois au navigateur pour le mode clientside (assets/dashboard.js)
+
+    Args:
+        selections: Source des valeurs par pays (SelectionCache, DataCube ou SqliteSource)
+        indicators: Indicateurs proposés dans le filtre
+        years: Années proposées dans le filtre
+        histogram_figure: Fonction année -> figure JSON de l'histogramme
+        filled_area_figure: Fonction année -> figure JSON du filled area plot
+
+    Returns:
+        dict avec les pays et leur code ISO-3, un tableau values[indicateur][année][pays] (null = pas de donnée),
+        les figures de l'histogramme et du filled area plot par année (elles ne dépendent que de l'année)
+        et le modèle de la carte
+    """
+    years = [str(year) for year in years]
+    slices = {(indicator, year): selections.country_values(indicator, year) for indicator in indicators for year in years}
+
+    areas = sorted(set().union(*(set(country_data["area"]) for country_data in slices.values())))
+    area_index = {area: i for i, area in enumerate(areas)}
+
+    # Code ISO-3 de chaque pays pour placer les valeurs sur la carte (null : pays absent de la carte)
+    iso3 = [None] * len(areas)
+    for country_data in slices.values():
+        if "iso3" in country_data.columns:
+            for area, code in zip(country_data["area"], country_data["iso3"]):
+                if isinstance(code, str):
+                    iso3[area_index[area]] = code
+
+    values = []
+    for indicator in indicators:
+        by_year = []
+        for year in years:
+            vector = [None] * len(areas)
+            country_data = slices[(indicator, year)]
+            for area, value in zip(country_data["area"], country_data["value"]):
+                if not math.isnan(value):
+                    vector[area_index[area]] = round(float(value), 3)
+            by_year.append(vector)
+        values.append(by_year)
+
+    empty = pd.DataFrame({"area": pd.Series([], dtype=str), "value": pd.Series([], dtype=float), "iso3": pd.Series([], dtype=str)})
+    map_template = figure_json(create_choropleth(empty, INDICATOR_PLACEHOLDER, YEAR_PLACEHOLDER))
+
+    return {
+        "areas": areas,
+        "iso3": iso3,
+        "indicators": list(indicators),
+        "years": years,
+        "values": values,
+        "plotly_template": map_template["layout"].get("template"),
+        "map": strip_template(map_template),
+        "histogram": {year: strip_template(histogram_figure(year)) for year in years},
+        "filled_area": {year: strip_template(filled_area_figure(year)) for year in years},
+    }
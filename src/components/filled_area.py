@@ -2,13 +2,16 @@ from dash import html, dcc
 import plotly.graph_objects as go
 import pandas as pd
 import sqlite3
+from config import GDP_BINS
+from src.utils.pivot_cache import get_year_pivot
+from src.utils.schema import as_year
 
-def filled_area_component(df):
+def filled_area_component(df=None):
     """
     Crée un conteneur pour le filled area plot
     
     Args:
-        df: DataFrame contenant les données
+        df: DataFrame contenant les données (optionnel, le graphique est rempli par callback)
     
     Returns:
         html.Div: Conteneur avec le graphique
@@ -34,7 +37,7 @@ def filled_area_component(df):
         ]
     )
 
-def prepare_filled_area_data(df, df_pop, selected_year, gdp_bins=None):
+def prepare_filled_area_data(df, df_pop, selected_year, gdp_bins=None, pivots=None, aggregates=None):
     """
     Prépare les données pour le filled area plot avec regroupement par intervalles de PIB
     
@@ -42,7 +45,10 @@ def prepare_filled_area_data(df, df_pop, selected_year, gdp_bins=None):
         df: DataFrame avec les données FAOSTAT
         df_pop: DataFrame avec les données de population
         selected_year: Année sélectionnée
-        gdp_bins: Liste d'intervalles de PIB (ex: [0, 2500, 5000, 10000, 50000, 1e7])
+        gdp_bins: Liste d'intervalles de PIB (GDP_BINS de config.py par défaut)
+        pivots: YearPivotCache partagé avec l'histogramme (optionnel)
+        aggregates: GdpAggregates matérialisés par clean_data ou GdpBinner (optionnel), lus à la place du pivot
+            s'ils couvrent les gdp_bins demandés
     
     Returns:
         DataFrame avec les colonnes gdp_bin_mid, obese_million, undernourished_million, population_million
@@ -53,19 +59,22 @@ def prepare_filled_area_data(df, df_pop, selected_year, gdp_bins=None):
     
     # Intervalles par défaut si non fournis
     if gdp_bins is None:
-        gdp_bins = [0, 2500, 5000, 7500, 10000, 15000, 20000, 50000, 1e7]
+        gdp_bins = GDP_BINS
     
-    # Convertir selected_year en string pour correspondre au format de df
-    selected_year_str = str(selected_year)
+    # Agrégats précalculés par clean_data : quelques lignes lues au lieu du pivot, de la jointure et du découpage
+    if aggregates is not None and aggregates.covers(gdp_bins):
+        return aggregates.filled_area_data(selected_year, gdp_bins)
     
-    # Filtrer pour l'année sélectionnée
-    subset = df[df['year'] == selected_year_str].copy()
+    # Année entière, comme la colonne year du schéma canonique (src/utils/schema.py)
+    year = as_year(selected_year)
     
-    if subset.empty:
-        return pd.DataFrame(columns=['gdp_bin_mid', 'obese_million', 'undernourished_million', 'population_million'])
+    # Récupérer le pivot de l'année sélectionnée (partagé avec l'histogramme)
+    pivot = get_year_pivot(df, year, pivots)
     
-    # Créer un pivot pour avoir toutes les données
-    pivot = subset.pivot_table(index='area', columns='item', values='value', aggfunc='mean').reset_index()
+    if pivot.empty:
+        return pd.DataFrame(columns=['gdp_bin_mid', 'obese_million', 'undernourished_million', 'population_million'])
+    # Copie superficielle : le pivot du cache n'est pas modifié et ses colonnes ne sont pas recopiées
+    pivot = pivot.copy(deep=False)
     
     # Extraire les données de PIB
     if gdp_item in pivot.columns:
@@ -84,24 +93,23 @@ def prepare_filled_area_data(df, df_pop, selected_year, gdp_bins=None):
     else:
         pivot['undernourished_million'] = 0.0
     
+    # Jointure sur la clé entière des pays (code M49) si elle existe, sinon sur le nom
+    key = 'area_key' if 'area_key' in pivot.columns and 'area_key' in df_pop.columns else 'area'
+
     # Garder seulement les colonnes nécessaires
-    pivot = pivot[['area', 'gdp_per_capita', 'obese_million', 'undernourished_million']].copy()
+    pivot = pivot[[key, 'gdp_per_capita', 'obese_million', 'undernourished_million']]
     pivot = pivot.dropna(subset=['gdp_per_capita'])
     
     if pivot.empty:
         return pd.DataFrame(columns=['gdp_bin_mid', 'obese_million', 'undernourished_million', 'population_million'])
     
     # --- Jointure avec df_pop pour récupérer la population par pays (année sélectionnée) ---
-    pop_df = df_pop.copy()
-    pop_df['year'] = pop_df['year'].astype(str)
-    pop_df = pop_df[pop_df['year'] == selected_year_str].copy()
-
-    pop_df = pop_df[['area', 'value']].copy()
-    pop_df = pop_df.groupby('area', as_index=False).agg({'value': 'mean'}).rename(columns={'value': 'population'})
+    pop_df = df_pop.loc[df_pop['year'] == year, [key, 'value']]
+    pop_df = pop_df.groupby(key, as_index=False).agg({'value': 'mean'}).rename(columns={'value': 'population'})
     pop_df['population'] = pd.to_numeric(pop_df['population'], errors='coerce').fillna(0.0)
     
     # Merge population par pays dans le pivot
-    pivot = pivot.merge(pop_df, on='area', how='left')
+    pivot = pivot.merge(pop_df, on=key, how='left')
     pivot['population'] = pd.to_numeric(pivot['population'], errors='coerce').fillna(0.0)
     # Convertir la population en millions pour cohérence avec les autres colonnes
     pivot['population_million'] = pivot['population'] / 1e6
@@ -124,7 +132,7 @@ def prepare_filled_area_data(df, df_pop, selected_year, gdp_bins=None):
     
     return aggregated
 
-def create_filled_area_figure(df, df_pop, selected_year, gdp_bins=None):
+def create_filled_area_figure(df, df_pop, selected_year, gdp_bins=None, pivots=None):
     """
     Crée la figure du filled area plot
     
@@ -133,17 +141,23 @@ def create_filled_area_figure(df, df_pop, selected_year, gdp_bins=None):
         df_pop: DataFrame avec les données de population
         selected_year: Année sélectionnée
         gdp_bins: Liste d'intervalles de PIB
+        pivots: YearPivotCache partagé avec l'histogramme (optionnel)
     
     Returns:
         Figure Plotly
     """
     # Intervalles par défaut
     if gdp_bins is None:
-        gdp_bins = [0, 2500, 5000, 7500, 10000, 15000, 20000, 50000, 1e7]
+        gdp_bins = GDP_BINS
     
     # Préparer les données
-    data = prepare_filled_area_data(df, df_pop, selected_year, gdp_bins)
-    
+    data = prepare_filled_area_data(df, df_pop, selected_year, gdp_bins, pivots)
+    return filled_area_figure(data, selected_year, gdp_bins)
+
+def filled_area_figure(data, selected_year, gdp_bins):
+    """
+    Crée la figure du filled area plot à partir des données préparées par prepare_filled_area_data
+    """
     if data.empty:
         # Retourner une figure vide avec un message
         fig = go.Figure()
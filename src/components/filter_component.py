@@ -2,7 +2,7 @@ from dash import html, dcc
 
 def create_year_options(df):
     # Crée les options pour le dropdown des années (une option par année unique dans la base de données)
-    return [{"label": str(year), "value": year} for year in sorted(df["year"].unique())]
+    return [{"label": str(year), "value": int(year)} for year in sorted(df["year"].unique())]
 
 def create_indicator_options():
     """ 
@@ -26,15 +26,17 @@ def create_indicator_options():
          "value": "Dietary energy supply used in the estimation of the prevalence of undernourishment (kcal/cap/day)"}
     ]
 
-def filter_component(df):
+def filter_component(df=None, animation=False):
     # Crée le composant de filtres avec les dropdowns pour l'année et l'indicateur
+    # Sans df, les années sont remplies par callback une fois les données chargées
+    # Avec animation, une case à cocher affiche la carte et les graphiques animés sur toutes les années
     return html.Div([
         # Dropdown pour sélectionner l'année
         html.Label("Select a year", style={"color": "white", "marginBottom": "10px"}),
         dcc.Dropdown(
             id="year-dropdown",
-            options=create_year_options(df),
-            value=df["year"].min(),
+            options=create_year_options(df) if df is not None else [],
+            value=int(df["year"].min()) if df is not None else None,
             style={"marginBottom": "20px ","color": "black"}
         ),
         # Dropdown pour sélectionner l'indicateur
@@ -45,7 +47,13 @@ def filter_component(df):
             value="Number of obese adults (18 years and older) (million)",
             style={"color": "black"},
             multi=False
-        )
+        ),
+        *([dcc.Checklist(
+            id="animate-toggle",
+            options=[{"label": " Play all years", "value": "animate"}],
+            value=[],
+            style={"color": "white", "marginTop": "20px"}
+        )] if animation else [])
     ],
     # Styles pour le composant filtre
     style={
@@ -0,0 +1,111 @@
+import math
+import re
+from dash import html, dcc
+from config import GDP_BINS
+
+# Modes de découpage en classes de PIB (voir GdpBinner.bin_edges dans src/utils/gdp_aggregates.py)
+BINS_MODE_OPTIONS = [
+    {"label": "Fixed edges", "value": "fixed"},
+    {"label": "Quantiles", "value": "quantile"},
+    {"label": "Log-spaced", "value": "log"},
+]
+DEFAULT_BINS_MODE = "fixed"
+DEFAULT_BINS_COUNT = len(GDP_BINS) - 1
+MAX_BINS_COUNT = 50
+
+def format_edges(gdp_bins):
+    # Bornes affichées dans le champ de saisie (entiers sans ".0")
+    return ", ".join(str(int(edge)) if float(edge).is_integer() else str(edge) for edge in gdp_bins)
+
+def validate_edges(text):
+    """
+    Lit et vérifie les bornes saisies (nombres séparés par des virgules, points-virgules ou espaces)
+
+    Returns:
+        (bornes, None) avec la liste des bornes (entiers si possible), ou (None, message) si la saisie n'est pas valide :
+        nombres finis (ni nan ni inf), au moins deux, strictement croissants
+    """
+    try:
+        edges = [float(token) for token in re.split(r"[,;\s]+", text or "") if token]
+    except ValueError:
+        return None, "Bornes invalides : nombres séparés par des virgules attendus"
+    if not all(math.isfinite(edge) for edge in edges):
+        return None, "Bornes invalides : nombres finis attendus"
+    if len(edges) < 2:
+        return None, "Bornes invalides : au moins deux bornes attendues"
+    if any(high <= low for low, high in zip(edges, edges[1:])):
+        return None, "Bornes invalides : bornes strictement croissantes attendues"
+    return [int(edge) if edge.is_integer() else edge for edge in edges], None
+
+def parse_edges(text):
+    """
+    Retourne la liste des bornes saisies, ou None si la saisie n'est pas valide (voir validate_edges)
+    """
+    return validate_edges(text)[0]
+
+def selected_gdp_bins(binner, selected_year, mode, count, edges_text):
+    """
+    Bornes des classes choisies dans le panneau : bornes saisies (mode "fixed") ou calculées par binner
+    (quantiles de l'année ou classes logarithmiques). GDP_BINS si la saisie n'est pas valide ou lui est égale
+    (figures précalculées).
+    """
+    if mode == "fixed" or binner is None:
+        gdp_bins = parse_edges(edges_text)
+    else:
+        try:
+            count = min(max(int(count), 1), MAX_BINS_COUNT)
+        except (TypeError, ValueError):
+            count = DEFAULT_BINS_COUNT
+        gdp_bins = binner.bin_edges(selected_year, mode, count)
+    return GDP_BINS if not gdp_bins or gdp_bins == GDP_BINS else gdp_bins
+
+def gdp_bins_component():
+    """
+    Panneau de choix des classes de PIB de l'histogramme et du filled area plot : bornes fixes saisies,
+    quantiles de l'année ou classes logarithmiques (nombre de classes réglable)
+    """
+    label_style = {"color": "white", "marginRight": "10px"}
+    return html.Div([
+        html.Label("GDP classes", style={**label_style, "fontWeight": "bold"}),
+        dcc.RadioItems(
+            id="gdp-bins-mode",
+            options=BINS_MODE_OPTIONS,
+            value=DEFAULT_BINS_MODE,
+            inline=True,
+            labelStyle={"marginRight": "15px"},
+            style={"marginRight": "20px"}
+        ),
+        html.Label("Edges", style=label_style),
+        dcc.Input(
+            id="gdp-bins-edges",
+            type="text",
+            value=format_edges(GDP_BINS),
+            debounce=True,
+            style={"width": "420px", "marginRight": "20px"}
+        ),
+        # Message si les bornes saisies ne sont pas valides (les bornes par défaut sont alors utilisées)
+        html.Span(id="gdp-bins-message", style={"color": "#ff6666", "marginRight": "20px"}),
+        html.Label("Number of classes", style=label_style),
+        dcc.Input(
+            id="gdp-bins-count",
+            type="number",
+            min=1,
+            max=MAX_BINS_COUNT,
+            step=1,
+            value=DEFAULT_BINS_COUNT,
+            debounce=True,
+            style={"width": "60px"}
+        ),
+    ],
+    style={
+        "width": "1250px",
+        "backgroundColor": "#000000",
+        "padding": "10px",
+        "borderRadius": "10px",
+        "border": "1px solid white",
+        "position": "absolute",
+        "left": "0px",
+        "top": "1405px",
+        "display": "flex",
+        "alignItems": "center",
+    })
@@ -2,14 +2,22 @@ from dash import html, dcc
 import plotly.graph_objects as go
 import pandas as pd
 import numpy as np
+from config import GDP_BINS
+from src.utils.pivot_cache import get_year_pivot
 
-def prepare_histo_data(df, selected_year, bins=20, gdp_bins=None):
+def prepare_histo_data(df, selected_year, bins=20, gdp_bins=None, pivots=None, aggregates=None):
     """
     Prépare un DataFrame agrégé par classe de PIB (gdp per capita) pour l'année donnée.
     Retour attendu : colonnes ['gdp_bin','gdp_per_capita_mean','obese_million','undernourished_million']
     - bins : nombre de classes de PIB (quantiles si possible)
     - gdp_bins : liste d'intervalles (edges) personnalisés, ex. [0,1000,5000,20000,1e6]
+    - pivots : YearPivotCache partagé (src/utils/pivot_cache.py), sinon le pivot est calculé sur df
+    - aggregates : GdpAggregates matérialisés par clean_data ou GdpBinner (bornes quelconques), voir
+      src/utils/gdp_aggregates.py : lus à la place du pivot s'ils couvrent les gdp_bins demandés
     """
+    if aggregates is not None and aggregates.covers(gdp_bins):
+        return aggregates.histo_data(selected_year, gdp_bins)
+
     obese_item = "Number of obese adults (18 years and older) (million)"
     under_item = "Number of people undernourished (million) (3-year average)"
     gdp_item = "Gross domestic product per capita, PPP, (constant 2021 international $)"
@@ -18,15 +26,13 @@ def prepare_histo_data(df, selected_year, bins=20, gdp_bins=None):
     if 'area' not in df.columns or 'item' not in df.columns or 'value' not in df.columns or 'year' not in df.columns:
         return pd.DataFrame(columns=['gdp_bin','gdp_per_capita_mean','obese_million','undernourished_million'])
 
-    subset = df.copy()
-    subset['year'] = subset['year'].astype(int)
-    subset = subset[subset['year'] == int(selected_year)]
+    # pivot pour avoir une colonne par item au niveau pays (partagé avec le filled area plot)
+    pivot = get_year_pivot(df, selected_year, pivots)
 
-    if subset.empty:
+    if pivot.empty:
         return pd.DataFrame(columns=['gdp_bin','gdp_per_capita_mean','obese_million','undernourished_million'])
-
-    # pivot pour avoir une colonne par item au niveau pays
-    pivot = subset.pivot_table(index='area', columns='item', values='value', aggfunc='mean').reset_index()
+    # Copie superficielle : le pivot du cache n'est pas modifié et ses colonnes ne sont pas recopiées
+    pivot = pivot.copy(deep=False)
 
     def safe_col(piv, col_name):
         if col_name in piv.columns:
@@ -76,13 +82,16 @@ def prepare_histo_data(df, selected_year, bins=20, gdp_bins=None):
 
     return histo_df
 
-def create_histo_figure(histo_df, selected_year, gdp_bins=[0,1000,5000,10000,20000,50000,1e7]):
+def create_histo_figure(histo_df, selected_year, gdp_bins=None):
     """
     Crée un histogramme où l'abscisse est la classe de PIB (gdp_bin -> label),
     les barres montrent le total de personnes sous-alimentées / obèses (millions) par classe,
     et on affiche en ligne la moyenne du PIB par classe pour repère.
     Attendu : colonnes ['gdp_bin','gdp_per_capita_mean','obese_million','undernourished_million']
+    - gdp_bins : bornes des classes (GDP_BINS de config.py par défaut)
     """
+    if gdp_bins is None:
+        gdp_bins = GDP_BINS
     if histo_df is None or histo_df.empty:
         fig = go.Figure()
         fig.update_layout(title="Aucune donnée disponible pour l'histogramme 2020")
@@ -140,7 +149,7 @@ def create_histo_figure(histo_df, selected_year, gdp_bins=[0,1000,5000,10000,200
 
     return fig
 
-def histo_component(df):
+def histo_component(df=None):
     """
     Composant principal pour l'histogramme - retourne juste le conteneur avec un graphique vide
     Le contenu sera mis à jour par callback
@@ -5,17 +5,24 @@ def create_choropleth(country_data, selected_indicator, selected_year):
     """
     Crée une carte choroplèthe avec les données fournies
     """
+    # Les pays sont placés par leur code ISO-3 (résolu par clean_data), sinon par leur nom
+    if "iso3" in country_data.columns:
+        country_data = country_data.dropna(subset=["iso3"])
+        locations, locationmode = "iso3", "ISO-3"
+    else:
+        locations, locationmode = "area", "country names"
+
     # Création de la carte
     fig = px.choropleth(
         country_data,
-        locations="area",
-        locationmode="country names",
+        locations=locations,
+        locationmode=locationmode,
         color="value",
         scope="world",
         color_continuous_scale=[[0, "#ffffff"], [1, "#7efbdb"]],
         title=f"{selected_indicator} en {selected_year}",
         hover_name="area",
-        hover_data={"area": False, "value": ":.1f"},
+        hover_data={"area": False, locations: False, "value": ":.1f"},
         labels={"value": "Number of people (millions)" },
     )
     
@@ -1,7 +1,7 @@
 from dash import html, dcc
 import pandas as pd
 
-def top_countries_component(df):
+def top_countries_component(df=None):
     """
     Composant pour afficher le top 3 des pays avec la valeur la plus haute
     """
@@ -21,18 +21,20 @@ def top_countries_component(df):
         "height": "400px",
     })
 
-def update_top_countries(df, selected_indicator, selected_year):
+def update_top_countries(source, selected_indicator, selected_year):
     """
     Met à jour la liste du top 3 des pays en fonction des filtres
+
+    Args:
+        source: DataCube (src/utils/cube.py) ou SqliteSource (src/utils/data_access.py)
+        selected_indicator: Indicateur sélectionné
+        selected_year: Année sélectionnée
     """
     if not selected_indicator or not selected_year:
         return "Sélectionnez un indicateur et une année"
     
-    # Filtrer les données
-    filtered_df = df[
-        (df['item'] == selected_indicator) & 
-        (df['year'] == selected_year)
-    ].copy()
+    # Lire les valeurs par pays dans la source
+    filtered_df = source.country_values(selected_indicator, selected_year)
     
     if filtered_df.empty:
         return "Aucune donnée disponible"
@@ -3,20 +3,20 @@ import plotly.graph_objects as go
 import pandas as pd
 import numpy as np
 
+# Les 2 indicateurs de la courbe de tendance
+TREND_INDICATORS = [
+    "Number of obese adults (18 years and older) (million)",
+    "Number of people undernourished (million) (3-year average)"
+]
+
 def prepare_trend_data(df):
     """
     Prépare les données pour les 3 indicateurs
     """
-    # Définir les 2 indicateurs
-    indicators = [
-        "Number of obese adults (18 years and older) (million)",
-        "Number of people undernourished (million) (3-year average)"
-    ]
-    
     trend_data = {}
     
-    for indicator in indicators:
-        indicator_df = df[df['item'] == indicator].copy()
+    for indicator in TREND_INDICATORS:
+        indicator_df = df[df['item'] == indicator]
         if not indicator_df.empty:
             yearly_data = indicator_df.groupby('year')['value'].sum().reset_index()
             yearly_data = yearly_data.sort_values('year')
@@ -77,18 +77,16 @@ def create_trend_figure(trend_data):
     
     return fig
 
-def trend_line_component(df):
+def trend_line_component(df=None):
     """
     Composant principal pour la courbe de tendance avec style intégré
+    Sans df, la figure est remplie par callback une fois les données chargées
     """
-    # Préparer les données
-    trend_data = prepare_trend_data(df)
-    
-    # Créer la figure
-    fig = create_trend_figure(trend_data)
+    # Préparer les données et créer la figure
+    fig = create_trend_figure(prepare_trend_data(df)) if df is not None else {}
     
     return html.Div([
-        dcc.Graph(figure=fig)
+        dcc.Graph(id="trend-graph", figure=fig)
     ],
     style={
             "width": "550px",
@@ -0,0 +1,134 @@
+# Fiche d'un pays, ouverte en cliquant sur la carte : séries de tous les indicateurs et population
+
+import math
+from urllib.parse import quote, unquote
+from dash import html, dcc
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+from src.components.filter_component import create_indicator_options
+
+COUNTRY_PATH = "/country/"
+COLUMNS = 3
+
+# La fiche recouvre le dashboard quand elle est ouverte
+PAGE_STYLE = {
+    "position": "fixed",
+    "top": "0px",
+    "left": "0px",
+    "width": "100%",
+    "height": "100%",
+    "overflow": "auto",
+    "boxSizing": "border-box",
+    "padding": "20px",
+    "backgroundColor": "#000000",
+    "zIndex": 10,
+}
+HIDDEN_STYLE = {**PAGE_STYLE, "display": "none"}
+
+def country_path(area):
+    # Adresse de la fiche d'un pays (le nom est encodé : espaces, accents, virgules)
+    return COUNTRY_PATH + quote(area, safe="")
+
+def area_from_path(pathname):
+    # Pays de l'adresse, None hors d'une fiche
+    if not pathname or not pathname.startswith(COUNTRY_PATH):
+        return None
+    return unquote(pathname[len(COUNTRY_PATH):]) or None
+
+def area_from_click(click_data):
+    # Pays cliqué sur la carte (nom affiché au survol, hover_name de create_choropleth)
+    points = (click_data or {}).get("points") or []
+    return points[0].get("hovertext") if points else None
+
+# Noms courts des indicateurs du filtre
+SHORT_NAMES = {option["value"]: option["label"] for option in create_indicator_options()}
+
+def series_title(item, unit):
+    # Titre court d'un indicateur : nom du filtre, sinon son nom sans les précisions entre parenthèses, et l'unité
+    name = SHORT_NAMES.get(item) or item.split(" (")[0].rstrip(", ")
+    return f"{name} ({unit})" if unit else name
+
+def create_country_figure(area, series, population, item_units):
+    """
+    Crée la figure de la fiche d'un pays : un graphique par indicateur (toutes les années) et la population
+
+    Args:
+        area: Nom du pays
+        series: DataFrame (item, year, value) du pays (country_series de CountryIndex ou SqliteSource)
+        population: DataFrame (year, value) de la population du pays
+        item_units: Dictionnaire indicateur -> unité de tous les indicateurs du jeu de données
+    """
+    titles = [series_title(item, unit) for item, unit in item_units.items()] + ["Total population (millions)"]
+    rows = math.ceil(len(titles) / COLUMNS)
+    fig = make_subplots(rows=rows, cols=COLUMNS, subplot_titles=titles, vertical_spacing=0.25 / rows,
+                        horizontal_spacing=0.08)
+
+    by_item = dict(tuple(series.groupby("item", sort=False))) if not series.empty else {}
+    curves = [(title, by_item.get(item), "#7efbdb") for title, item in zip(titles, item_units)]
+    if not population.empty:
+        population = population.assign(value=population["value"] / 1e6)
+    curves.append((titles[-1], population if not population.empty else None, "#ffcc88"))
+
+    for i, (title, data, color) in enumerate(curves):
+        row, col = i // COLUMNS + 1, i % COLUMNS + 1
+        if data is None:
+            continue
+        fig.add_trace(go.Scatter(
+            x=data["year"],
+            y=data["value"],
+            mode="lines+markers",
+            line=dict(color=color, width=2),
+            marker=dict(size=4, color=color),
+            name=title,
+            hovertemplate="%{x} : %{y:.2f}<extra></extra>"
+        ), row=row, col=col)
+
+    fig.update_layout(
+        title=dict(text=f"{area} : all indicators", x=0.5, xanchor="center", font=dict(size=18, color="white")),
+        plot_bgcolor="rgba(0,0,0,0)",
+        paper_bgcolor="rgba(0,0,0,0)",
+        font_color="white",
+        showlegend=False,
+        height=300 * rows,
+        margin=dict(l=50, r=30, t=90, b=40),
+    )
+    fig.update_annotations(font=dict(size=12, color="white"))
+    fig.update_xaxes(gridcolor="#333333", dtick=5)
+    fig.update_yaxes(gridcolor="#333333", rangemode="tozero")
+    return fig
+
+def unknown_country_figure(area):
+    """
+    Figure de la fiche d'un pays absent des données (adresse saisie à la main) : un simple message
+    """
+    fig = go.Figure()
+    fig.add_annotation(
+        text=f"Pays inconnu : {area}",
+        xref="paper",
+        yref="paper",
+        x=0.5,
+        y=0.5,
+        showarrow=False,
+        font=dict(size=16, color="white")
+    )
+    fig.update_layout(
+        plot_bgcolor="rgba(0,0,0,0)",
+        paper_bgcolor="rgba(0,0,0,0)",
+        font_color="white",
+        xaxis=dict(visible=False),
+        yaxis=dict(visible=False)
+    )
+    return fig
+
+def country_page_component():
+    """
+    Retourne la fiche pays, cachée tant que l'adresse n'est pas /country/<pays> (voir le callback de home.py)
+    """
+    return html.Div(
+        id="country-page",
+        style=HIDDEN_STYLE,
+        children=[
+            dcc.Link("← Back to the dashboard", href="/", style={"color": "#7efbdb"}),
+            dcc.Graph(id="country-graph", config={"displayModeBar": False})
+        ]
+    )
@@ -1,39 +1,57 @@
-from dash import Dash, html, dcc, Input, Output
-import plotly.express as px
-import pandas as pd
-import sqlite3
-from src.components.filter_component import filter_component
-from src.components.map_component import map_component
-from src.components.trend_line import trend_line_component
+from functools import partial
+import time
+from dash import Dash, html, dcc, Input, Output, State, ClientsideFunction, ctx, no_update
+from flask import Response, g, jsonify, request
+from src.components.filter_component import filter_component, create_year_options, create_indicator_options
+from src.components.map_component import map_component, create_choropleth
+from src.components.trend_line import trend_line_component, prepare_trend_data, create_trend_figure
 from src.components.histogram_component import histo_component, prepare_histo_data, create_histo_figure
 from src.components.top_3 import top_countries_component, update_top_countries
-from src.components.filled_area import filled_area_component, create_filled_area_figure
-from src.utils.clean_data import clean_data
+from src.components.filled_area import filled_area_component, prepare_filled_area_data, filled_area_figure
+from src.components.gdp_bins_component import gdp_bins_component, selected_gdp_bins, validate_edges
+from src.components.animation import animated_figure
+from src.pages.country import (PAGE_STYLE, HIDDEN_STYLE, area_from_click, area_from_path, country_page_component,
+                               country_path, create_country_figure, unknown_country_figure)
+from src.utils.bootstrap import Bootstrap
+from src.utils.figure_cache import figure_json, figure_patch, layout_signature
+from src.utils.schema import as_year
+from src.utils.metrics import SlowProfiler, instrument, metrics, observe_response
+from src.components.clientside import build_client_payload
+from config import WARM_FIGURES, CLIENTSIDE, ASSETS_FOLDER, PROFILE_SLOW_MS, PROFILE_DIR, GDP_BINS
 
 # Initialisation de l'application Dash 
-app = Dash(__name__)
+app = Dash(__name__, assets_folder=ASSETS_FOLDER)
+app.title = "Dashboard"
+# Application WSGI (Flask) servie en production par gunicorn (voir wsgi.py)
+server = app.server
 
-# Load data
-bdd_path = "faostat_data.db"
-con = sqlite3.connect(bdd_path)
+# Les données sont chargées en arrière-plan (main.py lance bootstrap.start(), sinon au premier callback) :
+# le serveur répond tout de suite et la page affiche l'état de chargement
+bootstrap = Bootstrap()
 
-cur = con.cursor()
-cur.execute(
-    "SELECT name FROM sqlite_master WHERE type='table';"
-)
-trouvees = {row[0] for row in cur.fetchall()}
-if 'clean_data' not in trouvees or 'clean_pop_tot' not in trouvees:
-    clean_data()
+# Route de disponibilité : 200 quand les données sont chargées, 503 sinon
+@app.server.route("/ready")
+def ready():
+    return jsonify(bootstrap.status()), 200 if bootstrap.ready else 503
+
+# Métriques des callbacks au format texte de Prometheus (src/utils/metrics.py)
+@app.server.route("/metrics")
+def metrics_route():
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
 
-df = pd.read_sql_query("SELECT * FROM clean_data", con)
-df_pop = pd.read_sql_query("SELECT * FROM clean_pop_tot", con)
-con.close()
+# Durée et taille de chaque requête de callback, sérialisation JSON de Dash comprise
+@app.server.before_request
+def start_timer():
+    g.request_start = time.perf_counter()
 
-# Créer un masque pour filtrer les données pertinentes
-mask_nutrition = df["value"].notna()
+@app.server.after_request
+def record_request(response):
+    if request.path.endswith("/_dash-update-component") and "dashboard_callback" in g:
+        observe_response(g.dashboard_callback, time.perf_counter() - g.request_start, response.calculate_content_length() or 0)
+    return response
 
-# Appliquer le filtre et normaliser les noms des pays
-df = df[mask_nutrition].copy()
+# Profilage des callbacks lents, activé avec PROFILE_SLOW_MS (config.py)
+profiler = SlowProfiler(PROFILE_SLOW_MS, PROFILE_DIR) if PROFILE_SLOW_MS > 0 else None
 
 # Layout principal
 app.layout = html.Div(
@@ -46,6 +64,16 @@ app.layout = html.Div(
     },
     children=[
         html.H1("Dashboard on Food Security Indicators", style={"textAlign": "center", "color": "white", "marginBottom": "20px"}),
+        # État du chargement des données, vérifié toutes les 500 ms jusqu'à ce qu'elles soient prêtes
+        html.Div(id="loading-status", children="Loading data...", style={"textAlign": "center", "color": "#7efbdb"}),
+        dcc.Interval(id="loading-poll", interval=500),
+        # Mode clientside : données compactes envoyées une fois au navigateur
+        *([dcc.Store(id="cube-store")] if CLIENTSIDE else []),
+        # Empreinte de la mise en page des figures affichées par le navigateur (mises à jour partielles)
+        dcc.Store(id="figure-layouts", data={}),
+        # Adresse de la page : /country/<pays> ouvre la fiche du pays cliqué sur la carte
+        dcc.Location(id="url", refresh=False),
+        country_page_component(),
         html.Div(
             style={
                 "position": "relative",
@@ -55,81 +83,296 @@ app.layout = html.Div(
                 "overflow": "auto" 
             },
             children=[
-                filter_component(df),
+                filter_component(animation=not CLIENTSIDE),
                 map_component(),
-                trend_line_component(df),
-                top_countries_component(df),
-                histo_component(df),
-                filled_area_component(df)
+                trend_line_component(),
+                top_countries_component(),
+                histo_component(),
+                filled_area_component(),
+                # Classes de PIB choisies par l'utilisateur (recalculées côté serveur)
+                *([] if CLIENTSIDE else [gdp_bins_component()])
             ]
         )
     ]
 )
 
-# Callback pour mettre à jour la carte en fonction du filtre 
-@app.callback(
-    Output("map-graph", "figure"),
-    [Input("indicator-dropdown", "value"),
-     Input("year-dropdown", "value")]
-)
-def update_map(selected_indicator, selected_year):
-    if not selected_indicator or not selected_year:
-        return {}
-    
-    # Filtrer par année
-    filtered_df = df[df["year"] == selected_year].copy()
-    
-    # Filtrer par indicateur sélectionné
-    indicator_mask = filtered_df["item"] == selected_indicator
-    country_data = filtered_df[indicator_mask].groupby("area")["value"].mean().reset_index()
+# Callback qui remplit le filtre des années et la courbe de tendance une fois les données chargées
+# (et, en mode clientside, envoie les données compactes au navigateur)
+READY_OUTPUTS = [Output("year-dropdown", "options"),
+                 Output("year-dropdown", "value"),
+                 Output("trend-graph", "figure"),
+                 Output("loading-status", "children"),
+                 Output("loading-poll", "disabled")]
+if CLIENTSIDE:
+    READY_OUTPUTS.append(Output("cube-store", "data"))
+
+@app.callback(READY_OUTPUTS, [Input("loading-poll", "n_intervals")])
+@instrument("show_data_when_ready", profiler)
+def show_data_when_ready(_):
+    data = bootstrap.get()
+    if data is None:
+        if bootstrap.error:
+            # Le chargement est relancé par bootstrap.get() : on continue d'interroger le serveur
+            result = (no_update, no_update, no_update, f"Data loading failed: {bootstrap.error} (retrying)", False)
+        else:
+            result = (no_update, no_update, no_update, "Loading data...", False)
+        return result + (no_update,) if CLIENTSIDE else result
+
+    with metrics.phase("prepare"):
+        trend_data = prepare_trend_data(data.df)
+    with metrics.phase("figure"):
+        trend_fig = create_trend_figure(trend_data)
+    result = (create_year_options(data.df_years), int(data.df_years["year"].min()), trend_fig, None, True)
+    return result + (client_payload(data),) if CLIENTSIDE else result
+
+def build_map(data, selected_indicator, selected_year):
+    # Lire les valeurs par pays pour l'indicateur et l'année dans la source (cube ou SQLite)
+    with metrics.phase("selection"):
+        country_data = data.selections.country_values(selected_indicator, selected_year)
         
     # Créer la carte en utilisant la fonction du composant map
-    from src.components.map_component import create_choropleth
-    fig = create_choropleth(country_data, selected_indicator, selected_year)
+    with metrics.phase("figure"):
+        return create_choropleth(country_data, selected_indicator, selected_year)
+
+def gdp_aggregates_for(data, gdp_bins):
+    # Agrégats matérialisés pour GDP_BINS, sinon découpage à la volée (PIB triés et sommes cumulées)
+    if data.gdp_aggregates is not None and data.gdp_aggregates.covers(gdp_bins):
+        return data.gdp_aggregates
+    return data.gdp_binner
+
+def build_histogram(data, selected_year, gdp_bins=GDP_BINS):
+    # Préparer les données et créer la figure
+    with metrics.phase("prepare"):
+        histo_data = prepare_histo_data(data.df, selected_year, gdp_bins=gdp_bins, pivots=data.pivots,
+                                        aggregates=gdp_aggregates_for(data, gdp_bins))
+    with metrics.phase("figure"):
+        return create_histo_figure(histo_data, selected_year, gdp_bins)
+
+def build_filled_area(data, selected_year, gdp_bins=GDP_BINS):
+    with metrics.phase("prepare"):
+        filled_data = prepare_filled_area_data(data.df, data.df_pop, selected_year, gdp_bins, data.pivots,
+                                               gdp_aggregates_for(data, gdp_bins))
+    with metrics.phase("figure"):
+        return filled_area_figure(filled_data, selected_year, gdp_bins)
 
+def animation_years(data):
+    return [int(year) for year in sorted(data.df_years["year"].unique())]
+
+def build_map_animation(data, selected_indicator):
+    # Carte animée : une image par année, construites (ou lues) dans le cache des cartes annuelles
+    years = animation_years(data)
+    figures = [update_map(data, selected_indicator, year)[0] for year in years]
+    with metrics.phase("animation"):
+        return animated_figure(figures, years, "coloraxis", redraw=True, slider_y=0.1, controls=(0, 0.1))
+
+def build_histogram_animation(data, gdp_bins=GDP_BINS):
+    years = animation_years(data)
+    figures = [update_histogram(data, year, gdp_bins)[0] for year in years]
+    with metrics.phase("animation"):
+        return animated_figure(figures, years, "yaxis", controls=(1, 1.25))
+
+def build_filled_area_animation(data, gdp_bins=GDP_BINS):
+    years = animation_years(data)
+    figures = [update_filled_area(data, year, gdp_bins)[0] for year in years]
+    with metrics.phase("animation"):
+        return animated_figure(figures, years, "yaxis", controls=(1, 1.15))
+
+def warm_figures(data):
+    """
+    Précalcule toutes les figures (5 indicateurs x années) dans le cache des nouvelles données,
+    puis les figures animées qui les assemblent
+    """
+    years = animation_years(data)
+    indicators = [option["value"] for option in create_indicator_options()]
+    jobs = [(("map", indicator, year), partial(build_map, data, indicator, year)) for indicator in indicators for year in years]
+    jobs += [(("histogram", year), partial(build_histogram, data, year)) for year in years]
+    jobs += [(("filled_area", year), partial(build_filled_area, data, year)) for year in years]
+    animations = [(("map_animation", indicator), partial(build_map_animation, data, indicator)) for indicator in indicators]
+    animations += [(("histogram_animation",), partial(build_histogram_animation, data)),
+                   (("filled_area_animation",), partial(build_filled_area_animation, data))]
+
+    start = time.perf_counter()
+    data.figures.warm(jobs)
+    data.figures.warm(animations)
+    print(f"[bootstrap] précalcul de {len(jobs) + len(animations)} figures : {(time.perf_counter() - start) * 1000:.0f} ms")
+
+if WARM_FIGURES:
+    bootstrap.on_ready.append(warm_figures)
+
+# Callback unique pour la carte, le top 3, l'histogramme et le filled area plot : un seul aller-retour
+# par changement de filtre, et la tranche (indicateur, année) et le pivot de l'année sont calculés une fois
+DASHBOARD_OUTPUTS = [Output("map-graph", "figure"),
+                     Output("top-countries-list", "children"),
+                     Output("histogram-graph", "figure"),
+                     Output("filled-area-graph", "figure")]
+DASHBOARD_INPUTS = [Input("indicator-dropdown", "value"),
+                    Input("year-dropdown", "value")]
+# Panneau des classes de PIB (mode serveur seulement)
+GDP_BINS_INPUTS = [Input("gdp-bins-mode", "value"),
+                   Input("gdp-bins-count", "value"),
+                   Input("gdp-bins-edges", "value")]
+GDP_BINS_IDS = {"gdp-bins-mode", "gdp-bins-count", "gdp-bins-edges"}
+# Animation sur toutes les années (mode serveur seulement)
+ANIMATION_INPUTS = [Input("animate-toggle", "value")]
+
+def send_figure(entry, graph_id, layouts):
+    """
+    Retourne la figure complète si le navigateur n'affiche pas déjà une figure de même mise en page,
+    sinon une mise à jour partielle (traces et titre) ; layouts est mis à jour en conséquence
+    """
+    fig, signature = entry
+    if signature is not None and layouts.get(graph_id) == signature:
+        return figure_patch(fig)
+    layouts[graph_id] = signature
     return fig
 
-# Callback pour mettre à jour le top 3 des pays
-@app.callback(
-    Output("top-countries-list", "children"),
-    [Input("indicator-dropdown", "value"),
-     Input("year-dropdown", "value")]
-)
+def update_dashboard(selected_indicator, selected_year, bins_mode, bins_count, bins_edges, animate, layouts):
+    data = bootstrap.get()
+    if data is None:
+        return {}, "Loading data...", {}, {}, {}
 
-def update_top_countries_list(selected_indicator, selected_year):
-    return update_top_countries(df, selected_indicator, selected_year)
+    layouts = dict(layouts or {})
+    # Figures animées : toutes les années en une réponse, l'année choisie ne change plus que le top 3
+    animated = bool(animate)
+    year_only = animated and ctx.triggered_id == "year-dropdown"
 
-#Callback pour mettre à jour l'histogramme en fonction de l'année 
-@app.callback(
-    Output("histogram-graph", "figure"),
-    [Input("year-dropdown", "value")]
-)
-def update_histogram(selected_year):
-    if not selected_year:
-        return {}
-    
-    # Définir les classes de PIB pour l'histogramme
-    gdp_bins = [0, 2500, 5000, 7500, 10000, 15000, 20000, 50000, 75000, 1e6]
-    
-    # Préparer les données et créer la figure
-    histo_data = prepare_histo_data(df, selected_year, gdp_bins=gdp_bins)
-    fig = create_histo_figure(histo_data, selected_year, gdp_bins)
+    # L'histogramme et le filled area plot ne dépendent que de l'année et des classes de PIB
+    if ctx.triggered_id == "indicator-dropdown" or year_only:
+        histogram, filled_area = no_update, no_update
+    else:
+        with metrics.phase("bins"):
+            gdp_bins = selected_gdp_bins(data.gdp_binner, selected_year, bins_mode, bins_count, bins_edges)
+        if animated:
+            histogram = send_figure(update_histogram_animation(data, gdp_bins), "histogram-graph", layouts)
+            filled_area = send_figure(update_filled_area_animation(data, gdp_bins), "filled-area-graph", layouts)
+        else:
+            histogram = send_figure(update_histogram(data, selected_year, gdp_bins), "histogram-graph", layouts)
+            filled_area = send_figure(update_filled_area(data, selected_year, gdp_bins), "filled-area-graph", layouts)
+
+    # La carte et le top 3 ne dépendent pas des classes de PIB
+    if ctx.triggered_id in GDP_BINS_IDS:
+        return no_update, no_update, histogram, filled_area, layouts
+
+    with metrics.phase("top_countries"):
+        top_countries = update_top_countries(data.selections, selected_indicator, selected_year)
+
+    if year_only:
+        choropleth = no_update
+    elif animated:
+        choropleth = send_figure(update_map_animation(data, selected_indicator), "map-graph", layouts)
+    else:
+        choropleth = send_figure(update_map(data, selected_indicator, selected_year), "map-graph", layouts)
+    return choropleth, top_countries, histogram, filled_area, layouts
+
+if CLIENTSIDE:
+    # Même callback exécuté dans le navigateur (assets/dashboard.js) à partir des données de cube-store
+    app.clientside_callback(
+        ClientsideFunction(namespace="dashboard", function_name="update_dashboard"),
+        DASHBOARD_OUTPUTS,
+        DASHBOARD_INPUTS + [Input("cube-store", "data")]
+    )
+else:
+    # Côté serveur, les figures dont la mise en page est déjà affichée sont envoyées en dash.Patch
+    app.callback(DASHBOARD_OUTPUTS + [Output("figure-layouts", "data")],
+                 DASHBOARD_INPUTS + GDP_BINS_INPUTS + ANIMATION_INPUTS + [State("figure-layouts", "data")])(instrument("update_dashboard", profiler)(update_dashboard))
+
+    # Message de validation des bornes saisies (mode "fixed")
+    @app.callback(Output("gdp-bins-message", "children"), [Input("gdp-bins-mode", "value"), Input("gdp-bins-edges", "value")])
+    def show_bins_message(bins_mode, bins_edges):
+        return (validate_edges(bins_edges)[1] or "") if bins_mode == "fixed" else ""
+
+# Fiche pays : un clic sur la carte change l'adresse, l'adresse ouvre (ou ferme) la fiche
+@app.callback(Output("url", "pathname"), [Input("map-graph", "clickData")], prevent_initial_call=True)
+def open_country(click_data):
+    area = area_from_click(click_data)
+    return country_path(area) if area else no_update
+
+@app.callback([Output("country-page", "style"), Output("country-graph", "figure")],
+              [Input("url", "pathname"), Input("loading-poll", "disabled")])
+@instrument("show_country", profiler)
+def show_country(pathname, _):
+    area = area_from_path(pathname)
+    if area is None:
+        return HIDDEN_STYLE, no_update
+    data = bootstrap.get()
+    if data is None:
+        return PAGE_STYLE, {}
+    return PAGE_STYLE, update_country(data, area)[0]
+
+def build_country(data, area):
+    # Lignes du pays lues dans l'index par pays (ou l'index de la base SQLite)
+    with metrics.phase("selection"):
+        series = data.countries.country_series(area)
+        population = data.countries.country_population(area)
+        item_units = data.countries.item_units()
+    with metrics.phase("figure"):
+        return create_country_figure(area, series, population, item_units)
+
+def update_country(data, area):
+    # Le pays vient de l'adresse : un pays absent des données n'est ni construit ni mis en cache
+    if not data.countries.has_area(area):
+        fig = figure_json(unknown_country_figure(area))
+        return fig, layout_signature(fig)
+    return data.figures.get_entry(("country", area), lambda: build_country(data, area))
+
+def client_payload(data):
+    """
+    Données compactes du mode clientside, construites une fois par jeu de données
+    """
+    def build():
+        years = sorted(data.df_years["year"].unique())
+        indicators = [option["value"] for option in create_indicator_options()]
+        return build_client_payload(data.selections, indicators, years,
+                                    lambda year: update_histogram(data, year)[0],
+                                    lambda year: update_filled_area(data, year)[0])
+    return data.figures.get(("client_payload",), build)
+
+# Les fonctions suivantes retournent le couple (figure JSON, empreinte de sa mise en page) du cache
+NO_FIGURE = ({}, None)
+
+def update_map(data, selected_indicator, selected_year):
+    selected_year = as_year(selected_year)
+    if not selected_indicator or not selected_year:
+        return NO_FIGURE
     
-    return fig
+    # Figure servie depuis le cache, construite au premier appel si elle n'a pas été précalculée
+    key = ("map", selected_indicator, selected_year)
+    return data.figures.get_entry(key, lambda: build_map(data, selected_indicator, selected_year))
 
-# Callback pour mettre à jour le filled area plot en fonction de l'année
-@app.callback(
-    Output("filled-area-graph", "figure"),
-    [Input("year-dropdown", "value")]
-)
-def update_filled_area(selected_year):
+def bins_cache_key(key, gdp_bins):
+    # Clé des figures aux classes GDP_BINS (précalculées) ou aux classes choisies dans le panneau
+    if gdp_bins == GDP_BINS:
+        return key
+    return key + (tuple(gdp_bins),)
+
+def update_histogram(data, selected_year, gdp_bins=GDP_BINS):
+    selected_year = as_year(selected_year)
     if not selected_year:
-        return {}
-    
-    # Définir les mêmes intervalles de PIB que l'histogramme
-    gdp_bins = [0, 2500, 5000, 7500, 10000, 15000, 20000, 50000, 75000, 1e6]
-    fig = create_filled_area_figure(df, df_pop, selected_year, gdp_bins)
-    return fig
+        return NO_FIGURE
+    return data.figures.get_entry(bins_cache_key(("histogram", selected_year), gdp_bins),
+                                  lambda: build_histogram(data, selected_year, gdp_bins))
+
+def update_filled_area(data, selected_year, gdp_bins=GDP_BINS):
+    selected_year = as_year(selected_year)
+    if not selected_year:
+        return NO_FIGURE
+    return data.figures.get_entry(bins_cache_key(("filled_area", selected_year), gdp_bins),
+                                  lambda: build_filled_area(data, selected_year, gdp_bins))
+
+# Figures animées sur toutes les années, construites une fois par indicateur (carte) ou par classes de PIB
+def update_map_animation(data, selected_indicator):
+    if not selected_indicator:
+        return NO_FIGURE
+    return data.figures.get_entry(("map_animation", selected_indicator),
+                                  lambda: build_map_animation(data, selected_indicator))
+
+def update_histogram_animation(data, gdp_bins=GDP_BINS):
+    return data.figures.get_entry(bins_cache_key(("histogram_animation",), gdp_bins),
+                                  lambda: build_histogram_animation(data, gdp_bins))
+
+def update_filled_area_animation(data, gdp_bins=GDP_BINS):
+    return data.figures.get_entry(bins_cache_key(("filled_area_animation",), gdp_bins),
+                                  lambda: build_filled_area_animation(data, gdp_bins))
 
 if __name__ == "__main__":
     app.run(debug=False)
@@ -0,0 +1,237 @@
+# Chargement des données du dashboard en arrière-plan, phase par phase, pour que le serveur démarre tout de suite
+
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+import pandas as pd
+from config import DATA_BACKEND, BDD_PATH, DATA_CHECK_INTERVAL, GDP_BINS
+from src.components.trend_line import TREND_INDICATORS
+from src.utils.clean_data import CLEAN_INDEXES, clean_data
+from src.utils.country_index import CountryIndex
+from src.utils.cube import DataCube
+from src.utils.data_access import SqliteSource, load_clean_tables
+from src.utils.figure_cache import FigureCache
+from src.utils.gdp_aggregates import GdpBinner, country_gdp_frame, load_gdp_aggregates, read_aggregate_inputs, refresh_gdp_aggregates
+from src.utils.pivot_cache import YearPivotCache
+from src.utils.selection import SelectionCache
+from src.utils.snapshot import snapshot_dir, snapshot_path
+
+class DashboardData:
+    """
+    Données utilisées par les callbacks une fois le chargement terminé
+    """
+
+    def __init__(self, df, df_pop, df_years, source, version=None, gdp_aggregates=None, gdp_binner=None,
+                 countries=None):
+        """
+        Args:
+            df: DataFrame long de clean_data (avec le backend sqlite : seulement les indicateurs de la courbe de tendance)
+            df_pop: DataFrame de clean_pop_tot
+            df_years: DataFrame avec une colonne year (années proposées dans le filtre)
+            source: DataCube ou SqliteSource
+            version: Version des fichiers de données chargés (voir data_version)
+            gdp_aggregates: Agrégats par classe de PIB matérialisés dans la base (GdpAggregates), ou None
+            gdp_binner: Découpage en classes de PIB quelconques choisies dans le dashboard (GdpBinner), ou None
+            countries: Séries par pays de la fiche pays (CountryIndex ou SqliteSource), ou None
+        """
+        self.df = df
+        self.df_pop = df_pop
+        self.df_years = df_years
+        self.source = source
+        # Pivots pays x indicateur par année, partagés par l'histogramme et le filled area plot
+        self.pivots = YearPivotCache(source)
+        # Tranches (indicateur, année) partagées par la carte et le top 3
+        self.selections = SelectionCache(source)
+        # Figures sérialisées, vidées avec ces données quand elles sont rechargées
+        self.figures = FigureCache()
+        self.version = version
+        # Agrégats de l'histogramme et du filled area plot pour GDP_BINS (lus au lieu de recalculer les classes)
+        self.gdp_aggregates = gdp_aggregates
+        # PIB triés et sommes cumulées par année pour les classes choisies par l'utilisateur
+        self.gdp_binner = gdp_binner
+        # Toutes les lignes d'un pays, lues directement pour sa fiche
+        self.countries = countries
+
+def data_version(bdd_path=BDD_PATH):
+    """
+    Retourne la date de modification des fichiers de données (base, journal WAL, instantanés) :
+    elle change à chaque nouveau clean_data
+    """
+    snapshots = snapshot_dir(bdd_path)
+    paths = [bdd_path, bdd_path + '-wal', snapshot_path('clean_data', snapshots), snapshot_path('clean_pop_tot', snapshots)]
+    return tuple(os.path.getmtime(path) if os.path.exists(path) else None for path in paths)
+
+class Bootstrap:
+    """
+    Prépare les données du dashboard (base, nettoyage, chargement, cube) dans un thread.
+    Tant que ce n'est pas terminé, get() retourne None et les callbacks affichent l'état de chargement.
+    Quand les fichiers de données changent, les données sont rechargées en arrière-plan (les anciennes
+    restent servies jusque-là). Un chargement qui échoue est relancé par get() après check_interval secondes.
+    """
+
+    def __init__(self, bdd_path=BDD_PATH, backend=DATA_BACKEND, check_interval=DATA_CHECK_INTERVAL):
+        self.bdd_path = bdd_path
+        self.backend = backend
+        self.check_interval = check_interval
+        self.data = None
+        self.error = None
+        self.timings = {}
+        # Fonctions appelées avec les nouvelles données après chaque chargement (ex. précalcul des figures)
+        self.on_ready = []
+        self._thread = None
+        self._loading = False
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+
+    @property
+    def ready(self):
+        return self.data is not None
+
+    def start(self, background=True):
+        """
+        Lance le chargement (une seule fois). Avec background=False, le chargement est fait dans le thread appelant.
+        """
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.current_thread()
+        self._launch(background)
+
+    def _launch(self, background):
+        with self._lock:
+            if self._loading:
+                return
+            self._loading = True
+            if self.data is None:
+                # Premier chargement ou nouvel essai : wait() attend sa fin
+                self._done.clear()
+        if background:
+            self._thread = threading.Thread(target=self.run, name="bootstrap", daemon=True)
+            self._thread.start()
+        else:
+            self.run()
+
+    def wait(self, timeout=None):
+        """
+        Attend la fin du chargement et retourne True si les données sont prêtes
+        """
+        self._done.wait(timeout)
+        return self.ready
+
+    def get(self):
+        """
+        Retourne les données si elles sont prêtes (et lance le chargement s'il n'a pas encore été lancé,
+        ou le relance check_interval secondes après un échec), sinon None
+        """
+        if self.data is None:
+            if self.error is None or time.monotonic() - self._last_check > self.check_interval:
+                self.start()
+        elif time.monotonic() - self._last_check > self.check_interval:
+            self._last_check = time.monotonic()
+            if data_version(self.bdd_path) != self.data.version:
+                self._launch(background=True)
+        return self.data
+
+    def status(self):
+        """
+        État du chargement pour la route /ready
+        """
+        return {
+            "ready": self.ready,
+            "error": self.error,
+            "phases_ms": {phase: round(seconds * 1000, 1) for phase, seconds in self.timings.items()},
+        }
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        yield
+        self.timings[name] = time.perf_counter() - start
+        print(f"[bootstrap] {name} : {self.timings[name] * 1000:.0f} ms")
+
+    def run(self):
+        data = None
+        try:
+            with self.phase("base"):
+                con = sqlite3.connect(self.bdd_path)
+                trouvees = {row[0] for row in con.execute("SELECT name FROM sqlite_master WHERE type='table';")}
+                colonnes = {row[1] for row in con.execute("PRAGMA table_info(clean_data)")}
+                con.close()
+
+            # Tables absentes, ou nettoyées avant l'ajout des codes pays (area_key, iso3)
+            if 'clean_data' not in trouvees or 'clean_pop_tot' not in trouvees or 'area_key' not in colonnes:
+                # Peut télécharger les données brutes (get_data) si elles sont absentes
+                with self.phase("nettoyage"):
+                    clean_data(bdd_path=self.bdd_path)
+            elif self.backend == "sqlite":
+                # Index ajoutés depuis le dernier nettoyage (ex. index par pays de la fiche pays)
+                with self.phase("index"):
+                    con = sqlite3.connect(self.bdd_path)
+                    try:
+                        for sql in CLEAN_INDEXES:
+                            con.execute(sql)
+                        con.commit()
+                    finally:
+                        con.close()
+
+            with self.phase("chargement"):
+                if self.backend == "sqlite":
+                    # Requêtes paramétrées sur la base indexée : seules les tranches demandées sont lues
+                    source = SqliteSource(self.bdd_path)
+                    df = source.items_frame(TREND_INDICATORS)
+                    df_years = pd.DataFrame({"year": source.years()})
+                    df_pop = source.population()
+                else:
+                    # Instantané Arrow (memory mapping) s'il existe, sinon lecture de SQLite
+                    df, df_pop = load_clean_tables(self.bdd_path)
+                    df_years = df
+                    source = None
+
+            if source is None:
+                # Cube indicateur x année x pays construit une seule fois pour les callbacks
+                with self.phase("cube"):
+                    source = DataCube(df)
+                # Positions des lignes de chaque pays pour la fiche pays
+                with self.phase("index pays"):
+                    countries = CountryIndex(df, df_pop)
+            else:
+                # Avec le backend sqlite, la fiche pays est lue grâce à l'index (area, item, year) de la base
+                countries = source
+
+            with self.phase("agrégats"):
+                con = sqlite3.connect(self.bdd_path)
+                try:
+                    gdp_aggregates = load_gdp_aggregates(con, GDP_BINS)
+                    if gdp_aggregates is None:
+                        # Base nettoyée avant les agrégats, ou classes de PIB modifiées dans config.py
+                        refresh_gdp_aggregates(con, GDP_BINS)
+                        gdp_aggregates = load_gdp_aggregates(con, GDP_BINS)
+                    # Avec le backend sqlite, df ne contient que les indicateurs de la courbe de tendance
+                    inputs = read_aggregate_inputs(con) if self.backend == "sqlite" else (df, df_pop)
+                finally:
+                    con.close()
+                gdp_binner = GdpBinner(country_gdp_frame(*inputs))
+
+            # Version relevée après le chargement : l'ouverture de la base peut fusionner le journal WAL
+            data = DashboardData(df, df_pop, df_years, source, data_version(self.bdd_path), gdp_aggregates,
+                                 gdp_binner, countries)
+            self.data = data
+            self.error = None
+            self._last_check = time.monotonic()
+        except Exception as exc:
+            self.error = f"{type(exc).__name__}: {exc}"
+            print(f"[bootstrap] échec du chargement des données : {self.error}")
+            self._last_check = time.monotonic()
+        finally:
+            self._loading = False
+            if self.data is None:
+                # Échec sans données : start() pourra relancer le chargement (voir get)
+                self._thread = None
+            self._done.set()
+
+        if data is not None:
+            for callback in self.on_ready:
+                callback(data)
@@ -1,103 +1,137 @@
-from src.utils.get_data import get_data
-import pandas as pd 
+from config import BDD_PATH, GDP_BINS
+from src.utils.get_data import get_data, swap_tables
+from src.utils.gdp_aggregates import refresh_gdp_aggregates
+from src.utils.snapshot import snapshot_dir, write_snapshot
+from src.utils.country_codes import iso3_from_m49, m49_from_codes, m49_from_iso3, m49_from_names
+import pandas as pd
 import sqlite3
+import sys
 
-def clean_data():
+# Régions et groupes de pays FAOSTAT à exclure (on ne garde que les pays)
+EXCLUDED_AREAS = frozenset([
+    "World",
+    "Europe",
+    "Eastern Europe",
+    "Western Europe",
+    "Northern Europe",
+    "Southern Europe",
+    "Asia",
+    "Eastern Asia",
+    "Eastern Asia and South-eastern Asia",
+    "Southern Asia",
+    "Southern Asia (excluding India)",
+    "South-eastern Asia",
+    "Central Asia and Southern Asia",
+    "Central Asia",
+    "Western Asia",
+    "Africa",
+    "Eastern Africa",
+    "Middle Africa",
+    "Northern Africa",
+    "Southern Africa",
+    "Western Africa",
+    "Western Asia and Northern Africa",
+    "Sub-Saharan Africa (including Sudan)",
+    "Sub-Saharan Africa",
+    "Northern Africa (excluding Sudan)",
+    "Latin America and the Caribbean",
+    "Northern America",
+    "Central America",
+    "South America",
+    "Northern America and Europe",
+    "Oceania",
+    "Oceania excluding Australia and New Zealand",
+    "European Union (27)",
+    "High-income economies",
+    "Low-income economies",
+    "Lower-middle-income economies",
+    "Upper-middle-income economies",
+    "Least Developed Countries (LDCs)",
+    "Small Island Developing States (SIDS)",
+    "Land Locked Developing Countries (LLDCs)",
+    "Low Income Food Deficit Countries (LIFDCs)"
+])
+
+def map_unique(series, func):
     """
-    Nettoie les données brutes téléchargées et les sauvegarde dans une base de données sqlite3
-    """ 
-    # Conexion à la base de données
-    bdd_path = 'faostat_data.db'
-    conn = sqlite3.connect(bdd_path)
+    Applique une transformation vectorisée aux seules valeurs distinctes d'une colonne puis la redistribue
+    sur toutes les lignes (les pays, items, années et valeurs se répètent beaucoup)
+    """
+    codes, uniques = pd.factorize(series)
+    result = func(pd.Series(uniques))
+    # allow_fill : le code -1 (valeur manquante) donne une valeur manquante
+    return pd.Series(result.array.take(codes, allow_fill=True), index=series.index)
 
-    # Vérification de l'existence des tables raw_data et raw_pop_tot
-    cur = conn.cursor()
-    cur.execute(
-        "SELECT name FROM sqlite_master WHERE type='table';"
-    )
-    trouvees = {row[0] for row in cur.fetchall()}
-    if 'raw_data' not in trouvees or 'raw_pop_tot' not in trouvees:
-        get_data()
+def strip_text(series):
+    """
+    Supprime les espaces autour des textes
+    """
+    return map_unique(series.astype(str), lambda uniques: uniques.str.strip())
 
-    # Importation des données depuis la base sqlite3
-    df = pd.read_sql_query("SELECT * FROM raw_data", conn)
-    df_pop = pd.read_sql_query("SELECT * FROM raw_pop_tot", conn)
+def parse_years(series):
+    """
+    Convertit les années en entiers : les périodes "YYYY-YYYY" (moyennes sur 3 ans) donnent leur année centrale
+    """
+    def middle_year(uniques):
+        bounds = uniques.str.extract(r'^(\d{4})-(\d{4})$').astype(float)
+        middle = (bounds[0] + bounds[1]) // 2
+        return middle.fillna(pd.to_numeric(uniques, errors='coerce')).astype('Int16')
+    return map_unique(series.astype(str), middle_year)
+
+def parse_values(series):
+    """
+    Convertit les valeurs FAOSTAT en nombres : virgule décimale et bornes "<2.5" (gardées à 2.5)
+    """
+    if series.dtype == "object" or pd.api.types.is_string_dtype(series):
+        def to_number(uniques):
+            uniques = uniques.str.replace(',', '.', regex=False).str.lstrip('<').str.strip()
+            return pd.to_numeric(uniques, errors='coerce')
+        return map_unique(series, to_number).astype(float)
+    return pd.to_numeric(series, errors='coerce')
 
+def clean_faostat(df):
+    """
+    Nettoie un DataFrame brut de raw_data (colonnes FAOSTAT) et retourne les données des pays
+    """
     # On supprime les colonnes inutiles
-    colonnes_drop = ["Element","Element Code","Domain","Domain Code"] 
+    colonnes_drop = ["Element","Element Code","Domain","Domain Code"]
     df = df.drop(columns=colonnes_drop, errors='ignore')
 
-    # Suppression des lignes avec des valeurs manquantes dans la colonne "Value"
-    df = df.dropna(subset=["Value"])
-
     #On standardise les noms de colonnes
     df.columns = df.columns.str.lower().str.replace(' ', '_')
 
-    #On va ensuite nettoyer les données avec du texte 
-    #On définit les colonnes textuelles à nettoyer
-    text_columns = ["area", "item", "unit"]
-
-    for col in text_columns:
-        df[col] = df[col].astype(str).str.strip()  # supprimer espaces
-
-    #on cherche a extraire l'année au centre 
-    def extract_middle_year(s): 
-        if len(s) == 9:
-            start = int(s[2:4])
-            end = int(s[6:])
-            return 2000 + (start + end) // 2
-        else :
-            return s
-
-    # On applique les filtres de nettoyage sur le DataFrame
-    df["year"] = df["year"].apply(extract_middle_year)
-    df["item"] = df["item"].str.strip()
-    df["value"] = pd.to_numeric(df["value"].str.replace(',', '.').replace('<', '') if df["value"].dtype == "object" else df["value"], errors='coerce')
-
-    exclude_items = [
-        "World",
-        "Europe",
-        "Eastern Europe",
-        "Western Europe",
-        "Northern Europe",
-        "Southern Europe",
-        "Asia",
-        "Eastern Asia",
-        "Eastern Asia and South-eastern Asia",
-        "Southern Asia",
-        "Southern Asia (excluding India)",
-        "South-eastern Asia",
-        "Central Asia and Southern Asia",
-        "Central Asia",
-        "Western Asia",
-        "Africa",
-        "Eastern Africa",
-        "Middle Africa",
-        "Northern Africa",
-        "Southern Africa",
-        "Western Africa",
-        "Western Asia and Northern Africa",
-        "Sub-Saharan Africa (including Sudan)",
-        "Sub-Saharan Africa",
-        "Northern Africa (excluding Sudan)",
-        "Latin America and the Caribbean",
-        "Northern America",
-        "Central America",
-        "South America",
-        "Northern America and Europe",
-        "Oceania",
-        "Oceania excluding Australia and New Zealand",
-        "European Union (27)",
-        "High-income economies",
-        "Low-income economies",
-        "Lower-middle-income economies",
-        "Upper-middle-income economies",
-        "Least Developed Countries (LDCs)",
-        "Small Island Developing States (SIDS)",
-        "Land Locked Developing Countries (LLDCs)",
-        "Low Income Food Deficit Countries (LIFDCs)"
-    ]
-    df = df[~(df['area'].isin(exclude_items))]
+    # Lignes gardées : valeur renseignée et pays (les régions sont exclues).
+    # Le test des régions est fait sur les pays distincts puis étendu aux lignes.
+    area_codes, areas = pd.factorize(df["area"].astype(str))
+    areas = pd.Index(areas).str.strip()
+    keep = df["value"].notna().to_numpy() & ~areas.isin(EXCLUDED_AREAS)[area_codes]
+
+    #On va ensuite nettoyer les données avec du texte
+    df = df[keep]
+    df["area"] = areas.take(area_codes[keep])
+    for col in ["item", "unit"]:
+        df[col] = strip_text(df[col])
+
+    # Année centrale des périodes et conversion des valeurs en nombres (opérations sur des colonnes entières)
+    df["year"] = parse_years(df["year"])
+    df["value"] = parse_values(df["value"])
+
+    # Clé pays entière (code M49) et code ISO-3 de la carte, résolus une fois sur les pays distincts
+    area_key = map_unique(df["area"], m49_from_names)
+    if "area_code_(m49)" in df.columns:
+        area_key = map_unique(df["area_code_(m49)"], m49_from_codes).fillna(area_key)
+    df["area_key"] = area_key
+    df["iso3"] = map_unique(area_key, iso3_from_m49)
+    return df
+
+def clean_population(df_pop):
+    """
+    Nettoie un DataFrame brut de raw_pop_tot (population de la Banque Mondiale)
+    """
+    # Clé pays (code M49) depuis le code ISO-3 de la Banque Mondiale, ou depuis le nom pour les anciennes tables
+    area_key = map_unique(df_pop['country.value'], m49_from_names)
+    if 'countryiso3code' in df_pop.columns:
+        area_key = map_unique(df_pop['countryiso3code'], m49_from_iso3).fillna(area_key)
 
     # Garder les colonnes utiles
     df_pop = df_pop[['country.value','date','value']]
@@ -106,16 +140,134 @@ def clean_data():
         'date':'year',
         'value':'value'
     })
+    df_pop['area_key'] = area_key
+
+    # Les agrégats de la Banque Mondiale (monde, régions, niveaux de revenu) n'ont pas de code pays
+    df_pop = df_pop[df_pop['area_key'].notna()]
 
     # Convertir l’année en int, la valeur en float
     df_pop['year'] = df_pop['year'].astype(int)
     df_pop['value'] = pd.to_numeric(df_pop['value'], errors='coerce')
+    return df_pop
 
-    # Sauvegarde des données nettoyées dans une base sqlite3
-    df.to_sql('clean_data', conn, if_exists='replace', index=False)
-    df_pop.to_sql('clean_pop_tot', conn, if_exists='replace', index=False)
-    conn.close()
+# Types SQLite des colonnes des tables nettoyées (les autres colonnes sont typées d'après pandas)
+COLUMN_TYPES = {
+    'area': 'TEXT NOT NULL',
+    'area_key': 'INTEGER',
+    'iso3': 'TEXT',
+    'item': 'TEXT',
+    'item_code': 'INTEGER',
+    'unit': 'TEXT',
+    'year': 'INTEGER NOT NULL',
+    'value': 'REAL',
+}
+
+# Index utilisés par les requêtes du dashboard (src/utils/data_access.py)
+CLEAN_INDEXES = [
+    'CREATE INDEX IF NOT EXISTS idx_clean_data_item_year_area ON clean_data (item, year, area)',
+    'CREATE INDEX IF NOT EXISTS idx_clean_pop_tot_year_area ON clean_pop_tot (year, area_key)',
+    # Fiche d'un pays : toutes ses lignes lues sans parcourir la table
+    'CREATE INDEX IF NOT EXISTS idx_clean_data_area_item_year ON clean_data (area, item, year)',
+    'CREATE INDEX IF NOT EXISTS idx_clean_pop_tot_area_year ON clean_pop_tot (area_key, year)',
+]
+
+def create_typed_table(conn, table, df):
+    """
+    Crée la table avec des colonnes typées à partir des colonnes du DataFrame
+    """
+    columns = []
+    for col, dtype in df.dtypes.items():
+        if col in COLUMN_TYPES:
+            sql_type = COLUMN_TYPES[col]
+        elif pd.api.types.is_integer_dtype(dtype):
+            sql_type = 'INTEGER'
+        elif pd.api.types.is_float_dtype(dtype):
+            sql_type = 'REAL'
+        else:
+            sql_type = 'TEXT'
+        columns.append(f'"{col}" {sql_type}')
+    conn.execute(f'DROP TABLE IF EXISTS "{table}"')
+    conn.execute(f'CREATE TABLE "{table}" ({", ".join(columns)})')
+
+def write_clean_table(conn, chunks, staging, empty):
+    """
+    Écrit les lots nettoyés dans une table temporaire typée
+
+    Args:
+        empty: Fonction qui retourne le DataFrame nettoyé vide d'une table brute sans lignes : la table temporaire
+            est créée avec ses colonnes même si la lecture par lots ne donne aucun lot
+    """
+    created = False
+    for chunk in chunks:
+        if not created:
+            create_typed_table(conn, staging, chunk)
+            created = True
+        chunk.to_sql(staging, conn, if_exists='append', index=False)
+    if not created:
+        create_typed_table(conn, staging, empty())
+
+def clean_data(chunksize=None, bdd_path=BDD_PATH):
+    """
+    Nettoie les données brutes téléchargées et les sauvegarde dans une base de données sqlite3
+
+    Les tables clean_data et clean_pop_tot sont typées et indexées (voir CLEAN_INDEXES). Elles sont
+    d'abord écrites dans des tables temporaires puis échangées d'un coup, et la base passe en mode WAL
+    pour que le dashboard puisse continuer à les lire pendant l'écriture. Les agrégats par classe de PIB
+    (GDP_BINS de config.py) sont ensuite mis à jour pour les seules années modifiées (src/utils/gdp_aggregates.py),
+    puis un instantané Arrow des deux tables est écrit dans snapshot/, à côté de la base (src/utils/snapshot.py).
+
+    Args:
+        chunksize: Si fourni, les tables brutes sont lues et nettoyées par lots de chunksize lignes
+            (mémoire constante)
+        bdd_path: Base sqlite3 des tables brutes et nettoyées (BDD_PATH de config.py par défaut)
+    """ 
+    # Conexion à la base de données
+    conn = sqlite3.connect(bdd_path)
+    conn.execute('PRAGMA journal_mode=WAL')
+
+    # Vérification de l'existence des tables raw_data et raw_pop_tot
+    cur = conn.cursor()
+    cur.execute(
+        "SELECT name FROM sqlite_master WHERE type='table';"
+    )
+    trouvees = {row[0] for row in cur.fetchall()}
+    if 'raw_data' not in trouvees or 'raw_pop_tot' not in trouvees:
+        get_data(bdd_path=bdd_path)
+
+    if chunksize:
+        # Importation et nettoyage par lots depuis la base sqlite3
+        df = (clean_faostat(chunk) for chunk in pd.read_sql_query("SELECT * FROM raw_data", conn, chunksize=chunksize))
+        df_pop = (clean_population(chunk) for chunk in pd.read_sql_query("SELECT * FROM raw_pop_tot", conn, chunksize=chunksize))
+    else:
+        # Importation des données depuis la base sqlite3
+        df = pd.read_sql_query("SELECT * FROM raw_data", conn)
+        df_pop = pd.read_sql_query("SELECT * FROM raw_pop_tot", conn)
+
+        # On applique les filtres de nettoyage sur les DataFrames
+        df = [clean_faostat(df)]
+        df_pop = [clean_population(df_pop)]
+
+    # Sauvegarde des données nettoyées dans des tables temporaires puis échange atomique
+    # (colonnes des tables vides : nettoyage des tables brutes sans lignes)
+    write_clean_table(conn, df, 'clean_data__staging',
+                      lambda: clean_faostat(pd.read_sql_query("SELECT * FROM raw_data LIMIT 0", conn)))
+    write_clean_table(conn, df_pop, 'clean_pop_tot__staging',
+                      lambda: clean_population(pd.read_sql_query("SELECT * FROM raw_pop_tot LIMIT 0", conn)))
+    swap_tables(conn, {'clean_data__staging': 'clean_data', 'clean_pop_tot__staging': 'clean_pop_tot'}, after=CLEAN_INDEXES)
     print(f"Données nettoyées sauvegardées dans la base de données : {bdd_path}")
 
+    # Agrégats de l'histogramme et du filled area plot, recalculés seulement pour les années modifiées
+    years = refresh_gdp_aggregates(conn, GDP_BINS)
+    print(f"Agrégats par classe de PIB mis à jour : {len(years)} année(s)")
+
+    # Instantané colonne lu au démarrage du dashboard (ignoré si pyarrow n'est pas installé)
+    for table in ['clean_data', 'clean_pop_tot']:
+        path = write_snapshot(conn, table, snapshot_dir(bdd_path), chunksize=chunksize)
+        if path:
+            print(f"Instantané écrit : {path}")
+    conn.close()
+
 if __name__ == "__main__":
-    clean_data()
\ No newline at end of file
+    # python -m src.utils.clean_data --chunksize 100000 pour le nettoyage par lots
+    chunksize = int(sys.argv[sys.argv.index("--chunksize") + 1]) if "--chunksize" in sys.argv else None
+    clean_data(chunksize=chunksize)
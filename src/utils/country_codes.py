@@ -0,0 +1,45 @@
+# Correspondance des pays entre FAOSTAT (code M49), la Banque Mondiale (code ISO-3) et la carte Plotly (ISO-3)
+
+import os
+from functools import lru_cache
+import pandas as pd
+
+# Table livrée avec le projet : codes M49 / ISO 3166-1 des pays, plus les codes propres à FAOSTAT
+# ("China" = 159 pour l'ensemble de la Chine, zones historiques sans code ISO-3)
+COUNTRY_CODES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'country_codes.csv')
+
+@lru_cache(maxsize=None)
+def load_country_codes(path=COUNTRY_CODES_PATH):
+    """
+    Retourne la table (m49, iso3, name) ; iso3 est vide pour les zones sans équivalent sur la carte
+    """
+    return pd.read_csv(path, dtype={'m49': 'int64', 'iso3': 'str', 'name': 'str'})
+
+def m49_from_codes(codes):
+    """
+    Convertit les codes M49 de FAOSTAT ("004", parfois "'004") en entiers
+    """
+    return pd.to_numeric(codes.astype(str).str.lstrip("'"), errors='coerce').astype('Int64')
+
+def m49_from_iso3(iso3):
+    """
+    Convertit les codes ISO-3 (Banque Mondiale) en codes M49 ; les agrégats (WLD, EUU, ...) donnent une valeur manquante
+    """
+    codes = load_country_codes().dropna(subset=['iso3'])
+    return iso3.map(pd.Series(codes['m49'].to_numpy(), index=codes['iso3'])).astype('Int64')
+
+def m49_from_names(names):
+    """
+    Convertit des noms de pays en codes M49 (tables brutes sans colonne de code)
+    """
+    codes = load_country_codes()
+    return names.map(pd.Series(codes['m49'].to_numpy(), index=codes['name'])).astype('Int64')
+
+def iso3_from_m49(keys):
+    """
+    Retourne le code ISO-3 de chaque code M49 (valeur manquante si la zone n'est pas sur la carte)
+    """
+    codes = load_country_codes().dropna(subset=['iso3'])
+    iso3 = keys.map(pd.Series(codes['iso3'].to_numpy(), index=codes['m49']))
+    # Les codes manquants restent manquants (astype('str') les écrirait 'nan' avec pandas 2)
+    return iso3.astype('str').where(iso3.notna())
@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+
+def label_index(labels):
+    # Étiquettes simples (texte) d'un axe factorisé, y compris depuis une colonne catégorielle
+    return pd.Index(labels.astype(str)) if isinstance(labels, pd.CategoricalIndex) else labels
+
+class CountryIndex:
+    """
+    Index des tables nettoyées par pays, construit une seule fois au chargement : les lignes sont triées par
+    (pays, indicateur, année), les doublons moyennés, et les bornes de chaque pays gardées. La fiche d'un pays
+    (toutes les années et tous les indicateurs, et sa population) est ainsi un simple découpage de tableaux
+    au lieu d'un filtre sur toute la table longue.
+    Même interface que SqliteSource (country_series, country_population, item_units).
+    """
+
+    def __init__(self, df, df_pop):
+        """
+        Args:
+            df: DataFrame long de clean_data (area, area_key, item, unit, year, value)
+            df_pop: DataFrame de clean_pop_tot (area_key, year, value)
+        """
+        area_codes, areas = pd.factorize(df["area"], sort=True)
+        item_codes, items = pd.factorize(df["item"], sort=True)
+        self.items = label_index(items)
+        self.area_index = {area: i for i, area in enumerate(label_index(areas))}
+
+        # Tri par pays, indicateur et année, puis moyenne des doublons (même résultat que DataCube)
+        # (une seule clé entière pays x indicateur x année, plus rapide à trier que trois colonnes)
+        years = df["year"].to_numpy()
+        first_year = int(years.min()) if len(years) else 0
+        span = int(years.max()) - first_year + 1 if len(years) else 1
+        keys = (area_codes.astype(np.int64) * len(items) + item_codes) * span + (years - first_year)
+        order = np.argsort(keys, kind="stable")
+        keys, area_codes, item_codes, years = keys[order], area_codes[order], item_codes[order], years[order]
+        values = df["value"].to_numpy(dtype=float)[order]
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = keys[1:] != keys[:-1]
+        starts = np.flatnonzero(first)
+        counts = np.diff(np.append(starts, len(order)))
+        self.item_codes = item_codes[starts]
+        self.years = years[starts]
+        self.values = (np.add.reduceat(values, starts) / counts).astype(np.float32) if len(starts) else values
+        self.bounds = np.searchsorted(area_codes[starts], np.arange(len(self.area_index) + 1))
+
+        # Population reliée par la clé M49 du pays (les noms diffèrent entre FAOSTAT et la Banque mondiale)
+        # (clé de la première ligne de chaque pays)
+        self.area_keys = np.full(len(self.area_index), -1, dtype=np.int64)
+        if "area_key" in df.columns:
+            listed = np.flatnonzero(np.diff(self.bounds) > 0)
+            area_keys = df["area_key"].take(order[starts[self.bounds[listed]]])
+            known = area_keys.notna().to_numpy()
+            self.area_keys[listed[known]] = area_keys[known].to_numpy(dtype=np.int64)
+        pop = df_pop[df_pop["area_key"].notna()]
+        pop_keys = pop["area_key"].to_numpy(dtype=np.int64)
+        pop_order = np.lexsort((pop["year"].to_numpy(), pop_keys))
+        self.pop_keys = pop_keys[pop_order]
+        self.pop_years = pop["year"].to_numpy()[pop_order]
+        self.pop_values = pop["value"].to_numpy()[pop_order]
+
+        # Unité de chaque indicateur (celle de sa première ligne)
+        codes, first_rows = np.unique(self.item_codes, return_index=True)
+        units = df["unit"].take(order[starts[first_rows]]).to_numpy() if "unit" in df.columns else [""] * len(codes)
+        self.units = {str(self.items[code]): str(unit) for code, unit in zip(codes, units)}
+
+    def has_area(self, area):
+        """
+        Retourne True si le pays est présent dans les tables nettoyées
+        """
+        return area in self.area_index
+
+    def item_units(self):
+        """
+        Retourne le dictionnaire indicateur -> unité de tous les indicateurs, triés par nom
+        """
+        return dict(sorted(self.units.items()))
+
+    def country_series(self, area):
+        """
+        Retourne les lignes (item, year, value) du pays triées par indicateur et année, vide si le pays est inconnu
+        """
+        i = self.area_index.get(area)
+        if i is None:
+            return pd.DataFrame(columns=["item", "year", "value"])
+        rows = slice(self.bounds[i], self.bounds[i + 1])
+        return pd.DataFrame({"item": self.items.take(self.item_codes[rows]), "year": self.years[rows],
+                             "value": self.values[rows]})
+
+    def country_population(self, area):
+        """
+        Retourne la population (year, value) du pays triée par année, vide si elle est inconnue
+        """
+        i = self.area_index.get(area)
+        key = self.area_keys[i] if i is not None else -1
+        start, stop = np.searchsorted(self.pop_keys, [key, key + 1]) if key >= 0 else (0, 0)
+        return pd.DataFrame({"year": self.pop_years[start:stop], "value": self.pop_values[start:stop]})
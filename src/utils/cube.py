@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+from src.utils.schema import as_year
+
+class DataCube:
+    """
+    Cube dense indicateur x année x pays construit une seule fois à partir du DataFrame long de clean_data.
+
+    Les années, les indicateurs (item) et les pays (area) sont codés en entiers et les valeurs
+    sont stockées dans un tableau NumPy float32 (NaN = pas de donnée). Les callbacks lisent ainsi
+    le vecteur des pays pour un couple (indicateur, année) par simple découpage, sans filtrer le DataFrame.
+    """
+
+    def __init__(self, df):
+        """
+        Args:
+            df: DataFrame long avec les colonnes area, item, year et value (schéma de src/utils/schema.py)
+        """
+        # Codage entier des axes (triés pour garder l'ordre d'un groupby)
+        item_codes, self.items = pd.factorize(df["item"], sort=True)
+        year_codes, self.years = pd.factorize(df["year"], sort=True)
+        area_codes, self.areas = pd.factorize(df["area"], sort=True)
+
+        # Colonnes catégorielles (instantané Arrow) : on garde des étiquettes simples sur les axes
+        self.items, self.areas = (pd.Index(labels.astype(str)) if isinstance(labels, pd.CategoricalIndex) else labels
+                                  for labels in (self.items, self.areas))
+
+        # Clé M49 et code ISO-3 de chaque pays, alignés sur self.areas (tables nettoyées par clean_data)
+        first = np.unique(area_codes, return_index=True)[1]
+        self.area_keys = df["area_key"].array.take(first) if "area_key" in df.columns else None
+        self.area_iso3 = np.asarray(df["iso3"].astype(object).to_numpy()[first]) if "iso3" in df.columns else None
+
+        # Index label -> position ; les années sont des entiers (voir as_year)
+        self.item_index = {item: i for i, item in enumerate(self.items)}
+        self.year_index = {int(year): i for i, year in enumerate(self.years)}
+        self.area_index = {area: i for i, area in enumerate(self.areas)}
+
+        shape = (len(self.items), len(self.years), len(self.areas))
+        values = pd.to_numeric(df["value"], errors="coerce").to_numpy(dtype=float)
+        known = ~np.isnan(values)
+
+        # Moyenne des doublons éventuels (même résultat que le groupby("area").mean() d'origine)
+        sums = np.zeros(shape)
+        counts = np.zeros(shape, dtype=np.int32)
+        np.add.at(sums, (item_codes[known], year_codes[known], area_codes[known]), values[known])
+        np.add.at(counts, (item_codes[known], year_codes[known], area_codes[known]), 1)
+
+        # Moyennes calculées en float64 puis stockées en float32 comme les valeurs chargées
+        self.mask = counts > 0
+        means = np.full(shape, np.nan)
+        np.divide(sums, counts, out=means, where=self.mask)
+        self.values = means.astype(np.float32)
+
+    def country_vector(self, indicator, year):
+        """
+        Retourne le vecteur des valeurs par pays (aligné sur self.areas) pour un indicateur et une année,
+        ou None si le couple n'existe pas dans les données
+        """
+        i = self.item_index.get(indicator)
+        j = self.year_index.get(as_year(year))
+        if i is None or j is None:
+            return None
+        return self.values[i, j]
+
+    def country_values(self, indicator, year):
+        """
+        Retourne un DataFrame (area, value) des pays ayant une valeur pour l'indicateur et l'année donnés
+        """
+        vector = self.country_vector(indicator, year)
+        if vector is None:
+            return pd.DataFrame(columns=["area", "value"])
+        known = ~np.isnan(vector)
+        country_data = pd.DataFrame({"area": self.areas[known], "value": vector[known]})
+        if self.area_iso3 is not None:
+            country_data["iso3"] = self.area_iso3[known]
+        return country_data
+
+    def year_pivot(self, year):
+        """
+        Retourne le pivot area x item de l'année (colonne area + une colonne par item), comme
+        subset.pivot_table(index='area', columns='item', values='value', aggfunc='mean').reset_index()
+        """
+        j = self.year_index.get(as_year(year))
+        if j is None:
+            return pd.DataFrame(columns=['area'])
+
+        # Tranche item x area du cube, transposée en area x item
+        wide = pd.DataFrame(self.values[:, j, :].T, index=self.areas, columns=self.items)
+        # Comme pivot_table : on enlève les pays et les indicateurs sans aucune valeur
+        rows = wide.notna().any(axis=1).to_numpy()
+        wide = wide[rows].dropna(axis=1, how='all')
+        wide.columns.name = 'item'
+        if self.area_keys is not None:
+            # Clé entière pour les jointures (population du filled area plot)
+            wide.index = pd.MultiIndex.from_arrays([wide.index, self.area_keys[rows]], names=['area', 'area_key'])
+        else:
+            wide.index.name = 'area'
+        return wide.reset_index()
@@ -0,0 +1,136 @@
+# Accès aux tables nettoyées par requêtes SQL paramétrées (sans charger toute la table en mémoire)
+
+import os
+import sqlite3
+import threading
+import pandas as pd
+from config import BDD_PATH
+from src.utils.schema import CLEAN_DATA_DTYPES, CLEAN_POP_DTYPES, canonical_frame
+from src.utils.snapshot import read_snapshot, snapshot_dir
+
+def connect_readonly(bdd_path):
+    """
+    Ouvre une connexion en lecture seule sur la base sqlite3
+    """
+    return sqlite3.connect(f"file:{bdd_path}?mode=ro", uri=True, check_same_thread=False)
+
+def load_clean_tables(bdd_path=BDD_PATH):
+    """
+    Charge clean_data (lignes avec une valeur) et clean_pop_tot au schéma canonique (src/utils/schema.py) :
+    depuis l'instantané Arrow de la base (snapshot/ à côté du fichier) en mémoire partagée s'il existe,
+    sinon depuis SQLite
+    """
+    df = read_snapshot("clean_data", snapshot_dir(bdd_path))
+    df_pop = read_snapshot("clean_pop_tot", snapshot_dir(bdd_path))
+    if df is None or df_pop is None:
+        con = sqlite3.connect(bdd_path)
+        df = pd.read_sql_query(f"SELECT {', '.join(CLEAN_DATA_DTYPES)} FROM clean_data WHERE value IS NOT NULL", con)
+        df_pop = pd.read_sql_query(f"SELECT {', '.join(CLEAN_POP_DTYPES)} FROM clean_pop_tot", con)
+        con.close()
+    return canonical_frame(df, CLEAN_DATA_DTYPES), canonical_frame(df_pop, CLEAN_POP_DTYPES)
+
+class SqliteSource:
+    """
+    Source de données des callbacks lue directement dans SQLite : chaque requête ne récupère que sa tranche
+    grâce à l'index (item, year, area) de clean_data. Même interface que DataCube (country_values).
+    Chaque thread du serveur utilise sa propre connexion en lecture seule (rouverte après un fork : une connexion
+    SQLite ne doit pas être partagée entre processus).
+    """
+
+    def __init__(self, bdd_path=BDD_PATH):
+        self.bdd_path = bdd_path
+        self._local = threading.local()
+
+    @property
+    def conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = connect_readonly(self.bdd_path)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def query(self, sql, params=()):
+        return pd.read_sql_query(sql, self.conn, params=params)
+
+    def country_values(self, indicator, year):
+        """
+        Retourne un DataFrame (area, value) des pays ayant une valeur pour l'indicateur et l'année donnés
+        (valeurs en float32 comme DataCube)
+        """
+        country_data = self.query(
+            "SELECT area, AVG(value) AS value, MAX(iso3) AS iso3 FROM clean_data "
+            "WHERE item = ? AND year = ? AND value IS NOT NULL GROUP BY area ORDER BY area",
+            (indicator, int(year)),
+        )
+        return country_data.astype({"value": CLEAN_DATA_DTYPES["value"]})
+
+    def years(self):
+        """
+        Retourne la liste triée des années disponibles
+        """
+        return [row[0] for row in self.conn.execute("SELECT DISTINCT year FROM clean_data ORDER BY year")]
+
+    def items_frame(self, items):
+        """
+        Retourne les lignes (area, item, year, value) des indicateurs demandés (ex. pour la courbe de tendance)
+        """
+        placeholders = ", ".join("?" for _ in items)
+        return canonical_frame(self.query(
+            f"SELECT area, item, year, value FROM clean_data WHERE item IN ({placeholders}) AND value IS NOT NULL",
+            tuple(items),
+        ), CLEAN_DATA_DTYPES)
+
+    def year_pivot(self, year):
+        """
+        Retourne le pivot area x item de l'année (même format que DataCube.year_pivot)
+        """
+        long_df = self.query(
+            "SELECT area, area_key, item, AVG(value) AS value FROM clean_data "
+            "WHERE year = ? AND value IS NOT NULL GROUP BY area, area_key, item",
+            (int(year),),
+        )
+        if long_df.empty:
+            return pd.DataFrame(columns=["area"])
+        return long_df.pivot(index=["area", "area_key"], columns="item", values="value").reset_index()
+
+    def item_units(self):
+        """
+        Retourne le dictionnaire indicateur -> unité de tous les indicateurs, triés par nom (même format que CountryIndex)
+        """
+        return dict(self.conn.execute("SELECT item, MAX(unit) FROM clean_data GROUP BY item ORDER BY item").fetchall())
+
+    def has_area(self, area):
+        """
+        Retourne True si le pays est présent dans clean_data (lu grâce à l'index (area, item, year))
+        """
+        return self.conn.execute("SELECT 1 FROM clean_data WHERE area = ? LIMIT 1", (area,)).fetchone() is not None
+
+    def country_series(self, area):
+        """
+        Retourne les lignes (item, year, value) d'un pays triées par indicateur et année, lues grâce à l'index
+        (area, item, year) de clean_data (même format que CountryIndex.country_series)
+        """
+        series = self.query(
+            "SELECT item, year, AVG(value) AS value FROM clean_data "
+            "WHERE area = ? AND value IS NOT NULL GROUP BY item, year ORDER BY item, year",
+            (area,),
+        )
+        return series.astype({"year": CLEAN_DATA_DTYPES["year"]})
+
+    def country_population(self, area):
+        """
+        Retourne la population (year, value) d'un pays triée par année, reliée par sa clé M49
+        """
+        population = self.query(
+            "SELECT year, value FROM clean_pop_tot "
+            "WHERE area_key = (SELECT area_key FROM clean_data WHERE area = ? LIMIT 1) ORDER BY year",
+            (area,),
+        )
+        return population.astype({"year": CLEAN_POP_DTYPES["year"]})
+
+    def population(self):
+        """
+        Retourne la table clean_pop_tot (petite : un pays x une année par ligne)
+        """
+        return canonical_frame(self.query("SELECT area, area_key, year, value FROM clean_pop_tot"), CLEAN_POP_DTYPES)
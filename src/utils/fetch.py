@@ -0,0 +1,169 @@
+# Téléchargement concurrent des sources FAOSTAT et Banque Mondiale
+
+from concurrent.futures import ThreadPoolExecutor
+import faostat
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+from config import FAOSTAT_URL, WORLD_BANK_URL
+from src.utils.http_cache import CachedSession
+
+# Langues des résultats FAOSTAT (faostat.set_requests_args(lang=...))
+FAOSTAT_LANGS = {'en', 'fr', 'es', 'ar', 'zh', 'ru'}
+
+def faostat_requests_args():
+    """
+    Options requests configurées avec faostat.set_requests_args (timeout, proxies, verify, cert, token, lang),
+    reprises par les sessions de make_session. lang vaut None si aucune langue n'a été choisie.
+    """
+    args = faostat.get_requests_args()
+    # Sans langue choisie, faostat renvoie le dernier segment de son adresse ("v1")
+    if args.get('lang') not in FAOSTAT_LANGS:
+        args['lang'] = None
+    return args
+
+def request_timeout(timeout=None):
+    # Délai d'attente des requêtes : celui donné, sinon celui de faostat.set_requests_args (120 s par défaut)
+    return timeout if timeout is not None else faostat_requests_args().get('timeout', 120)
+
+def faostat_lang_url(base_url):
+    # Adresse FAOSTAT dans la langue choisie avec faostat.set_requests_args, comme le fait faostat
+    lang = faostat_requests_args()['lang']
+    return f"{base_url}{lang}/" if lang else base_url
+
+def make_session(pool_size=8, cache=None):
+    """
+    Crée une session HTTP avec un pool de connexions réutilisées par tous les téléchargements
+
+    Args:
+        pool_size: Nombre de connexions gardées ouvertes par hôte
+        cache: HttpCache (src/utils/http_cache.py) par lequel passent les requêtes GET (optionnel)
+    """
+    session = CachedSession(cache) if cache is not None else requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+
+    # Reprendre le jeton, les proxies et la vérification TLS éventuellement configurés avec faostat.set_requests_args
+    # (le délai d'attente est passé à chaque requête, voir request_timeout)
+    args = faostat_requests_args()
+    if args.get('token'):
+        session.headers['Authorization'] = f"Bearer {args['token']}"
+    if args.get('proxies'):
+        session.proxies.update(args['proxies'])
+    if args.get('verify') is not None:
+        session.verify = args['verify']
+    if args.get('cert') is not None:
+        session.cert = args['cert']
+    return session
+
+def fetch_faostat_chunk(session, dataset, item_codes, element_codes, year_codes, base_url=FAOSTAT_URL, timeout=None):
+    """
+    Télécharge une partie (items x années) d'un jeu de données FAOSTAT,
+    avec les mêmes paramètres et colonnes que faostat.get_data_df
+
+    Returns:
+        DataFrame avec une colonne par libellé FAOSTAT (Area, Item, Year, Value, ...)
+    """
+    params = [('item', code) for code in item_codes]
+    params += [('element', code) for code in element_codes]
+    params += [('year3', code) for code in year_codes]
+    params += [
+        ('show_codes', True),
+        ('show_unit', True),
+        ('show_flags', False),
+        ('show_notes', False),
+        ('null_values', False),
+        ('limit', -1),
+        ('output_type', 'objects'),
+    ]
+    resp = session.get(faostat_lang_url(base_url) + 'data/' + dataset, params=params, timeout=request_timeout(timeout))
+    resp.raise_for_status()
+    payload = resp.json()
+
+    try:
+        header = [d['label'] for d in payload['metadata']['dsd']]
+    except (KeyError, TypeError):
+        # Aucune donnée pour cette sélection
+        return pd.DataFrame()
+    return pd.DataFrame([[row.get(h) for h in header] for row in payload.get('data', [])], columns=header)
+
+def fetch_faostat_release(session, dataset, base_url=FAOSTAT_URL, timeout=None):
+    """
+    Retourne la date de mise à jour (date_update) d'un jeu de données FAOSTAT, lue comme faostat.list_datasets :
+    domaines de chaque groupe, jusqu'à trouver le jeu de données (None s'il n'est pas listé)
+    """
+    base_url = faostat_lang_url(base_url)
+    timeout = request_timeout(timeout)
+    resp = session.get(base_url + 'groups', timeout=timeout)
+    resp.raise_for_status()
+    for group in resp.json().get('data', []):
+        resp = session.get(base_url + 'domains/' + group['code'], timeout=timeout)
+        resp.raise_for_status()
+        for domain in resp.json().get('data', []):
+            if domain.get('code') == dataset:
+                return domain.get('date_update')
+    return None
+
+def iter_population_pages(session, indicator, date_range, per_page=1000, base_url=WORLD_BANK_URL, timeout=None):
+    """
+    Parcourt toutes les pages d'un indicateur de la Banque Mondiale et retourne, page par page,
+    les lignes (pays, année, valeur, code ISO-3). Une seule page est gardée en mémoire à la fois.
+    """
+    url = f"{base_url}country/all/indicator/{indicator}"
+    page = 1
+    pages = 1
+    while page <= pages:
+        params = {'date': date_range, 'format': 'json', 'per_page': per_page, 'page': page}
+        resp = session.get(url, params=params, timeout=request_timeout(timeout))
+        resp.raise_for_status()
+        meta, rows = resp.json()
+        # Le nombre de pages est donné par la première entrée de la réponse
+        pages = int(meta.get('pages') or 1)
+        yield [(row['country']['value'], row['date'], row['value'], row.get('countryiso3code')) for row in rows or []]
+        page += 1
+
+def split_chunks(item_codes, year_codes, chunk_by='item', years_per_chunk=6):
+    """
+    Découpe la requête FAOSTAT en parties : une par item ('item') ou par plage d'années ('year')
+    """
+    if chunk_by == 'item':
+        return [([item], list(year_codes)) for item in item_codes]
+    if chunk_by == 'year':
+        year_codes = list(year_codes)
+        return [(list(item_codes), year_codes[i:i + years_per_chunk]) for i in range(0, len(year_codes), years_per_chunk)]
+    raise ValueError(f"Découpage inconnu : {chunk_by}")
+
+def fetch_all(dataset, chunks, element_codes, population_job=None,
+              max_workers=8, faostat_url=FAOSTAT_URL, cache=None):
+    """
+    Télécharge en parallèle les parties FAOSTAT et la population Banque Mondiale
+    sur un pool borné de threads partageant une même session HTTP.
+    La durée totale est celle de la partie la plus lente et non la somme des parties.
+
+    Args:
+        chunks: Liste de parties (item_codes, year_codes), voir split_chunks
+        population_job: Fonction appelée avec la session pour charger la population (None pour l'ignorer)
+        cache: HttpCache utilisé par la session (optionnel)
+
+    Returns:
+        (frames, population) : un DataFrame FAOSTAT par partie (dans l'ordre de chunks) et le résultat de population_job
+    """
+    session = make_session(pool_size=max_workers, cache=cache)
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            pop_future = pool.submit(population_job, session) if population_job is not None else None
+            futures = [
+                pool.submit(fetch_faostat_chunk, session, dataset, items, element_codes, years, faostat_url)
+                for items, years in chunks
+            ]
+            frames = [future.result() for future in futures]
+            population = pop_future.result() if pop_future is not None else None
+    finally:
+        session.close()
+    return frames, population
+
+def merge_frames(frames):
+    # Fusion des parties dans leur ordre pour un résultat déterministe
+    frames = [frame for frame in frames if not frame.empty]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
@@ -0,0 +1,122 @@
+# Cache des figures déjà sérialisées, indexé par (graphique, indicateur, année)
+
+import hashlib
+import json
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+import plotly.io as pio
+from dash import Patch
+from src.utils.metrics import metrics
+
+def figure_json(fig):
+    """
+    Sérialise une figure Plotly une seule fois et retourne son JSON décodé (dict de types Python simples),
+    que Dash renvoie au navigateur sans repasser par Plotly
+    """
+    if isinstance(fig, dict) and not fig:
+        return fig
+    return json.loads(pio.to_json(fig, validate=False))
+
+def layout_signature(fig):
+    """
+    Empreinte de la mise en page d'une figure JSON, sans le titre : deux figures de même empreinte ne diffèrent
+    que par leurs traces et leur titre
+    """
+    if not fig:
+        return None
+    layout = {key: value for key, value in fig.get("layout", {}).items() if key != "title"}
+    return hashlib.md5(json.dumps(layout, sort_keys=True).encode()).hexdigest()
+
+def figure_patch(fig):
+    """
+    Mise à jour partielle (dash.Patch) qui remplace seulement les traces et le titre d'une figure déjà affichée
+    (et les images d'une figure animée) : la mise en page (géographie, barre de couleurs, thème) n'est pas renvoyée
+    """
+    patched = Patch()
+    patched["data"] = fig.get("data", [])
+    patched["layout"]["title"] = fig["layout"].get("title")
+    if "frames" in fig:
+        patched["frames"] = fig["frames"]
+    return patched
+
+class FigureCache:
+    """
+    Garde les figures sérialisées, avec l'empreinte de leur mise en page, avec une éviction LRU bornée.
+    Les figures précalculées par warm sont gardées à part et ne sont jamais évincées : les figures demandées
+    à la volée (fiches pays, classes de PIB choisies) ne remplacent que d'autres figures à la volée.
+    Une figure servie depuis le cache ne coûte qu'une recherche dans un dictionnaire. Le cache est propre à un jeu de données
+    (voir DashboardData) : recharger les données crée un nouveau cache.
+    """
+
+    def __init__(self, maxsize=256):
+        """
+        Args:
+            maxsize: Nombre maximal de figures gardées en plus des figures précalculées
+        """
+        self.maxsize = maxsize
+        self._cache = OrderedDict()
+        self._pinned = {}
+        self._lock = Lock()
+
+    def get(self, key, build):
+        """
+        Retourne la figure de la clé, construite avec build() (figure Plotly ou dict) si elle n'est pas en cache
+        """
+        return self.get_entry(key, build)[0]
+
+    def get_entry(self, key, build, pin=False):
+        """
+        Retourne le couple (figure, empreinte de sa mise en page) de la clé (voir layout_signature)
+
+        Args:
+            pin: Si True, la figure construite est gardée sans éviction (voir warm)
+        """
+        with self._lock:
+            if key in self._pinned:
+                metrics.inc("figure_cache_hits_total", chart=key[0])
+                return self._pinned[key]
+            if key in self._cache:
+                metrics.inc("figure_cache_hits_total", chart=key[0])
+                if pin:
+                    # Figure déjà demandée avant le précalcul
+                    self._pinned[key] = self._cache.pop(key)
+                    return self._pinned[key]
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+        metrics.inc("figure_cache_misses_total", chart=key[0])
+        fig = build()
+        with metrics.phase("serialize"):
+            fig = figure_json(fig)
+        entry = (fig, layout_signature(fig))
+
+        with self._lock:
+            if pin:
+                self._pinned[key] = entry
+                self._cache.pop(key, None)
+                return entry
+            self._cache[key] = entry
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+        return entry
+
+    def warm(self, jobs, max_workers=4):
+        """
+        Précalcule les figures en parallèle ; elles sont gardées jusqu'au prochain jeu de données
+
+        Args:
+            jobs: Liste de couples (clé, build)
+            max_workers: Nombre de threads
+        """
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="figure-cache") as pool:
+            list(pool.map(lambda job: self.get_entry(*job, pin=True), jobs))
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self._pinned.clear()
+
+    def __len__(self):
+        return len(self._cache) + len(self._pinned)
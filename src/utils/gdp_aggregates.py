@@ -0,0 +1,355 @@
+# Agrégats par classe de PIB de l'histogramme et du filled area plot, matérialisés dans SQLite par clean_data :
+# une ligne par (année, classe) au lieu du pivot, de la jointure avec la population et du découpage à chaque requête
+
+import hashlib
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+from src.utils.schema import as_year
+
+GDP_ITEM = "Gross domestic product per capita, PPP, (constant 2021 international $)"
+OBESE_ITEM = "Number of obese adults (18 years and older) (million)"
+UNDER_ITEM = "Number of people undernourished (million) (3-year average)"
+AGGREGATE_ITEMS = (GDP_ITEM, OBESE_ITEM, UNDER_ITEM)
+
+# Agrégats par (classes, année, classe) et empreinte des données d'entrée de chaque année
+AGGREGATES_TABLE = 'gdp_bin_aggregates'
+AGGREGATE_YEARS_TABLE = 'gdp_bin_years'
+
+AGGREGATE_COLUMNS = ['year', 'bin', 'countries_count', 'gdp_per_capita_mean',
+                     'obese_million', 'undernourished_million', 'population_million']
+
+HISTO_COLUMNS = ['gdp_bin', 'gdp_per_capita_mean', 'obese_million', 'undernourished_million']
+FILLED_AREA_COLUMNS = ['gdp_bin_mid', 'obese_million', 'undernourished_million', 'population_million']
+
+def bins_key(gdp_bins):
+    """
+    Identifiant texte d'une liste de bornes de classes (colonne bins des tables d'agrégats)
+    """
+    return ','.join(repr(float(edge)) for edge in gdp_bins)
+
+def gdp_intervals(gdp_bins):
+    """
+    Intervalles des classes, identiques à ceux de pd.cut(..., bins=gdp_bins, include_lowest=True)
+    """
+    return pd.cut(pd.Series([], dtype=float), bins=gdp_bins, include_lowest=True).cat.categories
+
+@lru_cache(maxsize=256)
+def interval_labels(edges):
+    """
+    Libellés et milieux des classes de bornes edges (tuple), calculés une fois par liste de bornes
+    """
+    intervals = gdp_intervals(list(edges))
+    return (np.array([str(interval) for interval in intervals], dtype=object),
+            np.array([(interval.left + interval.right) / 2 for interval in intervals]))
+
+def country_gdp_frame(df, df_pop):
+    """
+    Lignes pays x année de l'histogramme et du filled area plot : PIB par habitant, personnes obèses et sous-alimentées
+    (millions, 0 si manquant) et population (millions, 0 si manquante), pour les pays dont le PIB est connu.
+    Mêmes règles que le pivot de l'année de prepare_histo_data et prepare_filled_area_data (moyenne des doublons).
+
+    Args:
+        df: Lignes (year, area, area_key, item, value) de clean_data
+        df_pop: Lignes (year, area_key, value) de clean_pop_tot
+    """
+    df = df[df['item'].isin(AGGREGATE_ITEMS) & df['value'].notna()]
+    # Pivot pays x indicateur de toutes les années à la fois
+    wide = (df.groupby(['year', 'area', 'item'], observed=True)['value'].mean()
+            .unstack('item').reindex(columns=list(AGGREGATE_ITEMS)))
+    wide = wide[wide[GDP_ITEM].notna()].reset_index()
+
+    # Clé M49 du pays pour la jointure avec la population de l'année
+    area_keys = df.groupby('area', observed=True)['area_key'].first()
+    frame = pd.DataFrame({
+        'year': wide['year'].astype('int64'),
+        'area': wide['area'].astype(object),
+        'area_key': area_keys.reindex(wide['area'].astype(object)).astype('float64').to_numpy(),
+        'gdp_per_capita': wide[GDP_ITEM].to_numpy(dtype=float),
+        'obese_million': wide[OBESE_ITEM].fillna(0.0).to_numpy(dtype=float),
+        'undernourished_million': wide[UNDER_ITEM].fillna(0.0).to_numpy(dtype=float),
+    })
+    pop = (df_pop.astype({'year': 'int64', 'area_key': 'float64'})
+           .groupby(['year', 'area_key'], as_index=False)['value'].mean())
+    frame = frame.merge(pop, on=['year', 'area_key'], how='left')
+    frame['population_million'] = frame['value'].fillna(0.0) / 1e6
+    return frame.drop(columns=['area_key', 'value'])
+
+def compute_gdp_aggregates(df, df_pop, gdp_bins):
+    """
+    Calcule pour chaque année et chaque classe de PIB les sommes de l'histogramme et du filled area plot
+
+    Args:
+        df: Lignes (year, area, area_key, item, value) de clean_data
+        df_pop: Lignes (year, area_key, value) de clean_pop_tot
+        gdp_bins: Bornes des classes de PIB
+
+    Returns:
+        DataFrame aux colonnes AGGREGATE_COLUMNS : toutes les classes de chaque année ayant au moins un PIB connu
+    """
+    binner = GdpBinner(country_gdp_frame(df, df_pop))
+    rows = [binner.aggregate(year, gdp_bins) for year in binner.years]
+    if not rows:
+        return pd.DataFrame(columns=AGGREGATE_COLUMNS)
+    return pd.concat(rows, ignore_index=True)
+
+def year_fingerprints(df, df_pop):
+    """
+    Empreinte des données d'entrée de chaque année (lignes des trois indicateurs et population),
+    indépendante de l'ordre des lignes
+    """
+    def per_year(frame):
+        if frame.empty:
+            return {}
+        years = frame['year'].to_numpy()
+        hashes = pd.util.hash_pandas_object(frame, index=False).to_numpy()
+        order = np.lexsort((hashes, years))
+        years, hashes = years[order], hashes[order]
+        bounds = np.r_[np.flatnonzero(np.r_[True, years[1:] != years[:-1]]), len(years)]
+        return {int(years[start]): hashlib.md5(hashes[start:end].tobytes()).hexdigest()
+                for start, end in zip(bounds[:-1], bounds[1:])}
+    data, pop = per_year(df), per_year(df_pop)
+    return {year: f'{fingerprint}/{pop.get(year, "")}' for year, fingerprint in data.items()}
+
+def read_aggregate_inputs(conn):
+    """
+    Lit dans SQLite les lignes utilisées par les agrégats : les trois indicateurs de clean_data et clean_pop_tot
+    """
+    placeholders = ', '.join('?' for _ in AGGREGATE_ITEMS)
+    df = pd.read_sql_query(
+        f"SELECT year, area, area_key, item, value FROM clean_data WHERE item IN ({placeholders}) AND value IS NOT NULL",
+        conn, params=AGGREGATE_ITEMS).astype({'area_key': 'float64'})
+    df_pop = pd.read_sql_query("SELECT year, area_key, value FROM clean_pop_tot", conn).astype({'area_key': 'float64'})
+    return df, df_pop
+
+def ensure_aggregate_tables(conn):
+    conn.execute(
+        f"CREATE TABLE IF NOT EXISTS {AGGREGATES_TABLE} ("
+        "bins TEXT, year INTEGER, bin INTEGER, countries_count INTEGER, gdp_per_capita_mean REAL, "
+        "obese_million REAL, undernourished_million REAL, population_million REAL, "
+        "PRIMARY KEY (bins, year, bin))"
+    )
+    conn.execute(
+        f"CREATE TABLE IF NOT EXISTS {AGGREGATE_YEARS_TABLE} ("
+        "bins TEXT, year INTEGER, fingerprint TEXT, PRIMARY KEY (bins, year))"
+    )
+
+def refresh_gdp_aggregates(conn, gdp_bins):
+    """
+    Met à jour les agrégats des classes gdp_bins à partir de clean_data et clean_pop_tot. Seules les années
+    dont les données d'entrée ont changé depuis le dernier appel (voir year_fingerprints) sont recalculées ;
+    les agrégats d'autres classes sont supprimés.
+
+    Returns:
+        Liste triée des années recalculées ou supprimées
+    """
+    key = bins_key(gdp_bins)
+    ensure_aggregate_tables(conn)
+    df, df_pop = read_aggregate_inputs(conn)
+
+    fingerprints = year_fingerprints(df, df_pop)
+    stored = dict(conn.execute(f"SELECT year, fingerprint FROM {AGGREGATE_YEARS_TABLE} WHERE bins = ?", (key,)))
+    changed = sorted(year for year, fingerprint in fingerprints.items() if stored.get(year) != fingerprint)
+    removed = sorted(set(stored) - set(fingerprints))
+
+    rows = compute_gdp_aggregates(df[df['year'].isin(changed)], df_pop[df_pop['year'].isin(changed)], gdp_bins)
+    rows.insert(0, 'bins', key)
+    with conn:
+        for table in (AGGREGATES_TABLE, AGGREGATE_YEARS_TABLE):
+            conn.execute(f"DELETE FROM {table} WHERE bins != ?", (key,))
+            conn.executemany(f"DELETE FROM {table} WHERE bins = ? AND year = ?",
+                             [(key, year) for year in changed + removed])
+        conn.executemany(
+            f"INSERT INTO {AGGREGATES_TABLE} ({', '.join(rows.columns)}) VALUES ({', '.join('?' for _ in rows.columns)})",
+            rows.astype(object).where(rows.notna(), None).itertuples(index=False, name=None))
+        conn.executemany(f"INSERT INTO {AGGREGATE_YEARS_TABLE} (bins, year, fingerprint) VALUES (?, ?, ?)",
+                         [(key, year, fingerprints[year]) for year in changed])
+    return sorted(changed + removed)
+
+def load_gdp_aggregates(conn, gdp_bins):
+    """
+    Lit les agrégats matérialisés des classes gdp_bins
+
+    Returns:
+        GdpAggregates, ou None s'ils n'ont pas été calculés pour ces classes (base plus ancienne ou classes modifiées)
+    """
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+    if AGGREGATES_TABLE not in tables or AGGREGATE_YEARS_TABLE not in tables:
+        return None
+    key = bins_key(gdp_bins)
+    if conn.execute(f"SELECT 1 FROM {AGGREGATE_YEARS_TABLE} WHERE bins = ? LIMIT 1", (key,)).fetchone() is None:
+        return None
+    rows = pd.read_sql_query(
+        f"SELECT {', '.join(AGGREGATE_COLUMNS)} FROM {AGGREGATES_TABLE} WHERE bins = ? ORDER BY year, bin",
+        conn, params=(key,))
+    return GdpAggregates(rows, gdp_bins)
+
+def histo_frame(rows, gdp_bins):
+    """
+    Données de l'histogramme (colonnes HISTO_COLUMNS, comme prepare_histo_data) à partir des agrégats d'une année
+    """
+    if rows is None:
+        return pd.DataFrame(columns=HISTO_COLUMNS)
+    labels = interval_labels(tuple(gdp_bins))[0]
+    histo_df = pd.DataFrame({
+        'gdp_bin': labels[rows['bin'].to_numpy()],
+        'gdp_per_capita_mean': rows['gdp_per_capita_mean'].to_numpy(),
+        'obese_million': rows['obese_million'].to_numpy(),
+        'undernourished_million': rows['undernourished_million'].to_numpy(),
+    })
+    return histo_df.sort_values('gdp_per_capita_mean').reset_index(drop=True)
+
+def filled_area_frame(rows, gdp_bins):
+    """
+    Données du filled area plot (colonnes FILLED_AREA_COLUMNS, comme prepare_filled_area_data) à partir des agrégats
+    d'une année
+    """
+    if rows is None:
+        return pd.DataFrame(columns=FILLED_AREA_COLUMNS)
+    mids = interval_labels(tuple(gdp_bins))[1]
+    return pd.DataFrame({
+        'gdp_bin_mid': mids[rows['bin'].to_numpy()],
+        'obese_million': rows['obese_million'].to_numpy(),
+        'undernourished_million': rows['undernourished_million'].to_numpy(),
+        'population_million': rows['population_million'].to_numpy(),
+    })
+
+class GdpAggregates:
+    """
+    Agrégats par classe de PIB matérialisés par clean_data, indexés par année : l'histogramme et le filled area plot
+    lisent les quelques lignes de l'année au lieu de recalculer le pivot et les classes
+    """
+
+    def __init__(self, rows, gdp_bins):
+        """
+        Args:
+            rows: DataFrame aux colonnes AGGREGATE_COLUMNS (voir compute_gdp_aggregates)
+            gdp_bins: Bornes des classes de PIB des agrégats
+        """
+        self.gdp_bins = gdp_bins
+        self.key = bins_key(gdp_bins)
+        self._years = {int(year): group.reset_index(drop=True) for year, group in rows.groupby('year')}
+
+    def covers(self, gdp_bins):
+        return gdp_bins is not None and bins_key(gdp_bins) == self.key
+
+    def histo_data(self, selected_year, gdp_bins=None):
+        """
+        Retourne les données de l'histogramme de l'année, comme prepare_histo_data
+        """
+        return histo_frame(self._years.get(as_year(selected_year)), self.gdp_bins)
+
+    def filled_area_data(self, selected_year, gdp_bins=None):
+        """
+        Retourne les données du filled area plot de l'année, comme prepare_filled_area_data
+        """
+        return filled_area_frame(self._years.get(as_year(selected_year)), self.gdp_bins)
+
+def round_edges(edges):
+    """
+    Arrondit des bornes calculées à deux chiffres significatifs (entiers lisibles sur l'axe), la première vers le bas
+    et la dernière vers le haut pour garder tous les pays, et retire les doublons
+    """
+    def rounded(value, how):
+        if value <= 0:
+            return 0
+        step = 10 ** max(int(np.floor(np.log10(value))) - 1, 0)
+        return int(how(value / step) * step)
+    edges = [rounded(edges[0], np.floor)] + [rounded(edge, np.round) for edge in edges[1:-1]] + [rounded(edges[-1], np.ceil)]
+    return sorted(set(edges))
+
+class GdpBinner:
+    """
+    Découpage interactif en classes de PIB quelconques : les pays de chaque année sont triés une fois par PIB
+    et les sommes cumulées des personnes, de la population et du PIB sont gardées. Pour de nouvelles bornes,
+    np.searchsorted donne les positions des bornes et chaque somme par classe est une différence de sommes cumulées
+    (O(classes x log pays), sans pd.cut ni groupby).
+    """
+
+    # Colonnes cumulées, dans l'ordre des colonnes de self._years[year][1]
+    SUMS = ['gdp_per_capita', 'obese_million', 'undernourished_million', 'population_million']
+
+    def __init__(self, frame):
+        """
+        Args:
+            frame: Lignes pays x année de country_gdp_frame
+        """
+        order = np.lexsort((frame['gdp_per_capita'].to_numpy(), frame['year'].to_numpy()))
+        years = frame['year'].to_numpy()[order]
+        values = frame[self.SUMS].to_numpy(dtype=float)[order]
+        bounds = np.r_[np.flatnonzero(np.r_[True, years[1:] != years[:-1]]), len(years)] if len(years) else [0]
+
+        self._years = {}
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            block = values[start:end]
+            # Sommes cumulées précédées d'une ligne de zéros : somme des lignes [i, j) = cumsum[j] - cumsum[i]
+            cumsum = np.vstack([np.zeros(len(self.SUMS)), np.cumsum(block, axis=0)])
+            self._years[int(years[start])] = (np.ascontiguousarray(block[:, 0]), cumsum)
+        self.years = sorted(self._years)
+        positive = values[:, 0][values[:, 0] > 0]
+        self.gdp_range = (float(positive.min()), float(positive.max())) if len(positive) else None
+
+    def covers(self, gdp_bins):
+        return gdp_bins is not None
+
+    def aggregate(self, selected_year, gdp_bins):
+        """
+        Retourne les agrégats de l'année pour les bornes gdp_bins (colonnes AGGREGATE_COLUMNS, une ligne par classe),
+        avec les classes de pd.cut(..., bins=gdp_bins, include_lowest=True), ou None si l'année n'a aucun PIB connu
+        """
+        year = as_year(selected_year)
+        if year not in self._years:
+            return None
+        gdp, cumsum = self._years[year]
+        edges = np.asarray(gdp_bins, dtype=float)
+        # Classes fermées à droite, la première aussi à gauche
+        positions = np.searchsorted(gdp, edges, side='right')
+        positions[0] = np.searchsorted(gdp, edges[0], side='left')
+        counts = np.diff(positions)
+        sums = cumsum[positions[1:]] - cumsum[positions[:-1]]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = np.where(counts > 0, sums[:, 0] / counts, np.nan)
+        return pd.DataFrame({
+            'year': year,
+            'bin': np.arange(len(counts)),
+            'countries_count': counts,
+            'gdp_per_capita_mean': means,
+            'obese_million': sums[:, 1],
+            'undernourished_million': sums[:, 2],
+            'population_million': sums[:, 3],
+        })
+
+    def bin_edges(self, selected_year, mode, count):
+        """
+        Bornes de count classes : quantiles des PIB de l'année (mode "quantile", même nombre de pays par classe)
+        ou classes de même rapport entre le plus petit et le plus grand PIB de toutes les années (mode "log").
+        Les bornes sont arrondies (voir round_edges).
+
+        Returns:
+            Liste croissante de bornes, ou None si elles ne peuvent pas être calculées
+        """
+        if mode == 'quantile':
+            year = as_year(selected_year)
+            if year not in self._years:
+                return None
+            edges = np.quantile(self._years[year][0], np.linspace(0, 1, count + 1))
+        elif mode == 'log':
+            if self.gdp_range is None:
+                return None
+            edges = np.geomspace(*self.gdp_range, count + 1)
+        else:
+            return None
+        edges = round_edges(edges)
+        return edges if len(edges) > 1 else None
+
+    def histo_data(self, selected_year, gdp_bins):
+        """
+        Retourne les données de l'histogramme de l'année pour les bornes gdp_bins, comme prepare_histo_data
+        """
+        return histo_frame(self.aggregate(selected_year, gdp_bins), gdp_bins)
+
+    def filled_area_data(self, selected_year, gdp_bins):
+        """
+        Retourne les données du filled area plot de l'année pour les bornes gdp_bins, comme prepare_filled_area_data
+        """
+        return filled_area_frame(self.aggregate(selected_year, gdp_bins), gdp_bins)
@@ -1,79 +1,452 @@
-# Script pour récupérer des données FAOSTAT via faostat.get_data_df
+# Script pour récupérer des données FAOSTAT et de population de la Banque Mondiale
 
-import faostat
-import sqlite3
+import argparse
+import hashlib
 import pandas as pd
-import requests
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from config import BDD_PATH, FAOSTAT_URL, WORLD_BANK_URL
+from src.utils.fetch import (fetch_all, fetch_faostat_chunk, fetch_faostat_release, iter_population_pages, make_session,
+                             merge_frames, request_timeout, split_chunks)
+from src.utils.http_cache import HttpCache
+
+# Codes du jeu de données FAOSTAT
+dataset = 'FS'
+
+# Liste des code des items :
+#    - 21004  : '-- Prevalence of undernourishment (percent)',
+#    - 21001  : '-- Number of people undernourished (million)',
+#    - 21042  : '-- Number of obese adults (18 years and older) (million)',
+#    - 210420 : '-- Prevalence of anemia among women of reproductive age (15-49 years) (percent)',
+#    - 22013  : '-- Gross domestic product per capita, PPP, (constant 2021 international $)',
+#    - 220001 : '-- Dietary energy supply used in the estimation of the prevalence of undernourishment (kcal/cap/day)',
+#    - 21061  : '-- Average fat supply (g/cap/day) (3-year average)'
+items = [21004, 21001, 21042, 210420, 22013, 220001, 21061]
+
+# Code du type de valeur (Valeur approchée : 6120, Estimation haute et basse : 6210)
+elements = [6120]
+
+# Liste des codes des années sans prendre 2025 pour ne pas avoir de fausses données / mal insérées dans la base de données
+annees = [i*10+3 for i in range(2000, 2024)]
+
+# Indicateur et années de la population totale (API de la Banque Mondiale)
+indicator = "SP.POP.TOTL"
+pop_years = list(range(2000, 2024))
+
+# Table qui garde la trace des tranches (jeu de données, item, année) déjà stockées
+SLICES_TABLE = 'ingest_slices'
+
+# Clés primaires des tables brutes (la colonne du code pays FAOSTAT est détectée, voir faostat_key)
+POP_KEY = ['country.value', 'date']
+
+# Colonnes de la population gardées dans raw_pop_tot (celles utilisées par clean_data)
+POP_COLUMNS = ['country.value', 'date', 'value', 'countryiso3code']
 
-def get_data():
+# Cache disque des réponses HTTP : revalidation ETag / Last-Modified à chaque rafraîchissement
+# (ttl en secondes pour servir le cache sans requête, offline pour ne jamais appeler les API)
+http_cache = HttpCache(cache_dir='.http_cache', ttl=None, offline=False)
+
+def fetch_faostat(item_codes, year_codes, session=None, base_url=FAOSTAT_URL):
     """
-    Récupère les données FAOSTAT et les sauvegarde dans une base de données sqlite3 locale
+    Télécharge les données FAOSTAT pour une liste d'items et d'années (tous les pays)
+
+    Args:
+        item_codes: Liste des codes d'items
+        year_codes: Liste des codes d'années (year3)
+        session: Session HTTP à réutiliser (une session avec le cache http_cache sinon)
+        base_url: Adresse de l'API FAOSTAT
+
+    Returns:
+        DataFrame avec les mêmes colonnes que faostat.get_data_df
+    """
+    own_session = session is None
+    if own_session:
+        session = make_session(cache=http_cache)
+    try:
+        return fetch_faostat_chunk(session, dataset, item_codes, elements, year_codes, base_url)
+    finally:
+        if own_session:
+            session.close()
+
+def load_population(date_range, table='raw_pop_tot', years=None, session=None, per_page=1000, batch_size=5000,
+                    bdd_path=BDD_PATH, base_url=WORLD_BANK_URL):
+    """
+    Charge la population totale de la Banque Mondiale page par page directement dans SQLite.
+    Seules les colonnes utilisées par clean_data sont gardées et les lignes sont écrites par lots :
+    la mémoire utilisée ne dépend pas de la taille de la réponse.
+
+    Args:
+        date_range: Intervalle d'années au format "2000:2023"
+        table: Table de destination (upsert selon POP_KEY)
+        years: Ensemble d'années à garder (None : toutes)
+        session: Session HTTP à réutiliser (une nouvelle session sinon)
+        bdd_path: Base sqlite3 de destination
+        base_url: Adresse de l'API de la Banque Mondiale
+
+    Returns:
+        Nombre de lignes écrites
     """
-    # Codes du jeu de données FAOSTAT 
-    dataset = 'FS'
+    own_session = session is None
+    if own_session:
+        session = make_session(cache=http_cache)
+    conn = sqlite3.connect(bdd_path)
+    count = 0
+    try:
+        ensure_keyed_table(conn, table, POP_COLUMNS, POP_KEY)
+        batch = []
+        for page in iter_population_pages(session, indicator, date_range, per_page, base_url):
+            batch.extend(row for row in page if years is None or int(row[1]) in years)
+            if len(batch) >= batch_size:
+                upsert_rows(conn, table, POP_COLUMNS, batch, POP_KEY)
+                count += len(batch)
+                batch = []
+        upsert_rows(conn, table, POP_COLUMNS, batch, POP_KEY)
+        count += len(batch)
+    finally:
+        conn.close()
+        if own_session:
+            session.close()
+    return count
+
+def faostat_release(base_url=FAOSTAT_URL):
+    """
+    Retourne la date de mise à jour du jeu de données FAOSTAT (None si indisponible)
+    """
+    if http_cache.offline:
+        return None
+    try:
+        with make_session(cache=http_cache) as session:
+            release = fetch_faostat_release(session, dataset, base_url)
+        return str(release) if release is not None else None
+    except Exception as e:
+        print("Impossible de lire la date de mise à jour FAOSTAT :", e)
+        return None
+
+def population_release(base_url=WORLD_BANK_URL):
+    """
+    Retourne la date de mise à jour de l'indicateur de la Banque Mondiale (None si indisponible)
+    """
+    url = f"{base_url}country/all/indicator/{indicator}?format=json&per_page=1"
+    try:
+        with make_session(cache=http_cache) as session:
+            resp = session.get(url, timeout=request_timeout())
+        resp.raise_for_status()
+        return resp.json()[0].get('lastupdated')
+    except Exception as e:
+        print("Impossible de lire la date de mise à jour Banque Mondiale :", e)
+        return None
+
+def faostat_key(columns):
+    # Clé primaire de raw_data : pays (code M49 ou FAO selon le codage) x élément x item x année
+    area_code = [c for c in columns if c.startswith('Area Code')]
+    return area_code[:1] + ['Element Code', 'Item Code', 'Year Code']
 
-    # Définition des paramètres
-    # =======================
+def ensure_keyed_table(conn, table, columns, key):
+    """
+    Crée la table avec une clé primaire si besoin. Une table créée auparavant par
+    to_sql(if_exists='replace') (sans clé primaire) est migrée une seule fois.
+    """
+    infos = conn.execute(f'PRAGMA table_info("{table}")').fetchall()
+    existing = [row[1] for row in infos]
+    has_key = any(row[5] for row in infos)
 
-    # Liste des codes de pays avec la norme UN M49
-    pays = None  # None pour tous les pays
+    if existing and has_key:
+        # Ajouter les colonnes apparues dans les nouvelles données
+        for col in columns:
+            if col not in existing:
+                conn.execute(f'ALTER TABLE "{table}" ADD COLUMN "{col}"')
+        return
 
-    # Liste des code des items :
-    #    - 21004  : '-- Prevalence of undernourishment (percent)',
-    #    - 21001  : '-- Number of people undernourished (million)',
-    #    - 21042  : '-- Number of obese adults (18 years and older) (million)',
-    #    - 210420 : '-- Prevalence of anemia among women of reproductive age (15-49 years) (percent)',
-    #    - 22013  : '-- Gross domestic product per capita, PPP, (constant 2021 international $)',
-    #    - 220001 : '-- Dietary energy supply used in the estimation of the prevalence of undernourishment (kcal/cap/day)',
-    #    - 21061  : '-- Average fat supply (g/cap/day) (3-year average)'
+    all_columns = existing + [c for c in columns if c not in existing]
+    cols_sql = ', '.join(f'"{c}"' for c in all_columns)
+    key_sql = ', '.join(f'"{c}"' for c in key)
+    with conn:
+        conn.execute(f'CREATE TABLE "{table}__keyed" ({cols_sql}, PRIMARY KEY ({key_sql}))')
+        if existing:
+            old_cols = ', '.join(f'"{c}"' for c in existing)
+            conn.execute(f'INSERT OR REPLACE INTO "{table}__keyed" ({old_cols}) SELECT {old_cols} FROM "{table}"')
+            conn.execute(f'DROP TABLE "{table}"')
+        conn.execute(f'ALTER TABLE "{table}__keyed" RENAME TO "{table}"')
 
-    items = [21004, 21001, 21042, 210420, 22013, 220001, 21061]
+def upsert_rows(conn, table, columns, rows, key):
+    """
+    Insère ou met à jour des lignes (tuples dans l'ordre de columns) selon la clé primaire de la table
+    """
+    if not rows:
+        return
+    with conn:
+        conn.executemany(upsert_sql(table, columns, key), rows)
 
-    # Code du type de valeur (Valeur approchée : 6120, Estimation haute et basse : 6210)
-    elements = [6120]
+def upsert_sql(table, columns, key):
+    cols_sql = ', '.join(f'"{c}"' for c in columns)
+    placeholders = ', '.join('?' for _ in columns)
+    updates = ', '.join(f'"{c}" = excluded."{c}"' for c in columns if c not in key)
+    key_sql = ', '.join(f'"{c}"' for c in key)
+    return f'INSERT INTO "{table}" ({cols_sql}) VALUES ({placeholders}) ON CONFLICT ({key_sql}) DO UPDATE SET {updates}'
 
-    # Liste des codes des années sans prendre 2025 pour ne pas avoir de fausses données / mal insérées dans la base de données
-    annees = [i*10+3 for i in range(2000, 2024)] 
+def frame_rows(df):
+    # Lignes de df en tuples (valeurs manquantes -> NULL)
+    return list(df.astype(object).where(df.notna(), None).itertuples(index=False, name=None))
 
-    # Construction du dictionnaire de paramètres
-    params = {
-        'area': pays,
-        'item': items,
-        'element': elements,
-        'year3': annees
-    }
+def replace_items(conn, table, df, item_codes):
+    """
+    Remplace toutes les lignes des items par celles de df en une seule transaction : une ligne retirée
+    de la source (pays ou année révisés) disparaît aussi de la table, comme avec le téléchargement complet
+    """
+    if not df.empty:
+        ensure_keyed_table(conn, table, list(df.columns), faostat_key(df.columns))
+    elif not conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone():
+        return
+    placeholders = ', '.join('?' for _ in item_codes)
+    with conn:
+        # Comparaison en texte : les colonnes créées par upsert n'ont pas de type
+        conn.execute(f'DELETE FROM "{table}" WHERE CAST("Item Code" AS TEXT) IN ({placeholders})',
+                     [str(item) for item in item_codes])
+        if not df.empty:
+            conn.executemany(upsert_sql(table, list(df.columns), faostat_key(df.columns)), frame_rows(df))
 
-    # =======================
+def swap_tables(conn, tables, after=()):
+    """
+    Remplace chaque table par sa table temporaire en une seule transaction
+    (les lecteurs voient les anciennes ou les nouvelles tables, jamais un mélange)
 
-    # Récupération des données
+    Args:
+        tables: Dictionnaire {table temporaire: table de destination}
+        after: Instructions SQL exécutées dans la même transaction (ex. création des index)
+    """
+    conn.execute('BEGIN')
     try:
-        df = faostat.get_data_df(dataset, pars=params)
-        print(f"Données téléchargées : {df.shape[0]} lignes x {df.shape[1]} colonnes")
-    except Exception as e:
-        print("Erreur lors du téléchargement :", e)
+        for staging, table in tables.items():
+            conn.execute(f'DROP TABLE IF EXISTS "{table}"')
+            conn.execute(f'ALTER TABLE "{staging}" RENAME TO "{table}"')
+        for statement in after:
+            conn.execute(statement)
+        conn.execute('COMMIT')
+    except Exception:
+        conn.execute('ROLLBACK')
+        raise
+
+def stale_slices(conn, source, item_codes, years, release, max_age):
+    """
+    Retourne les tranches (item, année) absentes, d'une autre version de la source ou trop anciennes.
+    Une tranche enregistrée sans version (base construite avant le suivi des versions) est périmée dès que
+    la version de la source est connue : elle est retéléchargée une fois puis enregistrée avec cette version.
+    """
+    stored = {
+        (item, year): (rel, fetched_at)
+        for item, year, rel, fetched_at in conn.execute(
+            f"SELECT item, year, release, fetched_at FROM {SLICES_TABLE} WHERE dataset = ?", (source,)
+        )
+    }
+    limit = (datetime.now(timezone.utc) - max_age).isoformat() if max_age is not None else None
+    stale = []
+    for item in item_codes:
+        for year in years:
+            slice_info = stored.get((str(item), str(year)))
+            if slice_info is None:
+                stale.append((item, year))
+            elif release is not None and slice_info[0] != release:
+                stale.append((item, year))
+            elif limit is not None and slice_info[1] < limit:
+                stale.append((item, year))
+    return stale
+
+def ensure_slices_table(conn):
+    conn.execute(
+        f"CREATE TABLE IF NOT EXISTS {SLICES_TABLE} ("
+        "dataset TEXT, item TEXT, year TEXT, release TEXT, fetched_at TEXT, fingerprint TEXT, "
+        "PRIMARY KEY (dataset, item, year))"
+    )
+    # Table créée avant l'empreinte des tranches
+    columns = {row[1] for row in conn.execute(f"PRAGMA table_info({SLICES_TABLE})")}
+    if 'fingerprint' not in columns:
+        conn.execute(f"ALTER TABLE {SLICES_TABLE} ADD COLUMN fingerprint TEXT")
+
+def record_slices(conn, source, slices, release, fingerprint=None):
+    now = datetime.now(timezone.utc).isoformat()
+    with conn:
+        conn.executemany(
+            f"INSERT OR REPLACE INTO {SLICES_TABLE} (dataset, item, year, release, fetched_at, fingerprint) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [(source, str(item), str(year), release, now, fingerprint) for item, year in slices]
+        )
 
-    # ======================
-    # Récupération des données de population totale depuis l'API de la Banque Mondiale
-    # Paramètres
-    indicator = "SP.POP.TOTL"
-    date_range = "2000:2023"
-    url = f"https://api.worldbank.org/v2/country/all/indicator/{indicator}?date={date_range}&format=json&per_page=20000"
+def chunk_fingerprint(df):
+    """
+    Empreinte du contenu de la réponse FAOSTAT d'une requête (items x années year3), indépendante de l'ordre
+    des lignes. Elle est calculée sur la réponse entière et enregistrée pour chaque tranche demandée : les codes
+    d'années de la réponse (Year Code) ne sont pas forcément les codes year3 de la requête.
+    """
+    digest = hashlib.md5('|'.join(map(str, df.columns)).encode())
+    if not df.empty:
+        digest.update(pd.util.hash_pandas_object(df.astype(str), index=False).sort_values().to_numpy().tobytes())
+    return digest.hexdigest()
 
-    # Requête
-    resp = requests.get(url)
-    resp.raise_for_status()
-    data = resp.json()
+def stored_fingerprints(conn, source):
+    return {
+        (item, year): fingerprint
+        for item, year, fingerprint in conn.execute(
+            f"SELECT item, year, fingerprint FROM {SLICES_TABLE} WHERE dataset = ?", (source,)
+        )
+    }
+
+def chunk_changed(stored, slices, fingerprint):
+    """
+    True si la réponse d'une requête diffère du dernier téléchargement de ses tranches (ou si l'une d'elles
+    n'a pas d'empreinte, ou a été téléchargée dans une requête découpée autrement)
+    """
+    return any(stored.get((str(item), str(year))) != fingerprint for item, year in slices)
 
-    # On transforme en DataFrame
-    df2 = pd.json_normalize(data[1])
+def update_data(max_age_days=None, parallel=False, bdd_path=BDD_PATH, faostat_url=FAOSTAT_URL,
+                world_bank_url=WORLD_BANK_URL):
+    """
+    Mise à jour incrémentale : ne télécharge que les items dont une tranche (jeu de données, item, année)
+    est manquante ou périmée et remplace leurs lignes dans raw_data (population : upsert dans raw_pop_tot),
+    sans remplacer les tables. Quand la version de la source change, les items sont revalidés (cache HTTP)
+    mais seuls ceux dont le contenu a changé sont réécrits.
 
-    # Suppression des anciennes données et sauvegarde des nouvelles données brutes sur une base locale sqlite3
-    bdd_path = 'faostat_data.db'
+    Args:
+        max_age_days: Âge maximal (en jours) d'une tranche avant de la retélécharger (None : pas de limite)
+        parallel: Si True, les requêtes par item et la population sont téléchargées en parallèle
+        bdd_path: Base sqlite3 des tables brutes
+        faostat_url: Adresse de l'API FAOSTAT
+        world_bank_url: Adresse de l'API de la Banque Mondiale
+    """
     conn = sqlite3.connect(bdd_path)
-    df.to_sql('raw_data', conn, if_exists='replace', index=False)
-    df2.to_sql('raw_pop_tot', conn, if_exists='replace', index=False)
+    ensure_slices_table(conn)
+    max_age = timedelta(days=max_age_days) if max_age_days is not None else None
+
+    # Données FAOSTAT : une requête par item pour les années manquantes
+    fao_release = faostat_release(faostat_url)
+    stale = stale_slices(conn, dataset, items, annees, fao_release, max_age)
+    # Un item avec une tranche périmée est retéléchargé sur toutes ses années : sa réponse est comparée en entier
+    # à l'empreinte enregistrée par le téléchargement précédent (une requête par item, comme get_data)
+    stale_items = {item for item, _ in stale}
+    chunks = [([item], list(annees)) for item in items if item in stale_items]
+
+    # Population totale : une seule requête couvrant les années manquantes
+    pop_release = population_release(world_bank_url)
+    pop_stale = stale_slices(conn, indicator, [indicator], pop_years, pop_release, max_age)
+    pop_years_stale = sorted(year for _, year in pop_stale)
+    date_range = f"{pop_years_stale[0]}:{pop_years_stale[-1]}" if pop_stale else None
+
+    # La population est écrite directement dans raw_pop_tot page par page
+    population_job = None
+    if date_range is not None:
+        def population_job(session=None):
+            return load_population(date_range, years=set(pop_years_stale), session=session, bdd_path=bdd_path,
+                                   base_url=world_bank_url)
+
+    if parallel:
+        frames, pop_rows = fetch_all(dataset, chunks, elements, population_job, faostat_url=faostat_url,
+                                     cache=http_cache)
+    else:
+        frames = []
+        for item_codes, years in chunks:
+            try:
+                frames.append(fetch_faostat(item_codes, years, base_url=faostat_url))
+            except Exception as e:
+                print(f"Erreur lors du téléchargement de l'item {item_codes[0]} :", e)
+                frames.append(None)
+        pop_rows = population_job() if population_job is not None else None
+
+    stored = stored_fingerprints(conn, dataset)
+    for (item_codes, years), df in zip(chunks, frames):
+        if df is None:
+            continue
+        slices = [(item, year) for item in item_codes for year in years]
+        fingerprint = chunk_fingerprint(df)
+        changed = chunk_changed(stored, slices, fingerprint)
+        if changed:
+            replace_items(conn, 'raw_data', df, item_codes)
+        record_slices(conn, dataset, slices, fao_release, fingerprint)
+        print(f"Item {item_codes[0]} : {len(years)} années vérifiées, {df.shape[0] if changed else 0} lignes modifiées")
+
+    if pop_rows is not None:
+        record_slices(conn, indicator, pop_stale, pop_release)
+        print(f"Population : {len(pop_years_stale)} années mises à jour ({pop_rows} lignes)")
+
     conn.close()
+    print(f"Données mises à jour dans la base de données : {bdd_path}")
+
+def get_data(incremental=False, parallel=False, chunk_by='item', offline=False, max_age_days=None, bdd_path=BDD_PATH,
+             faostat_url=FAOSTAT_URL, world_bank_url=WORLD_BANK_URL):
+    """
+    Récupère les données FAOSTAT et les sauvegarde dans une base de données sqlite3 locale
+
+    Args:
+        incremental: Si True, ne télécharge que les tranches manquantes ou périmées (voir update_data)
+        parallel: Si True, découpe la requête FAOSTAT et la télécharge en parallèle avec la population
+        chunk_by: Découpage de la requête FAOSTAT en mode parallèle ('item' ou 'year')
+        offline: Si True, les réponses sont servies uniquement depuis le cache disque http_cache
+        max_age_days: En mode incrémental, âge maximal (en jours) d'une tranche avant de la retélécharger
+        bdd_path: Base sqlite3 des tables brutes (BDD_PATH de config.py par défaut)
+        faostat_url: Adresse de l'API FAOSTAT (FAOSTAT_URL de config.py par défaut)
+        world_bank_url: Adresse de l'API de la Banque Mondiale (WORLD_BANK_URL de config.py par défaut)
+    """
+    http_cache.offline = offline
+    if incremental:
+        return update_data(max_age_days=max_age_days, parallel=parallel, bdd_path=bdd_path, faostat_url=faostat_url,
+                           world_bank_url=world_bank_url)
+
+    # Versions des sources, enregistrées avec les tranches pour les mises à jour incrémentales suivantes
+    fao_release = faostat_release(faostat_url)
+    pop_release = population_release(world_bank_url)
+
+    # La population totale (API de la Banque Mondiale) est chargée page par page dans une table
+    # temporaire, qui remplace raw_pop_tot une fois complète
+    date_range = f"{pop_years[0]}:{pop_years[-1]}"
+
+    def population_job(session=None):
+        return load_population(date_range, table='raw_pop_tot__staging', session=session, bdd_path=bdd_path,
+                               base_url=world_bank_url)
+
+    # Requêtes FAOSTAT : une par item en séquentiel, comme la mise à jour incrémentale qui compare ses réponses
+    # aux empreintes enregistrées ici
+    chunks = split_chunks(items, annees, chunk_by if parallel else 'item')
+    conn = sqlite3.connect(bdd_path)
+    try:
+        conn.execute('DROP TABLE IF EXISTS "raw_pop_tot__staging"')
+        if parallel:
+            # Parties FAOSTAT et population téléchargées ensemble sur un pool de threads
+            # (une partie en échec lève son exception, les tables ne sont alors pas modifiées)
+            frames, pop_rows = fetch_all(dataset, chunks, elements, population_job, faostat_url=faostat_url,
+                                         cache=http_cache)
+        else:
+            # Récupération des données (une requête en échec lève son exception avant le chargement de la population)
+            frames = [fetch_faostat(item_codes, years, base_url=faostat_url) for item_codes, years in chunks]
+
+            # ======================
+            # Récupération des données de population totale depuis l'API de la Banque Mondiale
+            pop_rows = population_job()
+        df = merge_frames(frames)
+        print(f"Données téléchargées : {df.shape[0]} lignes x {df.shape[1]} colonnes")
+        print(f"Population téléchargée : {pop_rows} lignes")
+
+        # Suppression des anciennes données et sauvegarde des nouvelles données brutes sur une base locale sqlite3
+        df.to_sql('raw_data', conn, if_exists='replace', index=False)
+        swap_tables(conn, {'raw_pop_tot__staging': 'raw_pop_tot'})
+
+        # Toutes les tranches sont maintenant présentes, avec la version de leur source et l'empreinte de leur requête
+        ensure_slices_table(conn)
+        for (item_codes, years), frame in zip(chunks, frames):
+            record_slices(conn, dataset, [(item, year) for item in item_codes for year in years], fao_release,
+                          chunk_fingerprint(frame))
+        record_slices(conn, indicator, [(indicator, year) for year in pop_years], pop_release)
+    finally:
+        # Table temporaire laissée par un téléchargement en échec (renommée en raw_pop_tot sinon)
+        conn.execute('DROP TABLE IF EXISTS "raw_pop_tot__staging"')
+        conn.close()
     print(f"Données sauvegardées dans la base de données : {bdd_path}")
 
 if __name__ == "__main__":
-    get_data()
\ No newline at end of file
+    # python -m src.utils.get_data --incremental pour une mise à jour incrémentale, --parallel pour les requêtes en parallèle
+    # --offline pour reconstruire la base uniquement depuis le cache HTTP, --max-age-days N pour retélécharger
+    # les tranches de plus de N jours en mode incrémental
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--incremental", action="store_true")
+    parser.add_argument("--parallel", action="store_true")
+    parser.add_argument("--offline", action="store_true")
+    parser.add_argument("--max-age-days", type=float)
+    args = parser.parse_args()
+    get_data(incremental=args.incremental, parallel=args.parallel, offline=args.offline, max_age_days=args.max_age_days)
@@ -0,0 +1,142 @@
+# Cache disque des réponses HTTP des sources de données (FAOSTAT, Banque Mondiale)
+
+import hashlib
+import json
+import os
+import threading
+import time
+import requests
+
+class OfflineCacheMiss(Exception):
+    """
+    Levée en mode hors ligne quand la réponse demandée n'est pas dans le cache
+    """
+
+class HttpCache:
+    """
+    Stocke les réponses brutes sur disque, indexées par l'URL et les paramètres de la requête.
+    Avant de retélécharger, la réponse est revalidée avec ETag / Last-Modified (réponse 304),
+    ou servie directement tant qu'elle a moins de ttl secondes. En mode hors ligne, seules les
+    réponses du cache sont servies.
+    """
+
+    def __init__(self, cache_dir='.http_cache', ttl=None, offline=False):
+        """
+        Args:
+            cache_dir: Dossier du cache
+            ttl: Durée (en secondes) pendant laquelle une réponse est servie sans revalidation (None : toujours revalider)
+            offline: Si True, aucune requête n'est envoyée
+        """
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.offline = offline
+
+    def key(self, url, params=None):
+        # Clé stable : URL + paramètres dans l'ordre (les listes de paramètres répétés sont gardées)
+        items = sorted(params.items()) if isinstance(params, dict) else list(params or [])
+        raw = json.dumps([url, [(str(k), str(v)) for k, v in items]])
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def _paths(self, key):
+        return os.path.join(self.cache_dir, key + '.json'), os.path.join(self.cache_dir, key + '.body')
+
+    def load(self, key):
+        """
+        Retourne (métadonnées, contenu) de la réponse en cache, ou None
+        """
+        meta_path, body_path = self._paths(key)
+        try:
+            with open(meta_path, encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(body_path, 'rb') as f:
+                return meta, f.read()
+        except (OSError, ValueError):
+            return None
+
+    def store(self, key, url, resp):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        meta = {
+            'url': url,
+            'etag': resp.headers.get('ETag'),
+            'last_modified': resp.headers.get('Last-Modified'),
+            'content_type': resp.headers.get('Content-Type'),
+            'stored_at': time.time(),
+        }
+        meta_path, body_path = self._paths(key)
+        write_atomic(body_path, resp.content, 'wb')
+        write_atomic(meta_path, json.dumps(meta), 'w')
+        return meta
+
+    def touch(self, key, meta):
+        # Réponse revalidée (304) : on repart pour une durée ttl
+        meta = {**meta, 'stored_at': time.time()}
+        meta_path, _ = self._paths(key)
+        write_atomic(meta_path, json.dumps(meta), 'w')
+
+    def get(self, session_get, url, params=None, **kwargs):
+        """
+        Envoie la requête GET si besoin et retourne une réponse requests (réelle ou reconstruite depuis le cache)
+
+        Args:
+            session_get: Fonction GET à utiliser pour le réseau (ex. requests.Session.get liée)
+        """
+        key = self.key(url, params)
+        cached = self.load(key)
+
+        if self.offline:
+            if cached is None:
+                raise OfflineCacheMiss(f"Réponse absente du cache : {url} {params}")
+            return cached_response(url, *cached)
+
+        if cached is not None and self.ttl is not None and time.time() - cached[0]['stored_at'] < self.ttl:
+            return cached_response(url, *cached)
+
+        # Requête conditionnelle : le serveur répond 304 si rien n'a changé
+        headers = dict(kwargs.pop('headers', None) or {})
+        if cached is not None:
+            if cached[0].get('etag'):
+                headers['If-None-Match'] = cached[0]['etag']
+            if cached[0].get('last_modified'):
+                headers['If-Modified-Since'] = cached[0]['last_modified']
+        resp = session_get(url, params=params, headers=headers, **kwargs)
+
+        if resp.status_code == 304 and cached is not None:
+            self.touch(key, cached[0])
+            return cached_response(url, *cached)
+        if resp.status_code == 200:
+            self.store(key, url, resp)
+        return resp
+
+def write_atomic(path, data, mode):
+    # Écriture dans un fichier temporaire puis remplacement atomique : un lecteur concurrent (autre thread
+    # ou processus) lit l'ancien ou le nouveau fichier, jamais un fichier à moitié écrit
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, mode) as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+def cached_response(url, meta, content):
+    """
+    Reconstruit une réponse requests à partir du cache
+    """
+    resp = requests.Response()
+    resp.status_code = 200
+    resp.url = url
+    resp._content = content
+    resp.encoding = 'utf-8'
+    if meta.get('content_type'):
+        resp.headers['Content-Type'] = meta['content_type']
+    resp.headers['X-Cache'] = 'HIT'
+    return resp
+
+class CachedSession(requests.Session):
+    """
+    Session HTTP dont les requêtes GET passent par un HttpCache
+    """
+
+    def __init__(self, cache):
+        super().__init__()
+        self.cache = cache
+
+    def get(self, url, params=None, **kwargs):
+        return self.cache.get(super().get, url, params=params, **kwargs)
@@ -0,0 +1,187 @@
+# Instrumentation des callbacks : durée de chaque phase, compteurs et tailles des réponses,
+# exposés au format texte de Prometheus sur la route /metrics (voir src/pages/home.py)
+
+import cProfile
+import functools
+import os
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import Lock
+from flask import g, has_request_context
+
+# Bornes (en secondes) des histogrammes de latence et (en octets) des tailles de réponse
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (1_000, 10_000, 30_000, 100_000, 300_000, 1_000_000, 3_000_000, 10_000_000)
+
+# Callback en cours dans le thread (les phases mesurées hors callback, ex. le précalcul des figures, sont "background")
+current_callback = ContextVar("current_callback", default="background")
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+        self.count += 1
+        self.sum += value
+
+class Metrics:
+    """
+    Registre des métriques d'un processus : histogrammes et compteurs indexés par (nom, labels).
+    Avec plusieurs workers gunicorn, chaque worker a ses propres métriques.
+    """
+
+    def __init__(self):
+        self._histograms = {}
+        self._counters = defaultdict(float)
+        self._help = {}
+        self._lock = Lock()
+
+    def describe(self, name, text):
+        self._help[name] = text
+
+    def observe(self, name, value, buckets=LATENCY_BUCKETS, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def inc(self, name, value=1, **labels):
+        with self._lock:
+            self._counters[(name, tuple(sorted(labels.items())))] += value
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Mesure la durée d'une phase (sélection, préparation, figure, sérialisation...) du callback en cours
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe("dashboard_phase_seconds", time.perf_counter() - start,
+                         callback=current_callback.get(), phase=name)
+
+    def render(self):
+        """
+        Retourne toutes les métriques au format texte de Prometheus
+        """
+        with self._lock:
+            histograms = {key: (list(h.counts), h.count, h.sum, h.buckets) for key, h in self._histograms.items()}
+            counters = dict(self._counters)
+
+        lines = []
+        described = set()
+        def header(name, kind):
+            if name not in described:
+                described.add(name)
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} {kind}")
+
+        for (name, labels), value in sorted(counters.items()):
+            header(name, "counter")
+            lines.append(f"{name}{format_labels(labels)} {format_value(value)}")
+        for (name, labels), (counts, count, total, buckets) in sorted(histograms.items()):
+            header(name, "histogram")
+            for bound, bucket_count in zip(buckets, counts):
+                lines.append(f"{name}_bucket{format_labels(labels + (('le', f'{bound:g}'),))} {bucket_count}")
+            lines.append(f"{name}_bucket{format_labels(labels + (('le', '+Inf'),))} {count}")
+            lines.append(f"{name}_sum{format_labels(labels)} {format_value(total)}")
+            lines.append(f"{name}_count{format_labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+def format_value(value):
+    # Valeur exacte d'un compteur ou d'une somme : entier si possible, sinon tous les chiffres du float
+    # (":g" arrondirait à 6 chiffres significatifs : 1234567 deviendrait 1.23457e+06)
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in labels)
+    return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(labels, escaped)) + "}"
+
+metrics = Metrics()
+metrics.describe("dashboard_callback_seconds", "Durée d'exécution des callbacks Dash")
+metrics.describe("dashboard_phase_seconds", "Durée des phases des callbacks (sélection, préparation, figure, sérialisation)")
+metrics.describe("dashboard_request_seconds", "Durée des requêtes de callback, sérialisation JSON de Dash comprise")
+metrics.describe("dashboard_response_bytes", "Taille des réponses des callbacks")
+metrics.describe("dashboard_callback_calls_total", "Nombre d'appels des callbacks")
+metrics.describe("dashboard_callback_errors_total", "Nombre de callbacks terminés par une exception")
+metrics.describe("figure_cache_hits_total", "Figures servies par le cache")
+metrics.describe("figure_cache_misses_total", "Figures construites (absentes du cache)")
+
+class SlowProfiler:
+    """
+    Profilage à la demande : chaque callback est exécuté sous cProfile et le profil n'est gardé
+    (fichier .prof dans output_dir) que si l'appel a duré plus de threshold_ms
+    """
+
+    def __init__(self, threshold_ms, output_dir):
+        self.threshold_ms = threshold_ms
+        self.output_dir = output_dir
+        # Un seul profileur actif à la fois : les appels concurrents ne sont pas profilés
+        self._lock = Lock()
+
+    def run(self, name, func, *args, **kwargs):
+        if not self._lock.acquire(blocking=False):
+            return func(*args, **kwargs)
+        try:
+            profiler = cProfile.Profile()
+            start = time.perf_counter()
+            try:
+                return profiler.runcall(func, *args, **kwargs)
+            finally:
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                if elapsed_ms >= self.threshold_ms:
+                    os.makedirs(self.output_dir, exist_ok=True)
+                    path = os.path.join(self.output_dir, f"{name}-{time.strftime('%Y%m%d-%H%M%S')}-{elapsed_ms:.0f}ms.prof")
+                    profiler.dump_stats(path)
+                    print(f"[profil] {name} : {elapsed_ms:.0f} ms, profil écrit dans {path}")
+        finally:
+            self._lock.release()
+
+def instrument(name, profiler=None):
+    """
+    Décorateur des callbacks : nombre d'appels, erreurs, durée totale, et profil cProfile des appels lents
+    si un SlowProfiler est fourni. Les phases mesurées pendant l'appel sont rattachées au callback name.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            token = current_callback.set(name)
+            if has_request_context():
+                # Nom du callback pour la mesure de la requête (observe_response)
+                g.dashboard_callback = name
+            start = time.perf_counter()
+            metrics.inc("dashboard_callback_calls_total", callback=name)
+            try:
+                if profiler is not None:
+                    return profiler.run(name, func, *args, **kwargs)
+                return func(*args, **kwargs)
+            except Exception:
+                metrics.inc("dashboard_callback_errors_total", callback=name)
+                raise
+            finally:
+                metrics.observe("dashboard_callback_seconds", time.perf_counter() - start, callback=name)
+                current_callback.reset(token)
+        return wrapper
+    return decorator
+
+def observe_response(callback, seconds, size):
+    """
+    Durée d'une requête de callback (dispatch et sérialisation de Dash compris) et taille de sa réponse
+    """
+    metrics.observe("dashboard_request_seconds", seconds, callback=callback)
+    metrics.observe("dashboard_response_bytes", size, buckets=SIZE_BUCKETS, callback=callback)
@@ -0,0 +1,57 @@
+from collections import OrderedDict
+from threading import Lock
+import pandas as pd
+from src.utils.schema import as_year
+
+class YearPivotCache:
+    """
+    Fournit, pour une année, le tableau large pays x indicateur (area x item) utilisé par l'histogramme
+    et le filled area plot. Chaque année est construite une seule fois par la source puis gardée
+    en cache avec une éviction LRU bornée.
+    """
+
+    def __init__(self, source, maxsize=24):
+        """
+        Args:
+            source: DataCube (src/utils/cube.py) ou SqliteSource (src/utils/data_access.py)
+            maxsize: Nombre maximal d'années gardées en cache
+        """
+        self.source = source
+        self.maxsize = maxsize
+        self._cache = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, selected_year):
+        """
+        Retourne le pivot de l'année (colonne area + une colonne par item), comme
+        subset.pivot_table(index='area', columns='item', values='value', aggfunc='mean').reset_index().
+        Le DataFrame retourné est partagé : ne pas le modifier en place.
+        """
+        key = as_year(selected_year)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+        pivot = self.source.year_pivot(key)
+
+        with self._lock:
+            self._cache[key] = pivot
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+        return pivot
+
+def get_year_pivot(df, selected_year, pivots=None):
+    """
+    Retourne le pivot area x item de l'année sélectionnée, depuis le cache s'il est fourni
+    et sinon en le calculant directement sur df
+    """
+    if pivots is not None:
+        return pivots.get(selected_year)
+
+    subset = df[df['year'] == as_year(selected_year)]
+    if subset.empty:
+        return pd.DataFrame(columns=['area'])
+    index = ['area', 'area_key'] if 'area_key' in subset.columns else 'area'
+    return subset.pivot_table(index=index, columns='item', values='value', aggfunc='mean', observed=True).reset_index()
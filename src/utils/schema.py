@@ -0,0 +1,35 @@
+# Schéma canonique des tables nettoyées chargées en mémoire par le dashboard
+
+import pandas as pd
+
+# Texte répété stocké en catégories (codes entiers), années en int16, valeurs en float32.
+# La population garde des valeurs en float64 (jusqu'à 1,4 milliard, au-delà de la précision d'un float32).
+CLEAN_DATA_DTYPES = {'area': 'category', 'area_key': 'Int32', 'iso3': 'category', 'item': 'category',
+                     'unit': 'category', 'year': 'int16', 'value': 'float32'}
+CLEAN_POP_DTYPES = {'area': 'category', 'area_key': 'Int32', 'year': 'int16', 'value': 'float64'}
+
+def canonical_frame(df, dtypes):
+    """
+    Convertit un DataFrame chargé (SQLite ou instantané) dans le schéma canonique : seules les colonnes du schéma
+    sont gardées, et celles qui sont déjà au bon type ne sont pas recopiées
+    """
+    columns = {}
+    for col, dtype in dtypes.items():
+        if col not in df.columns:
+            continue
+        if str(df[col].dtype) == dtype:
+            columns[col] = df[col]
+        elif dtype == 'category':
+            columns[col] = df[col].astype('category')
+        else:
+            columns[col] = df[col].astype(dtype)
+    return pd.DataFrame(columns)
+
+def as_year(value):
+    """
+    Année canonique (int) d'une valeur du filtre (int, entier NumPy ou texte), None si elle n'est pas valide
+    """
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,40 @@
+from collections import OrderedDict
+from threading import Lock
+from src.utils.schema import as_year
+
+class SelectionCache:
+    """
+    Tranche pays -> valeur d'un couple (indicateur, année), calculée une seule fois par la source puis partagée
+    par la carte et le top 3. Expose la même méthode country_values que DataCube et SqliteSource.
+    """
+
+    def __init__(self, source, maxsize=128):
+        """
+        Args:
+            source: DataCube (src/utils/cube.py) ou SqliteSource (src/utils/data_access.py)
+            maxsize: Nombre maximal de couples (indicateur, année) gardés en cache
+        """
+        self.source = source
+        self.maxsize = maxsize
+        self._cache = OrderedDict()
+        self._lock = Lock()
+
+    def country_values(self, indicator, year):
+        """
+        Retourne un DataFrame (area, value) des pays ayant une valeur pour l'indicateur et l'année donnés.
+        Le DataFrame retourné est partagé : ne pas le modifier en place.
+        """
+        key = (indicator, as_year(year))
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+        country_data = self.source.country_values(indicator, year)
+
+        with self._lock:
+            self._cache[key] = country_data
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+        return country_data
@@ -0,0 +1,93 @@
+# Instantané colonne (Arrow IPC) des tables nettoyées, lu par le dashboard en mémoire partagée (mmap)
+
+import os
+import pandas as pd
+from src.utils.schema import CLEAN_DATA_DTYPES, CLEAN_POP_DTYPES
+
+try:
+    import pyarrow as pa
+except ImportError:  # pyarrow est optionnel : sans lui, le dashboard lit SQLite
+    pa = None
+
+SNAPSHOT_DIR = 'snapshot'
+
+def snapshot_dir(bdd_path):
+    # Dossier des instantanés d'une base : snapshot/ à côté du fichier de la base
+    return os.path.join(os.path.dirname(bdd_path), SNAPSHOT_DIR)
+
+# Colonnes gardées dans l'instantané, au schéma canonique du dashboard (src/utils/schema.py) :
+# les colonnes texte sont stockées en dictionnaire (catégories)
+SNAPSHOT_COLUMNS = {
+    'clean_data': CLEAN_DATA_DTYPES,
+    'clean_pop_tot': CLEAN_POP_DTYPES,
+}
+
+def snapshot_path(table, snapshot_dir=SNAPSHOT_DIR):
+    return os.path.join(snapshot_dir, f'{table}.arrow')
+
+def compact_frame(df, dtypes, categories):
+    """
+    Convertit un lot dans les types compacts de l'instantané. Les catégories sont fixées pour toute la table
+    (triées) afin que tous les lots partagent le même dictionnaire.
+    """
+    df = df[list(dtypes)]
+    columns = {}
+    for col, dtype in dtypes.items():
+        if dtype == 'category':
+            columns[col] = pd.Categorical(df[col], categories=categories[col])
+        else:
+            columns[col] = df[col].astype(dtype)
+    return pd.DataFrame(columns)
+
+def write_snapshot(conn, table, snapshot_dir=SNAPSHOT_DIR, chunksize=None):
+    """
+    Écrit l'instantané Arrow IPC d'une table nettoyée (lignes avec une valeur), lot par lot si chunksize est fourni.
+    Le fichier est écrit à côté puis renommé : les processus qui lisent l'ancien fichier le gardent jusqu'à la fin.
+
+    Returns:
+        Le chemin du fichier écrit, ou None si pyarrow n'est pas installé
+    """
+    if pa is None:
+        return None
+
+    dtypes = SNAPSHOT_COLUMNS[table]
+    categories = {
+        col: [row[0] for row in conn.execute(
+            f'SELECT DISTINCT "{col}" FROM "{table}" WHERE value IS NOT NULL AND "{col}" IS NOT NULL ORDER BY "{col}"')]
+        for col, dtype in dtypes.items() if dtype == 'category'
+    }
+    sql = f'SELECT {", ".join(dtypes)} FROM "{table}" WHERE value IS NOT NULL'
+    chunks = pd.read_sql_query(sql, conn, chunksize=chunksize) if chunksize else [pd.read_sql_query(sql, conn)]
+
+    os.makedirs(snapshot_dir, exist_ok=True)
+    path = snapshot_path(table, snapshot_dir)
+    tmp_path = path + '.tmp'
+    writer = None
+    with pa.OSFile(tmp_path, 'wb') as sink:
+        for chunk in chunks:
+            batch = pa.RecordBatch.from_pandas(compact_frame(chunk, dtypes, categories), preserve_index=False)
+            if writer is None:
+                writer = pa.ipc.new_file(sink, batch.schema)
+            writer.write_batch(batch)
+        if writer is None:
+            empty = compact_frame(pd.DataFrame(columns=list(dtypes)), dtypes, categories)
+            writer = pa.ipc.new_file(sink, pa.Schema.from_pandas(empty, preserve_index=False))
+        writer.close()
+    os.replace(tmp_path, path)
+    return path
+
+def read_snapshot(table, snapshot_dir=SNAPSHOT_DIR):
+    """
+    Lit l'instantané d'une table par memory mapping : les colonnes numériques pointent directement sur les pages
+    du fichier (partagées entre processus par le cache du système).
+
+    Returns:
+        Un DataFrame, ou None si l'instantané est absent ou si pyarrow n'est pas installé
+    """
+    path = snapshot_path(table, snapshot_dir)
+    if pa is None or not os.path.exists(path):
+        return None
+    with pa.memory_map(path, 'r') as source:
+        arrow_table = pa.ipc.open_file(source).read_all()
+    # split_blocks : une colonne par bloc, sans recopier les colonnes sans valeur manquante
+    return arrow_table.to_pandas(split_blocks=True)
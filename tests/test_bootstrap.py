@@ -0,0 +1,22 @@
+# Chargement des données du dashboard : nouvel essai après un échec
+# Lancer depuis la racine du projet : python -m pytest
+
+from benchmarks.synthetic import synthetic_tables
+from src.utils.bootstrap import Bootstrap
+from tests.test_clean_data import write_raw
+
+def test_failed_load_is_retried(tmp_path):
+    # Premier chargement impossible : le dossier de la base n'existe pas encore
+    data_dir = tmp_path / "data"
+    bdd_path = str(data_dir / "faostat_data.db")
+    bootstrap = Bootstrap(bdd_path=bdd_path, backend="memory", check_interval=0)
+    bootstrap.start(background=False)
+    assert not bootstrap.ready and bootstrap.error
+
+    # La base devient disponible : le get() suivant relance le chargement
+    data_dir.mkdir()
+    write_raw(bdd_path, *synthetic_tables(1))
+    assert bootstrap.get() is None
+    assert bootstrap.wait(timeout=120), bootstrap.error
+    assert bootstrap.error is None
+    assert bootstrap.get() is not None
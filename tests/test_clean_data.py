@@ -0,0 +1,91 @@
+# Nettoyage et chargement des tables à partir de tables brutes synthétiques (benchmarks/synthetic.py).
+# Lancer depuis la racine du projet : python -m pytest
+
+import os
+import sqlite3
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+from benchmarks.synthetic import synthetic_tables
+from src.utils.bootstrap import Bootstrap, data_version
+from src.utils.clean_data import clean_data, clean_faostat, write_clean_table
+from src.utils.data_access import load_clean_tables
+from src.utils.snapshot import pa, snapshot_path
+
+@pytest.fixture(scope="module")
+def raw_tables():
+    return synthetic_tables(1)
+
+def write_raw(bdd_path, raw_data, raw_pop):
+    conn = sqlite3.connect(bdd_path)
+    raw_data.to_sql("raw_data", conn, index=False)
+    raw_pop.to_sql("raw_pop_tot", conn, index=False)
+    conn.close()
+
+def test_non_default_bdd_path(tmp_path, monkeypatch, raw_tables):
+    # Base hors du dossier courant : la base nettoyée et son instantané sont écrits à côté d'elle
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    bdd_path = str(data_dir / "custom.db")
+    write_raw(bdd_path, *raw_tables)
+    cwd = tmp_path / "cwd"
+    cwd.mkdir()
+    monkeypatch.chdir(cwd)
+
+    clean_data(bdd_path=bdd_path)
+    assert os.listdir(cwd) == []
+    if pa is not None:
+        assert os.path.exists(snapshot_path("clean_data", str(data_dir / "snapshot")))
+        # Le dashboard surveille l'instantané de cette base
+        assert all(data_version(bdd_path)[2:])
+
+    df, df_pop = load_clean_tables(bdd_path)
+    conn = sqlite3.connect(bdd_path)
+    assert len(df) == conn.execute("SELECT COUNT(*) FROM clean_data WHERE value IS NOT NULL").fetchone()[0]
+    assert len(df_pop) == conn.execute("SELECT COUNT(*) FROM clean_pop_tot").fetchone()[0]
+    conn.close()
+
+    bootstrap = Bootstrap(bdd_path=bdd_path)
+    bootstrap.start(background=False)
+    assert bootstrap.ready, bootstrap.error
+    assert len(bootstrap.get().df) == len(df)
+    assert os.listdir(cwd) == []
+
+@pytest.mark.parametrize("chunksize", [None, 10])
+def test_empty_raw_tables(tmp_path, raw_tables, chunksize):
+    bdd_path = str(tmp_path / "faostat_data.db")
+    write_raw(bdd_path, *(table.head(0) for table in raw_tables))
+    clean_data(chunksize=chunksize, bdd_path=bdd_path)
+    conn = sqlite3.connect(bdd_path)
+    for table in ["clean_data", "clean_pop_tot"]:
+        assert conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] == 0
+    conn.close()
+
+def test_write_clean_table_without_chunks(tmp_path, raw_tables):
+    # Lecture par lots qui ne donne aucun lot : la table est créée avec les colonnes du nettoyage
+    conn = sqlite3.connect(str(tmp_path / "faostat_data.db"))
+    write_clean_table(conn, iter([]), "clean_data__staging", lambda: clean_faostat(raw_tables[0].head(0)))
+    columns = [row[1] for row in conn.execute('PRAGMA table_info("clean_data__staging")')]
+    conn.close()
+    assert columns == list(clean_faostat(raw_tables[0].head(100)).columns)
+
+def read_clean_tables(bdd_path):
+    conn = sqlite3.connect(bdd_path)
+    tables = [pd.read_sql_query(f"SELECT * FROM {table}", conn) for table in ["clean_data", "clean_pop_tot"]]
+    schemas = [conn.execute(f"SELECT sql FROM sqlite_master WHERE name = '{table}'").fetchone()[0]
+               for table in ["clean_data", "clean_pop_tot"]]
+    conn.close()
+    return tables, schemas
+
+def test_chunked_cleaning_matches_in_memory(tmp_path, raw_tables):
+    # Même base brute nettoyée en mémoire puis par petits lots : tables nettoyées identiques
+    bdd_path = str(tmp_path / "faostat_data.db")
+    write_raw(bdd_path, *raw_tables)
+    clean_data(chunksize=None, bdd_path=bdd_path)
+    in_memory, schemas = read_clean_tables(bdd_path)
+    clean_data(chunksize=997, bdd_path=bdd_path)
+    chunked, chunked_schemas = read_clean_tables(bdd_path)
+
+    assert chunked_schemas == schemas
+    for expected, actual in zip(in_memory, chunked):
+        assert_frame_equal(actual, expected)
@@ -0,0 +1,32 @@
+# Fiche pays : pays présents dans les données, avec l'index en mémoire et la base SQLite
+# Lancer depuis la racine du projet : python -m pytest
+
+import pandas as pd
+import pytest
+from benchmarks.synthetic import synthetic_tables
+from src.utils.clean_data import clean_data
+from src.utils.country_codes import iso3_from_m49
+from src.utils.country_index import CountryIndex
+from src.utils.data_access import SqliteSource, load_clean_tables
+from tests.test_clean_data import write_raw
+
+@pytest.fixture(scope="module")
+def bdd_path(tmp_path_factory):
+    bdd_path = str(tmp_path_factory.mktemp("data") / "faostat_data.db")
+    write_raw(bdd_path, *synthetic_tables(1))
+    clean_data(bdd_path=bdd_path)
+    return bdd_path
+
+def test_has_area(bdd_path):
+    df, df_pop = load_clean_tables(bdd_path)
+    area = df["area"].iloc[0]
+    for countries in (CountryIndex(df, df_pop), SqliteSource(bdd_path)):
+        assert countries.has_area(area)
+        assert not countries.has_area("Atlantis")
+        assert not countries.has_area("")
+
+def test_iso3_from_m49_keeps_missing_codes():
+    iso3 = iso3_from_m49(pd.Series([4.0, 999.0, None]))
+    assert iso3.iloc[0] == "AFG"
+    assert iso3.iloc[1:].isna().all()
+    assert "nan" not in iso3.tolist()
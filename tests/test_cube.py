@@ -0,0 +1,41 @@
+# Cube indicateur x année x pays : mêmes résultats que les filtres et groupby d'origine des callbacks
+# Lancer depuis la racine du projet : python -m pytest
+
+import numpy as np
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+from benchmarks.bench_cube import synthetic_clean_data
+from src.utils.cube import DataCube
+
+@pytest.fixture(scope="module")
+def df():
+    # Données avec des trous (synthetic_clean_data), des valeurs manquantes et des lignes en double
+    df = synthetic_clean_data(n_areas=30, n_years=6)
+    df["year"] = df["year"].astype(int)
+    rng = np.random.default_rng(1)
+    df.loc[rng.random(len(df)) < 0.05, "value"] = np.nan
+    duplicates = df.sample(frac=0.1, random_state=2).assign(value=lambda d: d["value"] * 2)
+    return pd.concat([df, duplicates], ignore_index=True)
+
+def test_country_values(df):
+    cube = DataCube(df)
+    for indicator in df["item"].unique():
+        for year in df["year"].unique():
+            subset = df[(df["year"] == year) & (df["item"] == indicator)]
+            # Ancienne version de update_map
+            expected = subset.groupby("area")["value"].mean().dropna().reset_index()
+            assert_frame_equal(cube.country_values(indicator, year), expected, check_dtype=False, rtol=1e-6)
+
+def test_year_pivot(df):
+    cube = DataCube(df)
+    for year in df["year"].unique():
+        subset = df[df["year"] == year]
+        # Ancien pivot de l'histogramme et du filled area plot
+        expected = subset.pivot_table(index="area", columns="item", values="value", aggfunc="mean").reset_index()
+        assert_frame_equal(cube.year_pivot(year), expected, check_dtype=False, check_column_type=False, rtol=1e-6)
+
+def test_unknown_year(df):
+    cube = DataCube(df)
+    assert cube.country_values(df["item"].iloc[0], 1900).empty
+    assert list(cube.year_pivot(1900).columns) == ["area"]
@@ -0,0 +1,37 @@
+# Sessions HTTP de get_data et cache disque des réponses, contre le serveur local benchmarks/fake_sources.py
+# Lancer depuis la racine du projet : python -m pytest
+
+import os
+import faostat
+import pytest
+from benchmarks.fake_sources import start_fake_sources
+from src.utils.fetch import fetch_faostat_chunk, make_session
+from src.utils.http_cache import HttpCache
+
+@pytest.fixture
+def fake_sources():
+    server, faostat_url, world_bank_url = start_fake_sources()
+    yield faostat_url, world_bank_url
+    server.shutdown()
+
+def test_session_keeps_faostat_requests_args(monkeypatch):
+    # Options données à faostat.set_requests_args
+    requests_args = faostat.faostat.__ra__
+    monkeypatch.setitem(requests_args, "proxies", {"https": "http://proxy.local:3128"})
+    monkeypatch.setitem(requests_args, "verify", "/etc/ssl/custom.pem")
+    with make_session() as session:
+        assert session.proxies["https"] == "http://proxy.local:3128"
+        assert session.verify == "/etc/ssl/custom.pem"
+
+def test_revalidated_response_is_served_from_cache(tmp_path, fake_sources):
+    faostat_url, _ = fake_sources
+    cache = HttpCache(cache_dir=str(tmp_path))
+    with make_session(cache=cache) as session:
+        first = fetch_faostat_chunk(session, "FS", ["21004"], ["6120"], ["20002001"], faostat_url)
+        key = next(name for name in os.listdir(tmp_path) if name.endswith(".json"))[:-len(".json")]
+        stored_at = cache.load(key)[0]["stored_at"]
+        # Réponse inchangée (304) : servie depuis le cache, date de validation mise à jour sans fichier temporaire
+        second = fetch_faostat_chunk(session, "FS", ["21004"], ["6120"], ["20002001"], faostat_url)
+    assert first.equals(second)
+    assert cache.load(key)[0]["stored_at"] > stored_at
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
@@ -0,0 +1,33 @@
+# Cache des figures : les figures précalculées ne sont pas évincées par les figures demandées à la volée
+# Lancer depuis la racine du projet : python -m pytest
+
+from src.utils.figure_cache import FigureCache
+
+def figure(name):
+    return {"data": [], "layout": {"title": {"text": str(name)}}}
+
+def test_warmed_figures_survive_misses():
+    cache = FigureCache(maxsize=256)
+    built = []
+
+    def build(name):
+        built.append(name)
+        return figure(name)
+
+    warmed = [("map", "indicator", year) for year in range(2000, 2024)]
+    cache.warm([(key, lambda key=key: build(key)) for key in warmed])
+
+    # Plus de fiches pays et de classes de PIB que la taille du cache
+    for i in range(300):
+        cache.get(("country", f"Country {i}"), lambda i=i: build(i))
+        cache.get(("histogram", 2020, (0, i + 1)), lambda i=i: build(-i))
+    assert len(cache) == len(warmed) + 256
+
+    built.clear()
+    for key in warmed:
+        assert cache.get(key, lambda key=key: build(key)) == figure(key)
+    assert built == []
+
+    # Les figures à la volée restent bornées par l'éviction LRU
+    cache.get(("country", "Country 0"), lambda: build(0))
+    assert built == [0]
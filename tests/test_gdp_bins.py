@@ -0,0 +1,17 @@
+# Bornes des classes de PIB saisies dans le panneau
+# Lancer depuis la racine du projet : python -m pytest
+
+import pytest
+from config import GDP_BINS
+from src.components.gdp_bins_component import parse_edges, selected_gdp_bins, validate_edges
+
+def test_parse_edges():
+    assert parse_edges("0, 1000; 2500.5 1e4") == [0, 1000, 2500.5, 10000]
+
+@pytest.mark.parametrize("text", ["0, nan, 1000", "0, 1000, inf", "-inf, 0, 1000", "0, 1000, 1000", "0, 5000, 1000",
+                                  "0, abc", "1000", ""])
+def test_invalid_edges(text):
+    edges, message = validate_edges(text)
+    assert edges is None and message
+    # Les figures gardent les bornes par défaut
+    assert selected_gdp_bins(None, 2020, "fixed", None, text) == GDP_BINS
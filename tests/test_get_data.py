@@ -0,0 +1,163 @@
+# Mise à jour incrémentale de get_data sur une base construite par le téléchargement complet
+# (API FAOSTAT et Banque Mondiale simulées). Lancer depuis la racine du projet : python -m pytest
+
+import sqlite3
+import pandas as pd
+import pytest
+import src.utils.get_data as get_data
+
+def year_code(year):
+    # Code de la période de 3 ans renvoyé par l'API (différent du code year3 demandé, ex. 20003 -> 20002002)
+    start = year // 10
+    return f"{start}{start + 2}"
+
+class FakeSources:
+    """
+    Sources simulées : une version par source, et des valeurs FAOSTAT modifiables par tranche (item, année)
+    """
+
+    def __init__(self):
+        self.fao_release = "2024-01-01"
+        self.pop_release = "2024-01-01"
+        self.values = {}
+        # Tranches (item, année) absentes de la réponse (lignes retirées par la source)
+        self.removed = set()
+        self.fetched = []
+
+    def fetch_faostat(self, item_codes, year_codes, session=None, base_url=None):
+        self.fetched.append((tuple(item_codes), tuple(year_codes)))
+        rows = [
+            {"Area Code (M49)": "'004", "Area": "Afghanistan", "Element Code": "6120", "Item Code": str(item),
+             "Item": f"Item {item}", "Year Code": year_code(year), "Year": f"{year // 10}-{year // 10 + 2}", "Unit": "%",
+             "Value": str(self.values.get((item, year), 1.0))}
+            for item in item_codes for year in year_codes if (item, year) not in self.removed
+        ]
+        return pd.DataFrame(rows)
+
+    def iter_population_pages(self, session, indicator, date_range, per_page=1000, base_url=None):
+        start, stop = (int(year) for year in date_range.split(":"))
+        yield [("Afghanistan", str(year), 1000.0, "AFG") for year in range(start, stop + 1)]
+
+@pytest.fixture
+def sources(tmp_path, monkeypatch):
+    fake = FakeSources()
+    fake.bdd_path = str(tmp_path / "faostat_data.db")
+    monkeypatch.setattr(get_data, "fetch_faostat", fake.fetch_faostat)
+    monkeypatch.setattr(get_data, "iter_population_pages", fake.iter_population_pages)
+    monkeypatch.setattr(get_data, "faostat_release", lambda base_url=None: fake.fao_release)
+    monkeypatch.setattr(get_data, "population_release", lambda base_url=None: fake.pop_release)
+    return fake
+
+def raw_value(bdd_path, item, year):
+    conn = sqlite3.connect(bdd_path)
+    row = conn.execute('SELECT "Value" FROM raw_data WHERE "Item Code" = ? AND "Year Code" = ?',
+                       (str(item), year_code(year))).fetchone()
+    conn.close()
+    return row[0] if row is not None else None
+
+def read_raw(bdd_path):
+    conn = sqlite3.connect(bdd_path)
+    df = pd.read_sql('SELECT * FROM raw_data', conn)
+    conn.close()
+    return df.sort_values(list(df.columns)).reset_index(drop=True)
+
+def test_full_download_records_release(sources):
+    get_data.get_data(bdd_path=sources.bdd_path)
+    conn = sqlite3.connect(sources.bdd_path)
+    releases = {row[0] for row in conn.execute(f"SELECT DISTINCT release FROM {get_data.SLICES_TABLE}")}
+    conn.close()
+    assert releases == {"2024-01-01"}
+
+    # Même version : rien n'est retéléchargé
+    sources.fetched.clear()
+    get_data.get_data(incremental=True, bdd_path=sources.bdd_path)
+    assert sources.fetched == []
+
+def test_new_release_only_rewrites_changed_slices(sources, monkeypatch):
+    get_data.get_data(bdd_path=sources.bdd_path)
+    item, year = get_data.items[0], get_data.annees[-1]
+
+    # Nouvelle version où une seule tranche change
+    sources.fao_release = "2025-01-01"
+    sources.values[(item, year)] = 2.5
+    sources.fetched.clear()
+    written = []
+    replace_items = get_data.replace_items
+    monkeypatch.setattr(get_data, "replace_items",
+                        lambda conn, table, df, item_codes: (written.append(len(df)), replace_items(conn, table, df, item_codes)))
+    get_data.get_data(incremental=True, bdd_path=sources.bdd_path)
+
+    assert sources.fetched, "la nouvelle version doit être détectée"
+    assert raw_value(sources.bdd_path, item, year) == "2.5"
+    # Seul l'item modifié est réécrit (toutes ses années, une ligne par année)
+    assert written == [len(get_data.annees)]
+
+    # La nouvelle version est enregistrée : la mise à jour suivante ne télécharge rien
+    sources.fetched.clear()
+    get_data.get_data(incremental=True, bdd_path=sources.bdd_path)
+    assert sources.fetched == []
+
+def test_removed_row_is_deleted(sources):
+    get_data.get_data(bdd_path=sources.bdd_path)
+    item, year = get_data.items[1], get_data.annees[3]
+
+    # Nouvelle version où la source retire une ligne : la mise à jour incrémentale la supprime aussi
+    sources.fao_release = "2025-01-01"
+    sources.removed.add((item, year))
+    get_data.get_data(incremental=True, bdd_path=sources.bdd_path)
+    assert raw_value(sources.bdd_path, item, year) is None
+    assert raw_value(sources.bdd_path, item, get_data.annees[4]) == "1.0"
+
+    # Même contenu que le téléchargement complet de cette version
+    incremental = read_raw(sources.bdd_path)
+    get_data.get_data(bdd_path=sources.bdd_path)
+    assert incremental.equals(read_raw(sources.bdd_path))
+
+@pytest.mark.parametrize("parallel", [False, True])
+def test_failed_download_keeps_tables(sources, monkeypatch, parallel):
+    get_data.get_data(bdd_path=sources.bdd_path)
+    before = read_raw(sources.bdd_path)
+
+    def failing_fetch(*args, **kwargs):
+        raise ConnectionError("FAOSTAT indisponible")
+
+    def failing_fetch_all(dataset, chunks, element_codes, population_job=None, **kwargs):
+        # La population est chargée dans la table temporaire avant l'échec d'une partie FAOSTAT
+        population_job(None)
+        failing_fetch()
+
+    monkeypatch.setattr(get_data, "fetch_faostat", failing_fetch)
+    monkeypatch.setattr(get_data, "fetch_all", failing_fetch_all)
+    with pytest.raises(ConnectionError):
+        get_data.get_data(parallel=parallel, bdd_path=sources.bdd_path)
+
+    conn = sqlite3.connect(sources.bdd_path)
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    conn.close()
+    assert "raw_pop_tot__staging" not in tables
+    assert read_raw(sources.bdd_path).equals(before)
+
+def test_unknown_release_is_stale_once(sources):
+    # Base construite sans version connue (API de métadonnées indisponible)
+    sources.fao_release = None
+    get_data.get_data(bdd_path=sources.bdd_path)
+    sources.fao_release = "2024-01-01"
+
+    get_data.get_data(incremental=True, bdd_path=sources.bdd_path)
+    assert sources.fetched[-1][0] == (get_data.items[-1],)
+    sources.fetched.clear()
+    get_data.get_data(incremental=True, bdd_path=sources.bdd_path)
+    assert sources.fetched == []
+
+def test_max_age_days(sources):
+    get_data.get_data(bdd_path=sources.bdd_path)
+    conn = sqlite3.connect(sources.bdd_path)
+    with conn:
+        conn.execute(f"UPDATE {get_data.SLICES_TABLE} SET fetched_at = '2000-01-01T00:00:00+00:00'")
+    conn.close()
+
+    sources.fetched.clear()
+    get_data.get_data(incremental=True, bdd_path=sources.bdd_path)
+    assert sources.fetched == []
+    get_data.get_data(incremental=True, max_age_days=30, bdd_path=sources.bdd_path)
+    assert len(sources.fetched) == len(get_data.items)
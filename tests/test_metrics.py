@@ -0,0 +1,16 @@
+# Rendu des métriques au format texte de Prometheus
+# Lancer depuis la racine du projet : python -m pytest
+
+from src.utils.metrics import Metrics
+
+def test_large_counters_are_exact():
+    metrics = Metrics()
+    metrics.inc("dashboard_callback_calls_total", 1_234_567, callback="update_dashboard")
+    metrics.inc("dashboard_callback_calls_total", callback="update_dashboard")
+    metrics.observe("dashboard_response_bytes", 2_000_001, callback="update_dashboard")
+    metrics.observe("dashboard_response_bytes", 0.5, callback="update_dashboard")
+    lines = metrics.render().splitlines()
+
+    assert 'dashboard_callback_calls_total{callback="update_dashboard"} 1234568' in lines
+    assert 'dashboard_response_bytes_sum{callback="update_dashboard"} 2000001.5' in lines
+    assert not [line for line in lines if "e+" in line.rsplit(" ", 1)[-1]]
@@ -0,0 +1,13 @@
+# Point d'entrée WSGI de production : gunicorn -c gunicorn.conf.py wsgi:server
+import gc
+import time
+start = time.perf_counter()
+
+from src.pages.home import server, bootstrap
+
+# Données chargées à l'import, donc une seule fois dans le processus maître avec preload_app (gunicorn.conf.py) :
+# les workers créés par fork partagent en lecture seule le cube, les figures précalculées et l'instantané mmap
+bootstrap.start(background=False)
+# Les objets chargés sortent du suivi du ramasse-miettes : ses passages ne recopient plus leurs pages dans chaque worker
+gc.freeze()
+print(f"[bootstrap] application prête : {(time.perf_counter() - start) * 1000:.0f} ms")